@@ -1,11 +1,16 @@
+import base64
+import hashlib
+import io
 import logging
 import os
 import platform
 import shutil
 import stat
 import tarfile
+import tempfile
 import urllib.request
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Use the import path confirmed by Hatch documentation
@@ -22,6 +27,19 @@ class CustomBuildHook(BuildHookInterface):
     """Hatchling build hook to download and package the Temporal CLI binary."""
 
     CLI_VERSION = "1.3.0"  # Pin the version you want to bundle
+    HEADERS = {"User-Agent": "temporalio-server-build/0.1.0"}
+
+    # Wheel platform tags for each supported GOOS/GOARCH. The CLI binaries are
+    # statically linked, so the oldest manylinux tags apply. On macOS the floor
+    # is set by the Go toolchain: Go 1.23+ (used for CLI 1.3.0) needs macOS 11.
+    PLATFORM_TAGS = {
+        ("linux", "amd64"): "manylinux_2_17_x86_64.manylinux2014_x86_64",
+        ("linux", "arm64"): "manylinux_2_17_aarch64.manylinux2014_aarch64",
+        ("darwin", "amd64"): "macosx_11_0_x86_64",
+        ("darwin", "arm64"): "macosx_11_0_arm64",
+        ("windows", "amd64"): "win_amd64",
+        ("windows", "arm64"): "win_arm64",
+    }
 
     def initialize(self, version, build_data):
         """This method is called before the build process begins."""
@@ -32,9 +50,18 @@ class CustomBuildHook(BuildHookInterface):
             log.info(f"Skipping hook for target: {self.target_name}")
             return
 
-        # *** Signal Hatchling to infer platform-specific wheel tags ***
-        log.info("Setting infer_tag = True in build_data")
-        build_data["infer_tag"] = True
+        self.extra_targets = []
+        targets = self.get_targets()
+        if targets:
+            # Multi-platform mode: this wheel is for the first target; the others
+            # are derived from it in finalize().
+            primary_tag = self.PLATFORM_TAGS[targets[0]]
+            log.info(f"Building for targets {targets}; primary wheel tag {primary_tag}")
+            build_data["tag"] = f"py3-none-{primary_tag}"
+        else:
+            # *** Signal Hatchling to infer platform-specific wheel tags ***
+            log.info("Setting infer_tag = True in build_data")
+            build_data["infer_tag"] = True
 
         # Determine the target directory within the build environment
         # Hatchling provides the build directory structure.
@@ -54,22 +81,64 @@ class CustomBuildHook(BuildHookInterface):
         log.info(f"Created target directory: {self.target_dir}")
 
         try:
-            self.download_and_extract()
+            if targets:
+                self.prepare_targets(targets)
+            else:
+                self.download_and_extract()
             log.info("Temporal CLI binary prepared successfully.")
         except Exception as e:
             log.error(f"Failed to prepare Temporal CLI binary: {e}")
             raise
 
-    def get_platform_mapping(self):
-        """Maps Python platform info to Temporal CLI release asset names."""
+    def get_targets(self):
+        """Returns the (GOOS, GOARCH) targets for a multi-platform build, or [] for host-only.
+
+        Set with TEMPORAL_CLI_TARGETS (comma-separated, e.g. "linux-amd64,darwin-arm64",
+        or "all") or the `targets` list in the hook config.
+        """
+        configured = os.environ.get("TEMPORAL_CLI_TARGETS") or self.config.get(
+            "targets", []
+        )
+        if isinstance(configured, str):
+            configured = [t.strip() for t in configured.split(",") if t.strip()]
+        if configured == ["all"]:
+            return list(self.PLATFORM_TAGS)
+        targets = []
+        for target in configured:
+            goos, _, goarch = target.partition("-")
+            if (goos, goarch) not in self.PLATFORM_TAGS:
+                raise ValueError(
+                    f"Unsupported target '{target}'; expected one of "
+                    + ", ".join(f"{o}-{a}" for o, a in self.PLATFORM_TAGS)
+                )
+            targets.append((goos, goarch))
+        return targets
+
+    def prepare_targets(self, targets):
+        """Fetches all targets' binaries concurrently into staging directories.
+
+        The first target's binary goes into the package; the rest are packed
+        into their own wheels in finalize().
+        """
+        self.staging_dir = Path(tempfile.mkdtemp(prefix="temporal-cli-"))
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            futures = {}
+            for goos, goarch in targets:
+                target_dir = self.staging_dir / f"{goos}_{goarch}"
+                target_dir.mkdir()
+                futures[(goos, goarch)] = executor.submit(
+                    self.download_and_extract, goos, goarch, target_dir
+                )
+            binaries = {target: future.result() for target, future in futures.items()}
+
+        primary = binaries[targets[0]]
+        shutil.copy2(primary, self.target_dir / primary.name)
+        self.extra_targets = [(t, binaries[t]) for t in targets[1:]]
+
+    def get_target_platform(self):
+        """Returns (GOOS, GOARCH) for the host platform."""
         # Use platform module directly
-        py_system = platform.system().lower()
-        goos = py_system
-        # Adjust for macOS naming convention in CLI releases
-        if goos == "darwin":
-            # The actual asset name uses 'darwin', not 'macOS'
-            # goos = "macOS" # Incorrect assumption
-            pass  # goos is already 'darwin'
+        goos = platform.system().lower()
 
         # Determine architecture using platform.machine(), map to GOARCH
         py_arch = platform.machine().lower()
@@ -85,6 +154,12 @@ class CustomBuildHook(BuildHookInterface):
 
         if not goarch:
             raise RuntimeError(f"Unsupported architecture: {py_arch}")
+        return goos, goarch
+
+    def get_platform_mapping(self, goos=None, goarch=None):
+        """Maps a GOOS/GOARCH pair (default: host) to Temporal CLI release asset names."""
+        if goos is None or goarch is None:
+            goos, goarch = self.get_target_platform()
 
         archive_ext = ".zip" if goos == "windows" else ".tar.gz"
         # Windows uses .zip primarily, but tar.gz might also exist based on user list?
@@ -93,93 +168,319 @@ class CustomBuildHook(BuildHookInterface):
 
         # *** Correct the asset name format to include '_cli_' ***
         asset_name = f"temporal_cli_{self.CLI_VERSION}_{goos}_{goarch}{archive_ext}"
-        download_url = f"https://github.com/temporalio/cli/releases/download/v{self.CLI_VERSION}/{asset_name}"
+        download_url = f"{self.release_url}/{asset_name}"
 
         log.info(
             f"Asset Name: {asset_name}, Download URL: {download_url}, Binary Name: {binary_name}"
         )
         return download_url, asset_name, binary_name, archive_ext
 
-    def download_and_extract(self):
-        """Downloads and extracts the Temporal CLI binary."""
-        download_url, asset_name, binary_name, archive_ext = self.get_platform_mapping()
-        # Use a temporary directory within the build context if possible,
-        # otherwise download next to the script or in system temp.
-        # Using Path('.') places it relative to where hatch runs, often the project root.
-        download_path = Path(".") / asset_name
-        final_binary_path = self.target_dir / binary_name
-
-        log.info(f"Downloading {asset_name} from {download_url}...")
+    @property
+    def release_url(self):
+        return (
+            f"https://github.com/temporalio/cli/releases/download/v{self.CLI_VERSION}"
+        )
 
+    @property
+    def cache_dir(self):
+        """Persistent cache of extracted binaries (TEMPORAL_CLI_CACHE_DIR or `cache-dir` config)."""
+        configured = os.environ.get("TEMPORAL_CLI_CACHE_DIR") or self.config.get(
+            "cache-dir"
+        )
+        if configured:
+            return Path(configured)
+        if platform.system() == "Windows":
+            base = Path(
+                os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local")
+            )
+        elif platform.system() == "Darwin":
+            base = Path.home() / "Library" / "Caches"
+        else:
+            base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+        return base / "temporalio-server" / "cli"
+
+    @property
+    def mirror_dir(self):
+        """Local directory holding release assets (TEMPORAL_CLI_MIRROR or `mirror-dir` config)."""
+        configured = os.environ.get("TEMPORAL_CLI_MIRROR") or self.config.get(
+            "mirror-dir"
+        )
+        return Path(configured) if configured else None
+
+    @property
+    def offline(self):
+        """Never touch the network (TEMPORAL_CLI_OFFLINE=1 or `offline = true` config)."""
+        env = os.environ.get("TEMPORAL_CLI_OFFLINE")
+        if env is not None:
+            return env.lower() not in ("", "0", "false", "no")
+        return bool(self.config.get("offline", False))
+
+    def get_expected_sha256(self, asset_name):
+        """Looks up the asset's SHA-256 in the release checksums file.
+
+        The file is read from the mirror, then the cache, and only then
+        downloaded (and cached next to the binaries), so a warm cache builds
+        without the network. Returns None if it is unavailable (offline with
+        neither a mirror nor a cached copy).
+        """
+        checksums_name = f"temporal_cli_{self.CLI_VERSION}_checksums.txt"
+        cached_path = self.cache_dir / self.CLI_VERSION / checksums_name
+        if self.mirror_dir and (self.mirror_dir / checksums_name).is_file():
+            text = (self.mirror_dir / checksums_name).read_text()
+        elif cached_path.is_file():
+            text = cached_path.read_text()
+        elif self.offline:
+            return None
+        else:
+            req = urllib.request.Request(
+                f"{self.release_url}/{checksums_name}", headers=self.HEADERS
+            )
+            with urllib.request.urlopen(req) as response:
+                text = response.read().decode()
+            cached_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cached_path.with_name(f".{checksums_name}.{os.getpid()}.tmp")
+            tmp_path.write_text(text)
+            os.replace(tmp_path, cached_path)
+        for line in text.splitlines():
+            parts = line.split()
+            if len(parts) == 2 and parts[1].lstrip("*") == asset_name:
+                return parts[0].lower()
+        raise RuntimeError(f"No checksum for {asset_name} in {checksums_name}")
+
+    def find_cached_binary(self, goos, goarch, binary_name, sha256):
+        """Returns the cached binary for this version/platform/checksum, if any.
+
+        With no known checksum (offline), any single cached build for the
+        version and platform is used.
+        """
+        platform_dir = self.cache_dir / self.CLI_VERSION / f"{goos}_{goarch}"
+        if sha256 is not None:
+            candidate = platform_dir / sha256 / binary_name
+            return candidate if candidate.is_file() else None
+        candidates = sorted(platform_dir.glob(f"*/{binary_name}"))
+        return candidates[0] if len(candidates) == 1 else None
+
+    def download_and_extract(self, goos=None, goarch=None, target_dir=None):
+        """Places the Temporal CLI binary in the target directory.
+
+        Uses the persistent cache when possible; otherwise streams the archive
+        (from a local mirror or GitHub) straight into the cache, extracting the
+        binary without writing the archive to disk, and verifies its SHA-256
+        against the release checksums.
+        """
+        if goos is None or goarch is None:
+            goos, goarch = self.get_target_platform()
+        target_dir = Path(target_dir) if target_dir else self.target_dir
+        download_url, asset_name, binary_name, archive_ext = self.get_platform_mapping(
+            goos, goarch
+        )
+        final_binary_path = target_dir / binary_name
+
+        expected_sha256 = self.get_expected_sha256(asset_name)
+        cached = self.find_cached_binary(goos, goarch, binary_name, expected_sha256)
+        if cached is None:
+            cached = self.fetch_into_cache(
+                goos,
+                goarch,
+                download_url,
+                asset_name,
+                binary_name,
+                archive_ext,
+                expected_sha256,
+            )
+        else:
+            log.info(f"Using cached binary {cached}")
+
+        shutil.copyfile(cached, final_binary_path)
+        log.info(f"Copied to {final_binary_path}")
+
+        # Make executable (important for non-Windows)
+        if goos != "windows":
+            current_stat = os.stat(final_binary_path)
+            os.chmod(final_binary_path, current_stat.st_mode | stat.S_IEXEC)
+            log.info(f"Made {final_binary_path} executable.")
+        return final_binary_path
+
+    def fetch_into_cache(
+        self,
+        goos,
+        goarch,
+        download_url,
+        asset_name,
+        binary_name,
+        archive_ext,
+        expected_sha256,
+    ):
+        """Streams the archive, extracts the binary into the cache and returns its path."""
+        mirror_path = self.mirror_dir / asset_name if self.mirror_dir else None
+        if mirror_path and mirror_path.is_file():
+            log.info(f"Reading {asset_name} from mirror {self.mirror_dir}...")
+            source = open(mirror_path, "rb")
+        elif self.offline:
+            raise RuntimeError(
+                f"Offline build: {asset_name} is neither cached in {self.cache_dir} "
+                f"nor present in a mirror directory (set TEMPORAL_CLI_MIRROR)."
+            )
+        else:
+            log.info(f"Downloading {asset_name} from {download_url}...")
+            req = urllib.request.Request(download_url, headers=self.HEADERS)
+            source = urllib.request.urlopen(req)
+
+        platform_dir = self.cache_dir / self.CLI_VERSION / f"{goos}_{goarch}"
+        platform_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = platform_dir / f".{binary_name}.{os.getpid()}.tmp"
         try:
-            # Download
-            headers = {"User-Agent": "temporalio-server-build/0.1.0"}
-            req = urllib.request.Request(download_url, headers=headers)
-            with (
-                urllib.request.urlopen(req) as response,
-                open(download_path, "wb") as out_file,
-            ):
-                shutil.copyfileobj(response, out_file)
-            log.info(f"Downloaded to {download_path}")
-
-            # Extract
-            log.info(f"Extracting {binary_name}...")
-            if archive_ext == ".tar.gz":
-                with tarfile.open(download_path, "r:gz") as tar:
-                    member_path = Path(binary_name)  # Assume binary is at root
-                    member_found = None
-                    for member in tar.getmembers():
-                        # Handle potential paths like ./temporal
-                        if Path(member.name).name == binary_name:
-                            member_found = member
-                            break
-                    if not member_found:
-                        raise FileNotFoundError(
-                            f"Binary '{binary_name}' not found in {asset_name}"
-                        )
-
-                    # Extract just the binary file to the target directory
-                    member_found.name = (
-                        binary_name  # Ensure it extracts with the simple name
+            with source:
+                reader = _HashingReader(source)
+                with open(tmp_path, "wb") as out_file:
+                    extract_binary(
+                        reader, archive_ext, binary_name, asset_name, out_file
                     )
-                    tar.extract(member_found, path=self.target_dir)
-
-            elif archive_ext == ".zip":
-                with zipfile.ZipFile(download_path, "r") as zip_ref:
-                    # Need to find the member first to handle potential directory structures
-                    member_path_in_zip = None
-                    for member_info in zip_ref.infolist():
-                        if Path(member_info.filename).name == binary_name:
-                            member_path_in_zip = member_info.filename
-                            break
-                    if not member_path_in_zip:
-                        raise FileNotFoundError(
-                            f"Binary '{binary_name}' not found in {asset_name}"
-                        )
-
-                    # Extract the specific file, placing it directly in target_dir
-                    with open(final_binary_path, "wb") as f_out:
-                        f_out.write(zip_ref.read(member_path_in_zip))
-
-            log.info(f"Extracted to {final_binary_path}")
-
-            # Make executable (important for non-Windows)
-            if platform.system() != "Windows":
-                current_stat = os.stat(final_binary_path)
-                os.chmod(final_binary_path, current_stat.st_mode | stat.S_IEXEC)
-                log.info(f"Made {final_binary_path} executable.")
-
+                reader.drain()
+            actual_sha256 = reader.hexdigest()
+            if expected_sha256 is None:
+                log.warning(
+                    f"No release checksum available for {asset_name}; caching unverified "
+                    f"build with SHA-256 {actual_sha256}."
+                )
+            elif actual_sha256 != expected_sha256:
+                raise RuntimeError(
+                    f"Checksum mismatch for {asset_name}: expected {expected_sha256}, got {actual_sha256}"
+                )
+            cache_path = platform_dir / actual_sha256 / binary_name
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, cache_path)
+            log.info(f"Cached {binary_name} at {cache_path}")
+            return cache_path
         finally:
-            # Clean up downloaded archive
-            if download_path.exists():
-                download_path.unlink()
-                log.info(f"Cleaned up {download_path}")
+            if tmp_path.exists():
+                tmp_path.unlink()
 
     def finalize(self, version, build_data, artifact_path):
         """This method is called after the build process finishes."""
         log.info(
             f"Finalizing build hook for {self.target_name}. Artifact at: {artifact_path}"
         )
+        if getattr(self, "extra_targets", None):
+            try:
+                self.write_platform_wheels(Path(artifact_path))
+            finally:
+                shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def write_platform_wheels(self, base_wheel):
+        """Writes a wheel per extra target, reusing the base wheel's Python payload."""
+        package_bin = "temporalio_server/bin/"
+        payload = []
+        with zipfile.ZipFile(base_wheel) as zf:
+            for info in zf.infolist():
+                if info.filename.startswith(package_bin):
+                    continue
+                if info.filename.endswith(".dist-info/RECORD"):
+                    continue
+                payload.append((info, zf.read(info)))
+
+        name_parts = base_wheel.name[: -len(".whl")].split("-")
+        with ThreadPoolExecutor(max_workers=len(self.extra_targets)) as executor:
+            futures = []
+            for target, binary in self.extra_targets:
+                plat = self.PLATFORM_TAGS[target]
+                wheel_name = "-".join(name_parts[:-3] + ["py3", "none", plat]) + ".whl"
+                futures.append(
+                    executor.submit(
+                        write_wheel,
+                        base_wheel.parent / wheel_name,
+                        payload,
+                        package_bin + binary.name,
+                        binary,
+                        plat,
+                    )
+                )
+            for future in futures:
+                log.info(f"Wrote {future.result()}")
+
+
+def write_wheel(wheel_path, payload, binary_arcname, binary_path, plat):
+    """Writes a wheel from a shared payload plus a platform binary, with fresh WHEEL/RECORD."""
+    tags = [f"py3-none-{p}" for p in plat.split(".")]
+    records = []
+    record_name = None
+    with zipfile.ZipFile(wheel_path, "w", zipfile.ZIP_DEFLATED) as zf:
+
+        def add(info, data):
+            zf.writestr(info, data)
+            digest = base64.urlsafe_b64encode(hashlib.sha256(data).digest())
+            digest_str = digest.rstrip(b"=").decode()
+            records.append(f"{info.filename},sha256={digest_str},{len(data)}")
+
+        # Package files first, then the binary, then .dist-info (which goes last).
+        for info, data in payload:
+            if ".dist-info/" not in info.filename:
+                add(info, data)
+
+        binary_info = zipfile.ZipInfo(binary_arcname, date_time=(2020, 1, 1, 0, 0, 0))
+        binary_info.external_attr = 0o755 << 16
+        binary_info.compress_type = zipfile.ZIP_DEFLATED
+        add(binary_info, Path(binary_path).read_bytes())
+
+        for info, data in payload:
+            if ".dist-info/" not in info.filename:
+                continue
+            if info.filename.endswith(".dist-info/WHEEL"):
+                lines = [
+                    line
+                    for line in data.decode().splitlines()
+                    if not line.startswith("Tag:")
+                ]
+                lines += [f"Tag: {t}" for t in tags]
+                data = ("\n".join(lines) + "\n").encode()
+                record_name = info.filename.rsplit("/", 1)[0] + "/RECORD"
+            add(info, data)
+
+        records.append(f"{record_name},,")
+        zf.writestr(record_name, "\n".join(records) + "\n")
+    return wheel_path
+
+
+class _HashingReader:
+    """File-like wrapper that computes the SHA-256 of everything read through it."""
+
+    def __init__(self, source):
+        self._source = source
+        self._hash = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self._source.read(size)
+        self._hash.update(data)
+        return data
+
+    def drain(self):
+        """Reads (and hashes) whatever the consumer left unread."""
+        while self.read(1 << 20):
+            pass
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+def extract_binary(reader, archive_ext, binary_name, asset_name, out_file):
+    """Extracts `binary_name` from an archive stream into `out_file`."""
+    if archive_ext == ".tar.gz":
+        # Stream mode ("r|gz") reads the archive sequentially, without seeking.
+        with tarfile.open(fileobj=reader, mode="r|gz") as tar:
+            for member in tar:
+                # Handle potential paths like ./temporal
+                if member.isfile() and Path(member.name).name == binary_name:
+                    shutil.copyfileobj(tar.extractfile(member), out_file)
+                    return
+    elif archive_ext == ".zip":
+        # Zip needs random access to its central directory, so buffer it in memory.
+        with zipfile.ZipFile(io.BytesIO(reader.read())) as zip_ref:
+            for member_info in zip_ref.infolist():
+                if Path(member_info.filename).name == binary_name:
+                    with zip_ref.open(member_info) as member:
+                        shutil.copyfileobj(member, out_file)
+                    return
+    raise FileNotFoundError(f"Binary '{binary_name}' not found in {asset_name}")
 
 
 # Example usage if run directly (for testing the download/extract logic)
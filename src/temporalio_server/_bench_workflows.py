@@ -0,0 +1,38 @@
+"""Workflow and activity definitions used by `temporalio_server.bench`.
+
+These live in their own module because the workflow sandbox re-imports the
+module defining a workflow; keeping it free of the harness (asyncio
+subprocesses, DevServer etc.) keeps that cheap and deterministic.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+from temporalio import activity, workflow
+
+
+@dataclass
+class GreetingInput:
+    name: str
+    activities: int = 1
+
+
+@activity.defn
+def say_hello(name: str) -> str:
+    return f"Hello, {name}!"
+
+
+@workflow.defn
+class BenchGreetingWorkflow:
+    """The hello_activity.py greeting, calling the activity `activities` times."""
+
+    @workflow.run
+    async def run(self, input: GreetingInput) -> str:
+        result = ""
+        for _ in range(input.activities):
+            result = await workflow.execute_activity(
+                say_hello,
+                input.name,
+                start_to_close_timeout=timedelta(seconds=10),
+            )
+        return result
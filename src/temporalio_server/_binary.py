@@ -0,0 +1,203 @@
+import functools
+import logging
+import os
+import platform
+from importlib import resources
+from pathlib import Path
+from typing import IO, Dict, Optional, Tuple, Union
+
+log = logging.getLogger(__name__)
+
+BINARY_NAME = "temporal.exe" if platform.system() == "Windows" else "temporal"
+_DISTRIBUTION = "dandavison-temporalio-server"
+
+
+@functools.lru_cache(maxsize=None)
+def get_binary_path(version: Optional[str] = None) -> Path:
+    """Find the path to a temporal binary.
+
+    Args:
+        version: CLI version, e.g. "1.3.0". Defaults to the bundled binary.
+            Other versions must have been added to the binary store with
+            `add_binary` (or `dandavison-temporalio-server binaries add`).
+
+    The result is cached for the life of the process.
+    """
+    if version is None:
+        return _bundled_binary_path()
+    stored = installed_versions().get(version)
+    if stored is not None and stored.is_file():
+        return stored
+    if version == get_cli_version():
+        return _bundled_binary_path()
+    available = ", ".join(sorted(installed_versions())) or "none"
+    raise FileNotFoundError(
+        f"Temporal CLI {version} is not installed (bundled: {get_cli_version()}, stored: {available})."
+    )
+
+
+def _bundled_binary_path() -> Path:
+    try:
+        package_files = resources.files("temporalio_server")
+        binary_traversable = package_files / "bin" / BINARY_NAME
+        if not binary_traversable.is_file():
+            raise FileNotFoundError(f"Binary not found at path: {binary_traversable}")
+        if isinstance(binary_traversable, Path):
+            # Regular installs: the binary is already a file on disk.
+            return binary_traversable
+        # Zip and other non-filesystem installs: extract into the binary store
+        # once, rather than to a temporary file that as_file() would delete.
+        # The wheel's RECORD gives the store key without reading the binary.
+        digest = _recorded_sha256()
+        if digest is not None:
+            stored = store_dir() / digest / BINARY_NAME
+            if stored.is_file():
+                return stored
+        with binary_traversable.open("rb") as f:
+            return _store(f)
+    except (ModuleNotFoundError, FileNotFoundError, NotADirectoryError, TypeError) as e:
+        log.error(
+            f"Could not find bundled temporal binary '{BINARY_NAME}'. Build failed? {e}"
+        )
+        raise FileNotFoundError("Temporal CLI binary not found.") from e
+    except Exception as e:
+        log.error(f"Error finding binary path: {e}")
+        raise
+
+
+def _recorded_sha256() -> Optional[str]:
+    """The bundled binary's SHA-256 (hex) from the installed wheel's RECORD, if any."""
+    import base64
+    from importlib import metadata
+
+    try:
+        files = metadata.distribution(_DISTRIBUTION).files or []
+    except metadata.PackageNotFoundError:
+        return None
+    for file in files:
+        if file.parts != ("temporalio_server", "bin", BINARY_NAME):
+            continue
+        if file.hash is None or file.hash.mode != "sha256":
+            return None
+        value = file.hash.value
+        return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)).hex()
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def get_cli_version() -> str:
+    """Return the version of the bundled temporal CLI, e.g. "1.3.0"."""
+    return _read_version(get_binary_path())
+
+
+def _read_version(binary: Path) -> str:
+    import re
+    import subprocess
+
+    output = subprocess.run(
+        [str(binary), "--version"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    match = re.search(r"version (\S+)", output)
+    if not match:
+        raise RuntimeError(f"Could not parse temporal CLI version from: {output!r}")
+    return match.group(1)
+
+
+def store_dir() -> Path:
+    """Directory of the runtime binary store: <cache>/bin/<sha256>/temporal."""
+    from ._util import user_cache_dir
+
+    return user_cache_dir() / "bin"
+
+
+def installed_versions() -> Dict[str, Path]:
+    """Return the binaries in the store by CLI version."""
+    import json
+
+    try:
+        index = json.loads((store_dir() / "versions.json").read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+    return {
+        version: store_dir() / digest / BINARY_NAME for version, digest in index.items()
+    }
+
+
+def add_binary(source: Union[str, Path]) -> Tuple[str, Path]:
+    """Copy a temporal binary into the store and register its version.
+
+    Returns the version and the stored path. Adding the same binary again is
+    a no-op, since binaries are stored by content hash.
+    """
+    import json
+
+    from ._util import FileLock, atomic_write_text
+
+    with open(source, "rb") as f:
+        path = _store(f)
+    version = _read_version(path)
+    index_path = store_dir() / "versions.json"
+    with FileLock(store_dir() / "store.lock"):
+        try:
+            index = json.loads(index_path.read_text())
+        except (FileNotFoundError, ValueError):
+            index = {}
+        index[version] = path.parent.name
+        atomic_write_text(index_path, json.dumps(index, indent=2, sort_keys=True))
+    get_binary_path.cache_clear()
+    log.info(f"Added temporal CLI {version} to the binary store: {path}")
+    return version, path
+
+
+def _store(f: IO[bytes]) -> Path:
+    """Write the binary read from `f` into the store under its SHA-256, if not already there."""
+    import hashlib
+    import threading
+
+    from ._util import FileLock
+
+    store = store_dir()
+    store.mkdir(parents=True, exist_ok=True)
+    tmp_path = store / f".incoming-{os.getpid()}-{threading.get_ident()}"
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_path, "wb") as out:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+                out.write(chunk)
+        path = store / digest.hexdigest() / BINARY_NAME
+        with FileLock(store / "store.lock"):
+            if not path.is_file():
+                path.parent.mkdir(exist_ok=True)
+                os.chmod(tmp_path, 0o755)
+                os.replace(tmp_path, path)
+                log.debug(f"Stored temporal binary at {path}")
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return path
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="binaries", description="Manage the temporal CLI binary store."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List the bundled and stored CLI versions.")
+    add = commands.add_parser("add", help="Add a temporal binary to the store.")
+    add.add_argument("path", type=Path)
+    args = parser.parse_args(argv)
+
+    if args.command == "add":
+        version, path = add_binary(args.path)
+        print(f"{version}\t{path}")
+        return 0
+    print(f"{get_cli_version()}\t{get_binary_path()}\t(bundled)")
+    for version, path in sorted(installed_versions().items()):
+        print(f"{version}\t{path}")
+    return 0
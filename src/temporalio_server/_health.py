@@ -0,0 +1,164 @@
+"""Minimal gRPC health check client.
+
+Speaks just enough HTTP/2 to call `grpc.health.v1.Health/Check` without
+depending on grpcio: a single request on stream 1, and a response that is
+recognised from its DATA frame alone (no HPACK decoding is needed).
+"""
+
+import asyncio
+import struct
+from typing import Tuple
+
+WORKFLOW_SERVICE = "temporal.api.workflowservice.v1.WorkflowService"
+
+_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+_DATA, _HEADERS, _RST_STREAM, _SETTINGS, _PING, _GOAWAY = 0x0, 0x1, 0x3, 0x4, 0x6, 0x7
+_FLAG_END_STREAM = 0x1
+_FLAG_ACK = 0x1
+_FLAG_END_HEADERS = 0x4
+_SERVING = 1
+
+
+async def check_health(
+    host: str, port: int, *, service: str = WORKFLOW_SERVICE, timeout: float = 1.0
+) -> bool:
+    """Return True if the gRPC server at host:port reports `service` as SERVING.
+
+    Any connection or protocol failure counts as not serving.
+    """
+    try:
+        return await asyncio.wait_for(_check(host, port, service), timeout)
+    except (
+        OSError,
+        asyncio.TimeoutError,
+        asyncio.IncompleteReadError,
+        IndexError,
+        ValueError,
+    ):
+        return False
+
+
+async def _check(host: str, port: int, service: str) -> bool:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(_request(f"{host}:{port}", service))
+        await writer.drain()
+        body = b""
+        while True:
+            frame_type, flags, stream_id, payload = await _read_frame(reader)
+            if frame_type == _SETTINGS and not flags & _FLAG_ACK:
+                writer.write(_frame(_SETTINGS, _FLAG_ACK, 0, b""))
+            elif frame_type == _PING and not flags & _FLAG_ACK:
+                writer.write(_frame(_PING, _FLAG_ACK, 0, payload))
+            elif frame_type in (_RST_STREAM, _GOAWAY):
+                return False
+            elif stream_id == 1 and frame_type == _DATA:
+                body += payload
+                if len(body) >= 5:
+                    (length,) = struct.unpack(">I", body[1:5])
+                    if len(body) >= 5 + length:
+                        return _parse_status(body[5 : 5 + length]) == _SERVING
+            elif stream_id == 1 and frame_type == _HEADERS and flags & _FLAG_END_STREAM:
+                # Trailers without a response message: the call failed.
+                return False
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+
+def _request(authority: str, service: str) -> bytes:
+    headers = b"".join(
+        _literal_header(name, value)
+        for name, value in (
+            (":method", "POST"),
+            (":scheme", "http"),
+            (":path", "/grpc.health.v1.Health/Check"),
+            (":authority", authority),
+            ("content-type", "application/grpc"),
+            ("te", "trailers"),
+        )
+    )
+    message = b"\x0a" + _varint(len(service.encode())) + service.encode()
+    grpc_message = b"\x00" + struct.pack(">I", len(message)) + message
+    return (
+        _PREFACE
+        + _frame(_SETTINGS, 0, 0, b"")
+        + _frame(_HEADERS, _FLAG_END_HEADERS, 1, headers)
+        + _frame(_DATA, _FLAG_END_STREAM, 1, grpc_message)
+    )
+
+
+def _frame(frame_type: int, flags: int, stream_id: int, payload: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(payload))[1:]
+        + bytes((frame_type, flags))
+        + struct.pack(">I", stream_id)
+        + payload
+    )
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Tuple[int, int, int, bytes]:
+    header = await reader.readexactly(9)
+    length = int.from_bytes(header[:3], "big")
+    (stream_id,) = struct.unpack(">I", header[5:9])
+    payload = await reader.readexactly(length)
+    return header[3], header[4], stream_id & 0x7FFFFFFF, payload
+
+
+def _literal_header(name: str, value: str) -> bytes:
+    # HPACK "literal header field without indexing -- new name", no Huffman coding.
+    name_bytes, value_bytes = name.encode(), value.encode()
+    return (
+        b"\x00"
+        + _hpack_int(len(name_bytes), 7)
+        + name_bytes
+        + _hpack_int(len(value_bytes), 7)
+        + value_bytes
+    )
+
+
+def _hpack_int(value: int, prefix_bits: int) -> bytes:
+    max_prefix = (1 << prefix_bits) - 1
+    if value < max_prefix:
+        return bytes((value,))
+    out = bytearray((max_prefix,))
+    value -= max_prefix
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _parse_status(message: bytes) -> int:
+    # HealthCheckResponse has a single field: `ServingStatus status = 1` (varint).
+    i = 0
+    while i < len(message):
+        key = message[i]
+        i += 1
+        if key & 0x7 != 0:
+            raise ValueError(f"Unexpected field in HealthCheckResponse: {key:#x}")
+        value = 0
+        shift = 0
+        while True:
+            byte = message[i]
+            i += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        if key == 0x08:
+            return value
+    return 0
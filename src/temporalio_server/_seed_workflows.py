@@ -0,0 +1,23 @@
+"""The workflow used by `temporalio_server.seed` to bring seeded workflows to a closed state.
+
+Kept in its own module for the same reason as `_bench_workflows`: the
+workflow sandbox re-imports the module defining a workflow.
+"""
+
+from collections.abc import Sequence
+
+from temporalio import workflow
+from temporalio.common import RawValue
+from temporalio.exceptions import ApplicationError
+
+STATE_MEMO_KEY = "seed_state"
+
+
+@workflow.defn(dynamic=True)
+class SeedWorkflow:
+    """Completes or fails any workflow type, according to its "seed_state" memo."""
+
+    @workflow.run
+    async def run(self, args: Sequence[RawValue]) -> None:
+        if workflow.memo_value(STATE_MEMO_KEY, "completed") == "failed":
+            raise ApplicationError("Seeded failure", non_retryable=True)
@@ -0,0 +1,222 @@
+import json
+import os
+import shutil
+import socket
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, Optional, Sequence, Union
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+# ioctl request number for FICLONE (share all blocks of one file with another).
+_FICLONE = 0x40049409
+
+
+def find_free_port(ip: str = "127.0.0.1") -> int:
+    """Ask the OS for a currently unused TCP port on `ip`."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((ip, 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Linearly interpolated percentile of already-sorted values (q in [0, 100])."""
+    if not sorted_values:
+        return float("nan")
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def pid_alive(pid: int) -> bool:
+    """Return True if a process with this PID exists."""
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        ok = kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return bool(ok) and exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    # Never reap it here: that would take the exit status from whoever owns
+    # the process (asyncio's child watcher, a Popen). Just don't count zombies.
+    return not _is_zombie(pid)
+
+
+def _is_zombie(pid: int) -> bool:
+    """Return True if /proc shows the process has exited but not been reaped (Linux)."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return False
+    # The command name may contain spaces and parentheses; the state follows the last ')'.
+    return stat[stat.rfind(b")") + 2 : stat.rfind(b")") + 3] == b"Z"
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write `text` to `path` so that readers never see a partial file."""
+    tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, path)
+
+
+def user_cache_dir() -> Path:
+    """Per-user cache directory, overridable with TEMPORALIO_SERVER_CACHE_DIR."""
+    override = os.environ.get("TEMPORALIO_SERVER_CACHE_DIR")
+    if override:
+        return Path(override)
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base / "temporalio-server"
+
+
+def clone_file(src: Union[str, Path], dst: Union[str, Path]) -> None:
+    """Copy `src` to `dst` as cheaply as the filesystem allows.
+
+    Tries a reflink (FICLONE), then an in-kernel copy_file_range, and falls
+    back to shutil.copyfile (which itself uses sendfile/fcopyfile).
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if sys.platform == "linux":
+            try:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+                return
+            except OSError:
+                pass
+        if hasattr(os, "copy_file_range"):
+            remaining = os.fstat(fsrc.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            except OSError:
+                pass
+            if remaining == 0:
+                return
+    shutil.copyfile(src, dst)
+
+
+def remove_db_files(path: Union[str, Path]) -> None:
+    """Remove a SQLite database file and its journal/WAL side files, if present."""
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        try:
+            os.unlink(f"{path}{suffix}")
+        except FileNotFoundError:
+            pass
+
+
+def checkpoint_db(src: Union[str, Path], dst: Union[str, Path]) -> None:
+    """Atomically replace `dst` with a consistent copy of the live SQLite database `src`.
+
+    Uses the SQLite online backup API, so `src` may be in use by another
+    process; the copy is written next to `dst`, fsynced and renamed over it.
+    """
+    import sqlite3
+
+    dst = Path(dst)
+    tmp_path = dst.with_name(f"{dst.name}.tmp-{os.getpid()}")
+    remove_db_files(tmp_path)
+    try:
+        source = sqlite3.connect(f"file:{src}?mode=ro", uri=True, timeout=10)
+        try:
+            target = sqlite3.connect(tmp_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+        finally:
+            source.close()
+        fd = os.open(tmp_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, dst)
+    finally:
+        remove_db_files(tmp_path)
+
+
+class FileLock:
+    """Exclusive inter-process lock on a lock file.
+
+    Example:
+        with FileLock(cache_dir / "registry.lock"):
+            ...
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._file: Optional[IO[bytes]] = None
+
+    def acquire(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a+b")
+        if sys.platform == "win32":
+            while True:
+                try:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    return
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s; keep waiting
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        if sys.platform == "win32":
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
+
+
+@contextmanager
+def locked_leases(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield the leases in a JSON lease file under its lock; changes are saved on exit.
+
+    Leases map a token to a dict with the "pid" of the holding process;
+    leases of processes that have exited are dropped.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with FileLock(path.with_suffix(".lock")):
+        try:
+            leases = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            leases = {}
+        for token in [t for t, lease in leases.items() if not pid_alive(lease["pid"])]:
+            del leases[token]
+        yield leases
+        atomic_write_text(path, json.dumps(leases, indent=2))
@@ -0,0 +1,357 @@
+"""End-to-end workflow throughput and latency benchmark.
+
+Starts a DevServer and workers, then drives a closed-loop (fixed concurrency)
+or open-loop (fixed start rate) load of the hello_activity.py greeting
+workflow, and reports workflows/sec, start-to-complete latency and errors as
+JSON. Run with `dandavison-temporalio-server bench` or
+`python -m temporalio_server.bench`; requires the `temporalio` package
+(`pip install dandavison-temporalio-server[bench]`).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import time
+import uuid
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from ._binary import get_cli_version
+from .lifecycle_bench import summarize
+from .server import DevServer
+
+log = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; a final bucket catches the rest.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+@dataclass
+class BenchConfig:
+    """Load shape for one benchmark run.
+
+    Attributes:
+        workflows: Number of measured workflows.
+        warmup: Workflows run (closed loop) before measuring.
+        concurrency: Closed loop: workflows kept in flight.
+        rate: Open loop: workflow starts per second. Overrides `concurrency`.
+            Latency is measured from each workflow's scheduled start, so a
+            client that falls behind shows up as latency.
+        activities: Activity calls per workflow.
+        payload_size: Size in bytes of the activity argument.
+        workers: Number of Worker instances polling the task queue.
+        worker_processes: Run the workers in this many separate processes
+            instead of in the benchmark process (see `DevServer.spawn_workers`).
+        activity_threads: Activity thread pool size per worker.
+        workflow_timeout: Execution timeout for each workflow, in seconds.
+    """
+
+    workflows: int = 1000
+    warmup: int = 50
+    concurrency: int = 50
+    rate: Optional[float] = None
+    activities: int = 1
+    payload_size: int = 0
+    workers: int = 1
+    worker_processes: int = 0
+    activity_threads: int = 16
+    workflow_timeout: float = 60.0
+
+    @property
+    def mode(self) -> str:
+        return "open" if self.rate else "closed"
+
+
+class _Results:
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.errors: Counter = Counter()
+
+
+async def run_bench(
+    config: BenchConfig,
+    server: Optional[DevServer] = None,
+    **server_kwargs: Any,
+) -> Dict[str, Any]:
+    """Run one benchmark and return a JSON-serializable report.
+
+    Args:
+        config: Load shape.
+        server: Use this running server instead of starting one.
+        server_kwargs: DevServer keyword arguments when starting a server.
+    """
+    try:
+        from temporalio.client import Client
+        from temporalio.worker import Worker
+
+        from . import _bench_workflows as wf
+    except ImportError as e:
+        raise RuntimeError(
+            "The bench harness requires the temporalio package: "
+            "pip install dandavison-temporalio-server[bench]"
+        ) from e
+
+    async with AsyncExitStack() as stack:
+        if server is None:
+            server_kwargs.setdefault("port", 0)
+            server_kwargs.setdefault("ui_port", 0)
+            server = await stack.enter_async_context(DevServer(**server_kwargs))
+        client = await Client.connect(server.target)
+        task_queue = f"bench-{uuid.uuid4().hex[:8]}"
+        if config.worker_processes:
+            worker_group = await server.spawn_workers(
+                config.worker_processes,
+                task_queue=task_queue,
+                workflows=[wf.BenchGreetingWorkflow],
+                activities=[wf.say_hello],
+                activity_threads=config.activity_threads,
+                worker_kwargs={"max_concurrent_activities": config.activity_threads},
+            )
+            stack.push_async_callback(worker_group.stop)
+        for _ in range(0 if config.worker_processes else config.workers):
+            executor = stack.enter_context(
+                ThreadPoolExecutor(max_workers=config.activity_threads)
+            )
+            await stack.enter_async_context(
+                Worker(
+                    client,
+                    task_queue=task_queue,
+                    workflows=[wf.BenchGreetingWorkflow],
+                    activities=[wf.say_hello],
+                    activity_executor=executor,
+                    max_concurrent_activities=config.activity_threads,
+                )
+            )
+
+        workflow_input = wf.GreetingInput(
+            name="Temporal".ljust(config.payload_size, "x"),
+            activities=config.activities,
+        )
+
+        async def execute(i: int, scheduled: float, results: _Results) -> None:
+            try:
+                await client.execute_workflow(
+                    wf.BenchGreetingWorkflow.run,
+                    workflow_input,
+                    id=f"{task_queue}-{i}",
+                    task_queue=task_queue,
+                    execution_timeout=timedelta(seconds=config.workflow_timeout),
+                )
+            except Exception as e:
+                results.errors[type(e).__name__] += 1
+                log.debug(f"Workflow {i} failed: {e}")
+            else:
+                results.latencies.append(time.perf_counter() - scheduled)
+
+        if config.warmup:
+            log.info(f"Warming up with {config.warmup} workflows...")
+            await _closed_loop(execute, 0, config.warmup, config.concurrency)
+        log.info(
+            f"Running {config.workflows} workflows ({config.mode} loop) on {server.target}..."
+        )
+        t0 = time.perf_counter()
+        if config.rate:
+            results = await _open_loop(
+                execute, config.warmup, config.workflows, config.rate
+            )
+        else:
+            results = await _closed_loop(
+                execute, config.warmup, config.workflows, config.concurrency
+            )
+        elapsed = time.perf_counter() - t0
+
+    return {
+        "cli_version": get_cli_version(),
+        "python": platform.python_version(),
+        "platform": f"{platform.system()}-{platform.machine()}",
+        "timestamp": time.time(),
+        "config": {**asdict(config), "mode": config.mode},
+        "duration": elapsed,
+        "completed": len(results.latencies),
+        "errors": dict(results.errors),
+        "workflows_per_sec": len(results.latencies) / elapsed if elapsed else 0.0,
+        "latency": summarize(results.latencies) if results.latencies else None,
+        "histogram": histogram(results.latencies),
+    }
+
+
+async def _closed_loop(execute, start: int, count: int, concurrency: int) -> _Results:
+    results = _Results()
+    indices = iter(range(start, start + count))
+
+    async def loop() -> None:
+        for i in indices:
+            await execute(i, time.perf_counter(), results)
+
+    await asyncio.gather(*(loop() for _ in range(min(concurrency, count))))
+    return results
+
+
+async def _open_loop(execute, start: int, count: int, rate: float) -> _Results:
+    results = _Results()
+    tasks = []
+    t0 = time.perf_counter()
+    for n in range(count):
+        scheduled = t0 + n / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(execute(start + n, scheduled, results)))
+    await asyncio.gather(*tasks)
+    return results
+
+
+def histogram(latencies: Sequence[float]) -> Dict[str, int]:
+    """Count latencies into LATENCY_BUCKETS_MS, keyed by bucket upper bound."""
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for latency in latencies:
+        counts[bisect_left(LATENCY_BUCKETS_MS, latency * 1000)] += 1
+    keys = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["inf"]
+    return dict(zip(keys, counts))
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Describe throughput drops and p50/p95 latency increases beyond `threshold`."""
+    regressions = []
+    old, new = baseline["workflows_per_sec"], current["workflows_per_sec"]
+    if old > 0 and (old - new) / old > threshold:
+        regressions.append(f"throughput: {old:.1f}/s -> {new:.1f}/s")
+    if baseline["latency"] and current["latency"]:
+        for stat in ("p50", "p95"):
+            old, new = baseline["latency"][stat], current["latency"][stat]
+            if old > 0 and (new - old) / old > threshold:
+                regressions.append(
+                    f"latency {stat}: {old * 1000:.1f}ms -> {new * 1000:.1f}ms"
+                )
+    return [
+        f"{r} (CLI {baseline['cli_version']} -> {current['cli_version']})"
+        for r in regressions
+    ]
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    config = report["config"]
+    lines = [
+        f"temporal CLI {report['cli_version']}, {config['mode']} loop, "
+        f"{report['completed']} workflows in {report['duration']:.2f}s",
+        f"throughput      {report['workflows_per_sec']:.1f} workflows/s",
+    ]
+    if report["latency"]:
+        s = report["latency"]
+        lines.append(
+            f"latency ms      p50 {s['p50'] * 1000:.1f}  p95 {s['p95'] * 1000:.1f}  "
+            f"p99 {s['p99'] * 1000:.1f}  max {s['max'] * 1000:.1f}"
+        )
+    errors = sum(report["errors"].values())
+    lines.append(
+        f"errors          {errors} {report['errors'] if errors else ''}".rstrip()
+    )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="bench", description=__doc__.splitlines()[0])
+    defaults = BenchConfig()
+    parser.add_argument("-n", "--workflows", type=int, default=defaults.workflows)
+    parser.add_argument("--warmup", type=int, default=defaults.warmup)
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=defaults.concurrency,
+        help="Closed loop: workflows kept in flight.",
+    )
+    parser.add_argument(
+        "-r",
+        "--rate",
+        type=float,
+        help="Open loop: workflow starts per second (instead of --concurrency).",
+    )
+    parser.add_argument("--activities", type=int, default=defaults.activities)
+    parser.add_argument("--payload-size", type=int, default=defaults.payload_size)
+    parser.add_argument("--workers", type=int, default=defaults.workers)
+    parser.add_argument(
+        "--worker-processes",
+        type=int,
+        default=defaults.worker_processes,
+        help="Run workers in this many separate processes (default: in-process).",
+    )
+    parser.add_argument(
+        "--activity-threads", type=int, default=defaults.activity_threads
+    )
+    parser.add_argument("--db-filename", help="Use a SQLite database file.")
+    parser.add_argument(
+        "--dynamic-config",
+        help="Server dynamic config preset(s), comma-separated, e.g. high-throughput.",
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        help="Add this one-way network latency between clients and the server.",
+    )
+    parser.add_argument(
+        "--jitter-ms", type=float, default=0.0, help="Jitter for --latency-ms."
+    )
+    parser.add_argument("-o", "--output", type=Path, help="Write JSON results here.")
+    parser.add_argument(
+        "--compare", type=Path, help="Baseline JSON results to compare against."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative change that counts as a regression (default 0.2).",
+    )
+    args = parser.parse_args(argv)
+
+    config = BenchConfig(
+        workflows=args.workflows,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        activities=args.activities,
+        payload_size=args.payload_size,
+        workers=args.workers,
+        worker_processes=args.worker_processes,
+        activity_threads=args.activity_threads,
+    )
+    server_kwargs: Dict[str, Any] = {}
+    if args.db_filename:
+        server_kwargs["db_filename"] = args.db_filename
+    if args.dynamic_config:
+        server_kwargs["dynamic_config"] = args.dynamic_config
+    if args.latency_ms:
+        from .network import NetworkProfile
+
+        server_kwargs["network"] = NetworkProfile(
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms
+        )
+    report = asyncio.run(run_bench(config, **server_kwargs))
+    print(format_report(report))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.output}")
+    if args.compare:
+        regressions = compare(
+            json.loads(args.compare.read_text()), report, args.threshold
+        )
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""Shared, long-lived dev server daemon.
+
+One background server is started per daemon name, and its target, PID and
+ports are recorded in a lock-protected registry file in the user cache
+directory. Clients (`DevServer(shared=True)`, other processes, notebooks)
+attach to it by reading the registry instead of spawning their own server.
+Attached clients are reference-counted by PID; the daemon shuts itself down
+once it has had no live clients for `idle_timeout` seconds.
+
+Command line:
+    dandavison-temporalio-server daemon start [--name NAME] [--idle-timeout S]
+    dandavison-temporalio-server daemon status [--name NAME]
+    dandavison-temporalio-server daemon stop [--name NAME]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from ._util import FileLock, atomic_write_text, pid_alive, user_cache_dir
+from .server import DevServer
+
+log = logging.getLogger(__name__)
+
+DEFAULT_NAME = "default"
+DEFAULT_IDLE_TIMEOUT = 60.0
+_POLL_INTERVAL = 0.5
+_ATTACH_ATTEMPTS = 3
+
+# Daemons spawned by this process, polled so that they are reaped once they exit.
+_children: Dict[int, subprocess.Popen] = {}
+
+
+def registry_dir() -> Path:
+    return user_cache_dir() / "daemon"
+
+
+@contextmanager
+def _locked_registry(name: str) -> Iterator[Dict[str, Any]]:
+    """Yield the registry entry for `name` under its lock; changes are saved on exit.
+
+    An empty dict means no daemon is registered; clear it to remove the entry.
+    """
+    path = registry_dir() / f"{name}.json"
+    with FileLock(path.with_suffix(".lock")):
+        try:
+            entry = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            entry = {}
+        if entry and not _daemon_alive(entry["pid"]):
+            log.debug(f"Removing stale daemon registry entry for PID {entry['pid']}")
+            entry = {}
+        before = dict(entry)
+        yield entry
+        if entry != before:
+            if entry:
+                atomic_write_text(path, json.dumps(entry, indent=2))
+            else:
+                path.unlink(missing_ok=True)
+
+
+def _accepting(entry: Dict[str, Any]) -> bool:
+    """Whether a registered daemon is (or is about to be) serving new clients."""
+    return entry.get("state") in ("starting", "ready") and not entry.get(
+        "stop_requested"
+    )
+
+
+def status(name: str = DEFAULT_NAME) -> Optional[Dict[str, Any]]:
+    """Return the registry entry for a running daemon, or None."""
+    with _locked_registry(name) as entry:
+        return dict(entry) if entry else None
+
+
+def start(
+    name: str = DEFAULT_NAME,
+    *,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    timeout: float = 30.0,
+    **server_kwargs: Any,
+) -> Dict[str, Any]:
+    """Start the named daemon if it is not running, and wait until it is ready.
+
+    A daemon that is shutting down is waited for, and then replaced.
+
+    Args:
+        name: Daemon name; each name is an independent server.
+        idle_timeout: Seconds without attached clients before the daemon exits.
+        timeout: Seconds to wait for the daemon to become ready.
+        server_kwargs: DevServer keyword arguments, used only when starting a new
+            daemon. Ports default to free ports rather than 7233/8233.
+    """
+    deadline = time.monotonic() + timeout
+    spawned: Optional[int] = None
+    while True:
+        with _locked_registry(name) as entry:
+            if not entry:
+                if spawned is not None:
+                    raise RuntimeError(
+                        f"Daemon '{name}' [PID: {spawned}] exited during startup. See {_log_path(name)}"
+                    )
+                entry.update(_spawn_daemon(name, idle_timeout, server_kwargs))
+                spawned = entry["pid"]
+            current = dict(entry)
+        if current["state"] == "ready" and _accepting(current):
+            return current
+        if time.monotonic() >= deadline:
+            raise TimeoutError(
+                f"Daemon '{name}' [PID: {current['pid']}] did not become ready within {timeout:.1f}s."
+            )
+        # Starting up, or shutting down: in the latter case the entry is
+        # removed once the process has exited, and a new daemon is spawned.
+        time.sleep(0.02)
+
+
+def attach(name: str = DEFAULT_NAME, **start_kwargs: Any) -> Dict[str, Any]:
+    """Register this process as a client of the named daemon, starting it if needed.
+
+    Returns the registry entry plus a "token" to pass to `detach`.
+    """
+    token = uuid.uuid4().hex
+    for _ in range(_ATTACH_ATTEMPTS):
+        start(name, **start_kwargs)
+        with _locked_registry(name) as entry:
+            # The daemon decides to stop under this lock, so a client
+            # registered with a ready daemon is always seen by it.
+            if entry and entry["state"] == "ready" and _accepting(entry):
+                entry["clients"] = [
+                    *entry["clients"],
+                    {"pid": os.getpid(), "token": token},
+                ]
+                return {**entry, "token": token}
+        log.debug(f"Daemon '{name}' began shutting down before it could be attached.")
+    raise RuntimeError(f"Daemon '{name}' shut down before it could be attached.")
+
+
+def detach(token: str, name: str = DEFAULT_NAME) -> None:
+    """Unregister a client previously registered with `attach`."""
+    with _locked_registry(name) as entry:
+        if entry:
+            entry["clients"] = [c for c in entry["clients"] if c["token"] != token]
+
+
+def stop(name: str = DEFAULT_NAME, timeout: float = 15.0) -> bool:
+    """Ask the named daemon to shut down and wait for it. Returns False if none was running."""
+    with _locked_registry(name) as entry:
+        if not entry:
+            return False
+        entry["stop_requested"] = True
+        pid = entry["pid"]
+    deadline = time.monotonic() + timeout
+    while _daemon_alive(pid):
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Daemon '{name}' [PID: {pid}] did not stop.")
+        time.sleep(0.05)
+    return True
+
+
+def _daemon_alive(pid: int) -> bool:
+    child = _children.get(pid)
+    if child is not None and child.poll() is not None:
+        del _children[pid]
+        return False
+    return pid_alive(pid)
+
+
+def _log_path(name: str) -> Path:
+    return registry_dir() / f"{name}.log"
+
+
+def _spawn_daemon(
+    name: str, idle_timeout: float, server_kwargs: Dict[str, Any]
+) -> Dict[str, Any]:
+    args = [
+        sys.executable,
+        "-m",
+        "temporalio_server.daemon",
+        "run",
+        "--name",
+        name,
+        "--idle-timeout",
+        str(idle_timeout),
+        "--server-kwargs",
+        json.dumps(server_kwargs),
+    ]
+    log_path = _log_path(name)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    if sys.platform == "win32":
+        detach_kwargs: Dict[str, Any] = {
+            "creationflags": subprocess.DETACHED_PROCESS
+            | subprocess.CREATE_NEW_PROCESS_GROUP
+        }
+    else:
+        detach_kwargs = {"start_new_session": True}
+    with open(log_path, "ab") as log_file:
+        process = subprocess.Popen(
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            **detach_kwargs,
+        )
+    _children[process.pid] = process
+    log.info(f"Started daemon '{name}' [PID: {process.pid}], logging to {log_path}")
+    return {
+        "pid": process.pid,
+        "state": "starting",
+        "clients": [],
+        "idle_timeout": idle_timeout,
+    }
+
+
+async def run_daemon(
+    name: str, idle_timeout: float, server_kwargs: Dict[str, Any]
+) -> None:
+    """Run the daemon in this process until it is idle or asked to stop."""
+    server_kwargs.setdefault("port", 0)
+    server_kwargs.setdefault("ui_port", 0)
+    stop_event = asyncio.Event()
+    if sys.platform != "win32":
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop_event.set)
+
+    async with DevServer(**server_kwargs) as server:
+        with _locked_registry(name) as entry:
+            entry.update(
+                pid=os.getpid(),
+                state="ready",
+                target=server.target,
+                ip=server.ip,
+                port=server.port,
+                ui_port=server.ui_port,
+                server_pid=server.process.pid if server.process else None,
+                metrics_url=server.metrics_url,
+                started=time.time(),
+            )
+        log.info(f"Daemon '{name}' ready on {server.target}")
+        idle_since: Optional[float] = time.monotonic()
+        while True:
+            reason: Optional[str] = None
+            # Decide to stop, and say so, under one lock: `attach` only
+            # registers clients with a daemon that is still "ready".
+            with _locked_registry(name) as entry:
+                entry["clients"] = [c for c in entry["clients"] if pid_alive(c["pid"])]
+                if entry["clients"]:
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = time.monotonic()
+                if server.process is None or server.process.returncode is not None:
+                    reason = "Server process exited"
+                elif stop_event.is_set() or entry.get("stop_requested"):
+                    reason = "Stop requested"
+                elif (
+                    idle_since is not None
+                    and time.monotonic() - idle_since >= idle_timeout
+                ):
+                    reason = f"No clients for {idle_timeout:.0f}s"
+                if reason is not None:
+                    entry["state"] = "stopping"
+            if reason is not None:
+                log.info(f"{reason}; stopping daemon.")
+                break
+            try:
+                await asyncio.wait_for(stop_event.wait(), _POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+    with _locked_registry(name) as entry:
+        if entry.get("pid") == os.getpid():
+            entry.clear()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="daemon", description="Manage a shared background dev server."
+    )
+    parser.add_argument("command", choices=("start", "status", "stop", "run"))
+    parser.add_argument("--name", default=DEFAULT_NAME)
+    parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT)
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--ui-port", type=int)
+    parser.add_argument("--db-filename")
+    parser.add_argument("--namespace", action="append")
+    parser.add_argument("--server-kwargs", default="{}", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    server_kwargs: Dict[str, Any] = json.loads(args.server_kwargs)
+    for key in ("port", "ui_port", "db_filename", "namespace"):
+        if getattr(args, key) is not None:
+            server_kwargs[key] = getattr(args, key)
+
+    if args.command == "run":
+        logging.basicConfig(
+            level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+        )
+        asyncio.run(run_daemon(args.name, args.idle_timeout, server_kwargs))
+        return 0
+    if args.command == "start":
+        entry = start(args.name, idle_timeout=args.idle_timeout, **server_kwargs)
+        print(entry["target"])
+        return 0
+    if args.command == "status":
+        entry = status(args.name)
+        if entry is None:
+            print(f"Daemon '{args.name}' is not running.")
+            return 1
+        print(json.dumps(entry, indent=2))
+        return 0
+    if not stop(args.name):
+        print(f"Daemon '{args.name}' is not running.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
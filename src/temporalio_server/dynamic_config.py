@@ -0,0 +1,201 @@
+import json
+import re
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+# Dynamic config keys this module knows about, with the type of their value.
+# "duration" values are Go duration strings such as "500ms" or "1m".
+KEYS: Dict[str, str] = {
+    # Rate limits (requests per second).
+    "frontend.rps": "int",
+    "frontend.namespaceRPS": "int",
+    "frontend.namespaceCount": "int",
+    "history.rps": "int",
+    "matching.rps": "int",
+    # Persistence rate limits (queries per second).
+    "frontend.persistenceMaxQPS": "int",
+    "history.persistenceMaxQPS": "int",
+    "matching.persistenceMaxQPS": "int",
+    "frontend.persistenceNamespaceMaxQPS": "int",
+    "history.persistenceNamespaceMaxQPS": "int",
+    "matching.persistenceNamespaceMaxQPS": "int",
+    # Task queue partitions.
+    "matching.numTaskqueueReadPartitions": "int",
+    "matching.numTaskqueueWritePartitions": "int",
+    "matching.longPollExpirationInterval": "duration",
+    # History caches.
+    "history.cacheInitialSize": "int",
+    "history.cacheMaxSize": "int",
+    # Limits.
+    "limit.blobSize.error": "int",
+    "limit.blobSize.warn": "int",
+    "limit.historyCount.error": "int",
+    "limit.historyCount.warn": "int",
+    # Features commonly enabled in tests.
+    "system.forceSearchAttributesCacheRefreshOnRead": "bool",
+    "system.enableEagerWorkflowStart": "bool",
+    "frontend.enableUpdateWorkflowExecution": "bool",
+    "frontend.enableUpdateWorkflowExecutionAsyncAccepted": "bool",
+    "frontend.enableExecuteMultiOperation": "bool",
+    "frontend.workerVersioningDataAPIs": "bool",
+    "frontend.workerVersioningWorkflowAPIs": "bool",
+}
+
+# Untuned starting points: the values follow what each setting is for, but
+# their effect has not been measured. Check them on your hardware with
+# `bench --dynamic-config ... --compare` and `lifecycle-bench -c <preset>`.
+PRESETS: Dict[str, Dict[str, Any]] = {
+    # Lift the frontend, service and persistence rate limits that cap a
+    # single dev server under load tests, and give history a larger cache.
+    "high-throughput": {
+        "frontend.rps": 100_000,
+        "frontend.namespaceRPS": 100_000,
+        "history.rps": 100_000,
+        "matching.rps": 100_000,
+        "frontend.persistenceMaxQPS": 100_000,
+        "history.persistenceMaxQPS": 100_000,
+        "matching.persistenceMaxQPS": 100_000,
+        "frontend.persistenceNamespaceMaxQPS": 100_000,
+        "history.persistenceNamespaceMaxQPS": 100_000,
+        "matching.persistenceNamespaceMaxQPS": 100_000,
+        "history.cacheMaxSize": 8192,
+    },
+    # Single task queue partitions (no forwarding between partitions), eager
+    # workflow start, and search attributes visible as soon as they are created.
+    "low-latency-tests": {
+        "matching.numTaskqueueReadPartitions": 1,
+        "matching.numTaskqueueWritePartitions": 1,
+        "system.enableEagerWorkflowStart": True,
+        "system.forceSearchAttributesCacheRefreshOnRead": True,
+        "frontend.enableUpdateWorkflowExecution": True,
+        "frontend.enableUpdateWorkflowExecutionAsyncAccepted": True,
+    },
+}
+
+_DURATION_PATTERN = re.compile(r"^(\d+(\.\d+)?(ns|us|µs|ms|s|m|h))+$")
+
+DynamicConfigLike = Union["DynamicConfig", str, Mapping[str, Any]]
+
+
+class DynamicConfig:
+    """Validated server dynamic config, passed as `--dynamic-config-value` flags.
+
+    Example:
+        config = DynamicConfig.preset("high-throughput").set("matching.numTaskqueueReadPartitions", 8)
+        async with DevServer(dynamic_config=config) as server:
+            ...
+    """
+
+    def __init__(
+        self, values: Optional[Mapping[str, Any]] = None, *, strict: bool = True
+    ) -> None:
+        """Initialize the config.
+
+        Args:
+            values: Initial key/value pairs.
+            strict: Reject keys not listed in KEYS. Pass False to set keys this
+                module does not know about; their values are passed through as JSON.
+        """
+        self.strict = strict
+        self._values: Dict[str, Any] = {}
+        for key, value in (values or {}).items():
+            self.set(key, value)
+
+    @classmethod
+    def preset(cls, *names: str) -> "DynamicConfig":
+        """Combine the named presets; later presets override earlier ones."""
+        config = cls()
+        for name in names:
+            try:
+                values = PRESETS[name]
+            except KeyError:
+                raise ValueError(
+                    f"Unknown dynamic config preset '{name}'. Expected one of: {', '.join(PRESETS)}"
+                ) from None
+            config.update(values)
+        return config
+
+    @classmethod
+    def coerce(cls, value: DynamicConfigLike) -> "DynamicConfig":
+        """Accept a DynamicConfig, a preset name (or comma-separated names), or a mapping."""
+        if isinstance(value, DynamicConfig):
+            return value
+        if isinstance(value, str):
+            return cls.preset(*(name.strip() for name in value.split(",")))
+        return cls(value)
+
+    def set(self, key: str, value: Any) -> "DynamicConfig":
+        """Set `key`, validating its value; returns self for chaining."""
+        self._values[key] = self._validate(key, value)
+        return self
+
+    def update(self, values: Mapping[str, Any]) -> "DynamicConfig":
+        for key, value in values.items():
+            self.set(key, value)
+        return self
+
+    def to_args(self) -> List[str]:
+        """Serialize to `temporal server start-dev` arguments."""
+        args: List[str] = []
+        for key, value in self._values.items():
+            args.extend(("--dynamic-config-value", f"{key}={json.dumps(value)}"))
+        return args
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self._values)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        return iter(self._values.items())
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"DynamicConfig({self._values!r})"
+
+    def _validate(self, key: str, value: Any) -> Any:
+        kind = KEYS.get(key)
+        if kind is None:
+            if self.strict:
+                raise ValueError(
+                    f"Unknown dynamic config key '{key}'. Use DynamicConfig(strict=False) to pass it anyway."
+                )
+            return value
+        if kind == "bool":
+            if not isinstance(value, bool):
+                raise TypeError(f"{key} expects a bool, got {value!r}")
+        elif kind == "int":
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise TypeError(f"{key} expects an int, got {value!r}")
+        elif kind == "duration":
+            if isinstance(value, timedelta):
+                value = f"{int(value.total_seconds() * 1000)}ms"
+            if not isinstance(value, str) or not _DURATION_PATTERN.match(value):
+                raise TypeError(
+                    f"{key} expects a duration such as '500ms' or a timedelta, got {value!r}"
+                )
+        return value
+
+
+def expand_cli_args(argv: List[str]) -> List[str]:
+    """Replace `--dynamic-config PRESET[,PRESET]` in CLI arguments with server flags."""
+    result: List[str] = []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--dynamic-config":
+            name = next(args, None)
+            if name is None:
+                raise ValueError("--dynamic-config requires a preset name")
+        elif arg.startswith("--dynamic-config="):
+            name = arg.split("=", 1)[1]
+        else:
+            result.append(arg)
+            continue
+        result.extend(DynamicConfig.coerce(name).to_args())
+    return result
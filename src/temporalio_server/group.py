@@ -0,0 +1,241 @@
+"""Groups of independent dev servers started and stopped together.
+
+Command line:
+    dandavison-temporalio-server fleet fleet.toml
+
+runs the servers described by a TOML file until interrupted:
+
+    ready_timeout = 30.0    # optional
+    shutdown_grace = 10.0   # optional
+
+    [servers.primary]
+    namespace = ["default", "orders"]
+
+    [servers.replica]
+    db_filename = "replica.db"
+    log_level = "info"
+
+Each `[servers.NAME]` table holds DevServer keyword arguments.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional, Sequence, Union
+
+from .server import DevServer
+
+log = logging.getLogger(__name__)
+
+_PORT_KWARGS = ("port", "ui_port", "metrics_port")
+
+
+class DevServerGroup:
+    """Starts several DevServers concurrently and stops them in parallel.
+
+    Members are spawned at once and must all become ready within one shared
+    `ready_timeout`, so group startup takes about as long as the slowest
+    member. On exit every member is sent SIGTERM at the same time and any
+    still running `shutdown_grace` seconds later are killed.
+
+    Example:
+        async with DevServerGroup({"a": {}, "b": {"namespace": ["x"]}}) as group:
+            client_a = await Client.connect(group["a"].target)
+    """
+
+    def __init__(
+        self,
+        members: Union[Sequence[Mapping[str, Any]], Mapping[str, Mapping[str, Any]]],
+        *,
+        ready_timeout: float = 30.0,
+        shutdown_grace: float = 10.0,
+    ) -> None:
+        """Initialize the group.
+
+        Args:
+            members: DevServer keyword arguments for each member, either as a
+                mapping from member name or as a sequence (named "0", "1", ...).
+                `port` and `ui_port` default to 0: free ports are allocated
+                when the member starts.
+            ready_timeout: Seconds for all members to become ready.
+            shutdown_grace: Seconds between SIGTERM and SIGKILL on shutdown.
+        """
+        if not isinstance(members, Mapping):
+            members = {str(i): kwargs for i, kwargs in enumerate(members)}
+        self.ready_timeout = ready_timeout
+        self.shutdown_grace = shutdown_grace
+        self.servers: Dict[str, DevServer] = {}
+        _check_explicit_ports(members)
+        for name, kwargs in members.items():
+            if kwargs.get("shared"):
+                raise ValueError(f"Group member '{name}' cannot be a shared server.")
+            kwargs = {"port": 0, "ui_port": 0, **kwargs}
+            self.servers[name] = DevServer(**kwargs)
+
+    def __getitem__(self, name: str) -> DevServer:
+        return self.servers[name]
+
+    def __iter__(self) -> Iterator[DevServer]:
+        return iter(self.servers.values())
+
+    def __len__(self) -> int:
+        return len(self.servers)
+
+    @property
+    def targets(self) -> Dict[str, str]:
+        return {name: server.target for name, server in self.servers.items()}
+
+    async def __aenter__(self) -> "DevServerGroup":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        """Spawn all members and wait until every one is ready.
+
+        If any member fails to start, the others are stopped and the error is raised.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.ready_timeout
+        tasks = {
+            asyncio.create_task(self._start_member(server, deadline)): name
+            for name, server in self.servers.items()
+        }
+        log.info(f"Starting {len(tasks)} Temporal servers...")
+        try:
+            done, pending = await asyncio.wait(
+                tasks, return_when=asyncio.FIRST_EXCEPTION
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self._abort()
+            raise
+        failed = next((t for t in done if t.exception() is not None), None)
+        if failed is not None:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            await self._abort()
+            raise RuntimeError(
+                f"Group member '{tasks[failed]}' failed to start."
+            ) from failed.exception()
+        log.info(f"Temporal servers ready: {self.targets}")
+
+    async def stop(self, grace: Optional[float] = None) -> None:
+        """Stop all members in parallel.
+
+        Args:
+            grace: Seconds between SIGTERM and SIGKILL. Defaults to `shutdown_grace`.
+        """
+        if grace is None:
+            grace = self.shutdown_grace
+        await asyncio.gather(*(server._stop(grace) for server in self.servers.values()))
+
+    async def _start_member(self, server: DevServer, deadline: float) -> None:
+        remaining = deadline - asyncio.get_running_loop().time()
+        await server._start(timeout=max(0.0, remaining))
+        await server._finish_start()
+
+    async def _abort(self) -> None:
+        # Like stop(), but a failed start leaves no state worth checkpointing.
+        await asyncio.gather(
+            *(
+                server._stop(self.shutdown_grace, checkpoint=False)
+                for server in self.servers.values()
+            )
+        )
+
+
+def _check_explicit_ports(members: Mapping[str, Mapping[str, Any]]) -> None:
+    used: Dict[int, str] = {}
+    for name, kwargs in members.items():
+        for key in _PORT_KWARGS:
+            port = kwargs.get(key)
+            if not port:
+                continue
+            if port in used:
+                raise ValueError(
+                    f"Port {port} of group member '{name}' is also used by '{used[port]}'."
+                )
+            used[port] = name
+
+
+def load_fleet(path: Union[str, Path]) -> DevServerGroup:
+    """Create a DevServerGroup from a fleet TOML file (see module docstring)."""
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib  # type: ignore[no-redef]
+        except ImportError:
+            raise RuntimeError(
+                "Reading fleet files on Python < 3.11 requires tomli: "
+                "pip install dandavison-temporalio-server[fleet]"
+            ) from None
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+    servers = config.pop("servers", None)
+    if not servers:
+        raise ValueError(f"{path}: no [servers.NAME] tables.")
+    unknown = set(config) - {"ready_timeout", "shutdown_grace"}
+    if unknown:
+        raise ValueError(
+            f"{path}: unknown top-level keys: {', '.join(sorted(unknown))}"
+        )
+    return DevServerGroup(servers, **config)
+
+
+async def run_fleet(group: DevServerGroup) -> int:
+    """Run `group` until interrupted or until a member exits."""
+    stop_event = asyncio.Event()
+    if sys.platform != "win32":
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop_event.set)
+    async with group:
+        for name, server in group.servers.items():
+            print(f"{name:<16}{server.target:<24}http://{server.ip}:{server.ui_port}")
+        sys.stdout.flush()
+        exits = {
+            asyncio.create_task(server.process.wait()): name
+            for name, server in group.servers.items()
+            if server.process is not None
+        }
+        stop_task = asyncio.create_task(stop_event.wait())
+        try:
+            done, _ = await asyncio.wait(
+                {stop_task, *exits}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for task in (stop_task, *exits):
+                task.cancel()
+        exited = [exits[t] for t in done if t in exits]
+        if exited:
+            log.error(f"Server '{exited[0]}' exited; stopping fleet.")
+            return 1
+        log.info("Stopping fleet...")
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="fleet", description="Run a group of dev servers described by a TOML file."
+    )
+    parser.add_argument("config", type=Path, help="Fleet TOML file.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    group = load_fleet(args.config)
+    return asyncio.run(run_fleet(group))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
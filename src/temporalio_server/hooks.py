@@ -0,0 +1,176 @@
+"""Lifecycle instrumentation for DevServer.
+
+Servers report four events, each with monotonic start/end times, the
+phases the time went to (seconds) and a few attributes:
+
+    spawn: phases prepare_db (port allocation and database setup),
+           binary_lookup, exec (create_subprocess_exec)
+    ready: phases wait (the whole readiness wait), first_connect (the
+           successful health check), startup_line (from the start of the
+           wait to the first startup line in the output, if any);
+           attribute probes (health checks made)
+    kill:  phase kill_wait (SIGKILL until exit, after SIGTERM was not
+           enough); attributes returncode, grace
+    exit:  phases grace_wait (SIGTERM until exit or SIGKILL), kill_wait (if
+           killed); attributes returncode, killed
+
+A forced kill reports kill, then exit. A process that exited on its own
+reports exit with no phases.
+
+Example:
+    hooks = LifecycleHooks()
+
+    @hooks.on_ready
+    def report(event: LifecycleEvent) -> None:
+        print(f"{event.target} ready in {event.duration:.3f}s {event.phases}")
+
+    async with DevServer(hooks=hooks) as server:
+        ...
+
+Callbacks registered on `default_hooks` apply to every DevServer.
+`enable_opentelemetry()` exports the events as OpenTelemetry spans.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+EVENTS = ("spawn", "ready", "exit", "kill")
+
+
+@dataclass
+class LifecycleEvent:
+    """One timed step in a server's life. Times are from time.monotonic()."""
+
+    name: str
+    target: str
+    start: float
+    end: float
+    pid: Optional[int] = None
+    phases: Dict[str, float] = field(default_factory=dict)
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+Callback = Callable[[LifecycleEvent], None]
+
+
+class LifecycleHooks:
+    """Registry of lifecycle callbacks, called in registration order.
+
+    Registration methods return the callback, so they can be used as
+    decorators. Exceptions in callbacks are logged, not raised. A server calls
+    its own hooks before `default_hooks`.
+    """
+
+    def __init__(
+        self,
+        *,
+        on_spawn: Optional[Callback] = None,
+        on_ready: Optional[Callback] = None,
+        on_exit: Optional[Callback] = None,
+        on_kill: Optional[Callback] = None,
+    ) -> None:
+        self._callbacks: Dict[str, List[Callback]] = {name: [] for name in EVENTS}
+        for name, callback in (
+            ("spawn", on_spawn),
+            ("ready", on_ready),
+            ("exit", on_exit),
+            ("kill", on_kill),
+        ):
+            if callback is not None:
+                self.add(name, callback)
+
+    def add(self, event: str, callback: Callback) -> Callback:
+        if event not in self._callbacks:
+            raise ValueError(
+                f"Unknown lifecycle event '{event}'. "
+                f"Expected one of: {', '.join(EVENTS)}"
+            )
+        self._callbacks[event].append(callback)
+        return callback
+
+    def remove(self, event: str, callback: Callback) -> None:
+        self._callbacks[event].remove(callback)
+
+    def on_spawn(self, callback: Callback) -> Callback:
+        return self.add("spawn", callback)
+
+    def on_ready(self, callback: Callback) -> Callback:
+        return self.add("ready", callback)
+
+    def on_exit(self, callback: Callback) -> Callback:
+        return self.add("exit", callback)
+
+    def on_kill(self, callback: Callback) -> Callback:
+        return self.add("kill", callback)
+
+    def emit(self, event: LifecycleEvent) -> None:
+        for callback in self._callbacks[event.name]:
+            try:
+                callback(event)
+            except Exception:
+                log.exception(f"Error in DevServer {event.name} hook {callback!r}")
+
+    def __bool__(self) -> bool:
+        return any(self._callbacks.values())
+
+
+default_hooks = LifecycleHooks()
+
+
+def enable_opentelemetry(
+    hooks: Optional[LifecycleHooks] = None, tracer_provider: Any = None
+) -> bool:
+    """Export lifecycle events as OpenTelemetry spans, if opentelemetry-api is present.
+
+    Spans are named "temporalio_server.<event>", with the phases as
+    "temporalio_server.phase.<name>_ms" attributes. Forced kills are marked
+    with an error status.
+
+    Args:
+        hooks: Hooks to export from. Defaults to `default_hooks` (every server).
+        tracer_provider: Defaults to the global tracer provider.
+
+    Returns:
+        False (and does nothing) if OpenTelemetry is not installed.
+    """
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        log.debug(
+            "opentelemetry-api is not installed; lifecycle spans are not exported."
+        )
+        return False
+    tracer = trace.get_tracer("temporalio_server", tracer_provider=tracer_provider)
+
+    def export(event: LifecycleEvent) -> None:
+        # Span times are wall-clock nanoseconds; events carry monotonic seconds.
+        offset_ns = time.time_ns() - time.monotonic_ns()
+        attributes: Dict[str, Any] = {"server.address": event.target}
+        if event.pid is not None:
+            attributes["process.pid"] = event.pid
+        for name, seconds in event.phases.items():
+            attributes[f"temporalio_server.phase.{name}_ms"] = seconds * 1000
+        for name, value in event.attributes.items():
+            if value is not None:
+                attributes[f"temporalio_server.{name}"] = value
+        span = tracer.start_span(
+            f"temporalio_server.{event.name}",
+            start_time=int(event.start * 1e9) + offset_ns,
+            attributes=attributes,
+        )
+        if event.name == "kill":
+            span.set_status(trace.Status(trace.StatusCode.ERROR, "server was killed"))
+        span.end(end_time=int(event.end * 1e9) + offset_ns)
+
+    hooks = default_hooks if hooks is None else hooks
+    for name in EVENTS:
+        hooks.add(name, export)
+    return True
@@ -0,0 +1,269 @@
+"""Startup/teardown latency benchmark for DevServer configurations.
+
+Run with `python -m temporalio_server.lifecycle_bench` or
+`dandavison-temporalio-server lifecycle-bench`. Results are written as JSON
+and can be compared against an earlier run (e.g. from another CLI version)
+with `--compare`. `--cli-startup` instead measures the overhead of the
+`dandavison-temporalio-server` entry point relative to running the binary
+directly.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ._binary import get_binary_path, get_cli_version
+from ._util import percentile
+from .server import DevServer
+
+log = logging.getLogger(__name__)
+
+PHASES = ("spawn", "ready", "exit")
+
+# Each configuration maps a name to a factory for DevServer keyword arguments.
+# Factories receive a scratch directory so SQLite runs start from an empty file.
+CONFIGS: Dict[str, Callable[[Path], Dict[str, Any]]] = {
+    "memory": lambda tmp: {},
+    "sqlite": lambda tmp: {"db_filename": str(tmp / "bench.db")},
+    "namespaces-10": lambda tmp: {"namespace": [f"ns-{i}" for i in range(10)]},
+    "log-debug": lambda tmp: {"log_level": "debug"},
+    "metrics-off": lambda tmp: {"metrics_port": None},
+    "high-throughput": lambda tmp: {"dynamic_config": "high-throughput"},
+    "low-latency-tests": lambda tmp: {"dynamic_config": "low-latency-tests"},
+}
+
+
+async def measure_once(server_kwargs: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """Start and stop one server, returning phase durations and peak RSS.
+
+    The peak RSS covers the server's whole life, shutdown included.
+    """
+    server = DevServer(port=0, ui_port=0, **server_kwargs)
+    t0 = time.perf_counter()
+    try:
+        await server._spawn()
+        t1 = time.perf_counter()
+        await server._wait_for_server_ready()
+    except BaseException:
+        await server._stop(checkpoint=False)
+        raise
+    t2 = time.perf_counter()
+    assert server.process is not None
+    process = server.process
+    rss_task = asyncio.create_task(
+        _track_peak_rss(process, peak_rss_bytes(process.pid))
+    )
+    await server.__aexit__(None, None, None)
+    t3 = time.perf_counter()
+    rss = await rss_task
+    return {"spawn": t1 - t0, "ready": t2 - t1, "exit": t3 - t2, "peak_rss": rss}
+
+
+async def _track_peak_rss(
+    process: asyncio.subprocess.Process,
+    peak: Optional[float],
+    interval: float = 0.01,
+) -> Optional[float]:
+    # VmHWM only grows, but disappears with the process, so keep re-reading it
+    # until the process exits and return the last value read.
+    while process.returncode is None:
+        peak = peak_rss_bytes(process.pid) or peak
+        await asyncio.sleep(interval)
+    return peak
+
+
+def peak_rss_bytes(pid: int) -> Optional[float]:
+    """Return the peak resident set size of `pid`, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return float(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """Percentiles, mean and range of `values`; empty if there are none."""
+    s = sorted(values)
+    if not s:
+        return {}
+    return {
+        "p50": percentile(s, 50),
+        "p95": percentile(s, 95),
+        "p99": percentile(s, 99),
+        "mean": sum(s) / len(s),
+        "min": s[0],
+        "max": s[-1],
+    }
+
+
+async def run_config(name: str, iterations: int, warmup: int) -> Dict[str, Any]:
+    samples: List[Dict[str, Optional[float]]] = []
+    for i in range(warmup + iterations):
+        with tempfile.TemporaryDirectory(prefix="temporalio-server-bench-") as tmp:
+            sample = await measure_once(CONFIGS[name](Path(tmp)))
+        if i >= warmup:
+            samples.append(sample)
+    result: Dict[str, Any] = {}
+    for phase in PHASES:
+        stats = summarize([s[phase] for s in samples if s[phase] is not None])
+        if stats:
+            result[phase] = stats
+    rss = [s["peak_rss"] for s in samples if s["peak_rss"] is not None]
+    result["peak_rss_bytes"] = max(rss) if rss else None
+    return result
+
+
+async def run_benchmark(
+    configs: Sequence[str], iterations: int = 10, warmup: int = 1
+) -> Dict[str, Any]:
+    """Benchmark each named configuration and return a JSON-serializable report."""
+    results = {}
+    for name in configs:
+        log.info(f"Benchmarking '{name}' ({iterations} iterations)...")
+        results[name] = await run_config(name, iterations, warmup)
+    return {
+        "cli_version": get_cli_version(),
+        "python": platform.python_version(),
+        "platform": f"{platform.system()}-{platform.machine()}",
+        "timestamp": time.time(),
+        "iterations": iterations,
+        "results": results,
+    }
+
+
+def measure_cli_startup(iterations: int = 20, warmup: int = 2) -> Dict[str, Any]:
+    """Time `--help` through the Python entry point and through the bare binary."""
+    binary = str(get_binary_path())
+    commands = {
+        "entry-point": [sys.executable, "-m", "temporalio_server.main", "--help"],
+        "binary": [binary, "server", "--log-level", "error", "--help"],
+    }
+    results = {}
+    for name, args in commands.items():
+        durations = []
+        for i in range(warmup + iterations):
+            t0 = time.perf_counter()
+            subprocess.run(args, stdout=subprocess.DEVNULL, check=True)
+            if i >= warmup:
+                durations.append(time.perf_counter() - t0)
+        results[name] = summarize(durations)
+    return {
+        "cli_version": get_cli_version(),
+        "iterations": iterations,
+        "results": results,
+        "overhead_p50": results["entry-point"]["p50"] - results["binary"]["p50"],
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Return a description of each p50/p95 that regressed by more than `threshold`."""
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        for phase in PHASES:
+            if phase not in base or phase not in result:
+                continue
+            for stat in ("p50", "p95"):
+                old, new = base[phase][stat], result[phase][stat]
+                if old > 0 and (new - old) / old > threshold:
+                    regressions.append(
+                        f"{name} {phase} {stat}: {old * 1000:.1f}ms -> {new * 1000:.1f}ms "
+                        f"(CLI {baseline['cli_version']} -> {current['cli_version']})"
+                    )
+    return regressions
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"temporal CLI {report['cli_version']}, {report['iterations']} iterations"]
+    lines.append(
+        f"{'config':<20}{'phase':<8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    for name, result in report["results"].items():
+        for phase in PHASES:
+            s = result.get(phase)
+            if s is None:
+                continue
+            lines.append(
+                f"{name:<20}{phase:<8}{s['p50'] * 1000:>10.1f}{s['p95'] * 1000:>10.1f}{s['p99'] * 1000:>10.1f}"
+            )
+        if result["peak_rss_bytes"] is not None:
+            lines.append(
+                f"{name:<20}{'rss':<8}{result['peak_rss_bytes'] / 2**20:>9.1f}M"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="lifecycle-bench", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("-n", "--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument(
+        "-c",
+        "--config",
+        action="append",
+        choices=sorted(CONFIGS),
+        help="Configuration to benchmark (repeatable). Defaults to all.",
+    )
+    parser.add_argument("-o", "--output", type=Path, help="Write JSON results here.")
+    parser.add_argument(
+        "--compare", type=Path, help="Baseline JSON results to compare against."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative slowdown that counts as a regression (default 0.2).",
+    )
+    parser.add_argument(
+        "--cli-startup",
+        action="store_true",
+        help="Measure entry point startup overhead instead of server lifecycle.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.cli_startup:
+        startup = measure_cli_startup(args.iterations, args.warmup)
+        for name, s in startup["results"].items():
+            print(f"{name:<20}p50 {s['p50'] * 1000:.1f}ms  p95 {s['p95'] * 1000:.1f}ms")
+        print(f"entry point overhead (p50): {startup['overhead_p50'] * 1000:.1f}ms")
+        if args.output:
+            args.output.write_text(json.dumps(startup, indent=2))
+        return 0
+
+    report = asyncio.run(
+        run_benchmark(args.config or list(CONFIGS), args.iterations, args.warmup)
+    )
+    print(format_report(report))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"Wrote {args.output}")
+    if args.compare:
+        regressions = compare(
+            json.loads(args.compare.read_text()), report, args.threshold
+        )
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+from pathlib import Path
+from typing import (
+    IO,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+log = logging.getLogger(__name__)
+
+LEVELS = {"debug": 0, "info": 1, "warn": 2, "warning": 2, "error": 3}
+_FATAL_LEVEL = 4  # dpanic, panic, fatal
+
+_LEVEL_PATTERN = re.compile(r'"level"\s*:\s*"(\w+)"|\blevel=(\w+)')
+_LOGFMT_PATTERN = re.compile(r'([\w.\-]+)=("(?:[^"\\]|\\.)*"|\S*)')
+_READ_SIZE = 64 * 1024
+_MAX_LINE = 1024 * 1024
+
+
+class LogRecord:
+    """One line of server output, parsed on demand.
+
+    Only the level is extracted eagerly (with a regex) so that filtering is
+    cheap; structured fields are parsed the first time they are accessed.
+    JSON lines and logfmt (`key=value`) lines are understood.
+    """
+
+    def __init__(self, stream: str, line: str, time: float) -> None:
+        self.stream = stream
+        self.line = line
+        self.time = time
+        match = _LEVEL_PATTERN.search(line)
+        self.level = (match.group(1) or match.group(2)).lower() if match else ""
+
+    @property
+    def level_no(self) -> int:
+        return LEVELS.get(self.level, _FATAL_LEVEL if self.level else -1)
+
+    @functools.cached_property
+    def fields(self) -> Dict[str, object]:
+        if self.line.startswith("{"):
+            try:
+                parsed = json.loads(self.line)
+            except ValueError:
+                return {}
+            return parsed if isinstance(parsed, dict) else {}
+        return {
+            key: json.loads(value) if value.startswith('"') else value
+            for key, value in _LOGFMT_PATTERN.findall(self.line)
+        }
+
+    @property
+    def message(self) -> str:
+        return str(self.fields.get("msg", self.line))
+
+    def __repr__(self) -> str:
+        return f"LogRecord({self.stream}, {self.line!r})"
+
+
+class _RotatingWriter:
+    def __init__(self, path: Path, max_bytes: int, backup_count: int) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._file: IO[str] = open(path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+
+    def write(self, line: str) -> None:
+        if self._size >= self.max_bytes:
+            self._rotate()
+        self._file.write(line)
+        self._file.write("\n")
+        self._size += len(line) + 1
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._size = 0
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class LogPipeline:
+    """Drains a server process's stdout and stderr for its whole lifetime.
+
+    Keeps the most recent lines in a bounded ring buffer, fans them out to
+    subscribers and listeners, and optionally spills them to a rotating file.
+    """
+
+    def __init__(
+        self,
+        *,
+        buffer_size: int = 1000,
+        subscriber_queue_size: int = 10000,
+        log_file: Optional[Union[str, Path]] = None,
+        log_file_max_bytes: int = 10 * 1024 * 1024,
+        log_file_backups: int = 3,
+    ) -> None:
+        self.buffer: Deque[LogRecord] = deque(maxlen=buffer_size)
+        self.subscriber_queue_size = subscriber_queue_size
+        self.dropped = 0
+        self._writer = (
+            _RotatingWriter(Path(log_file), log_file_max_bytes, log_file_backups)
+            if log_file
+            else None
+        )
+        self._listeners: List[Callable[[LogRecord], None]] = []
+        # Each subscriber queue maps to its (minimum level, streams) filter.
+        self._subscribers: Dict[
+            "asyncio.Queue[Optional[LogRecord]]", Tuple[int, Sequence[str]]
+        ] = {}
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._closed = False
+
+    def start(self, process: asyncio.subprocess.Process) -> None:
+        for name, stream in (("stdout", process.stdout), ("stderr", process.stderr)):
+            if stream is not None:
+                self._tasks.append(asyncio.create_task(self._drain(name, stream)))
+
+    async def wait_drained(self, timeout: Optional[float] = None) -> None:
+        """Wait until both streams have reached EOF."""
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=timeout)
+
+    async def close(self, timeout: float = 1.0) -> None:
+        """Finish reading any remaining output, then stop."""
+        if self._closed:
+            return
+        self._closed = True
+        await self.wait_drained(timeout)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for queue in self._subscribers:
+            _put_dropping_oldest(queue, None)
+        self._close_writer()
+
+    def recent(self, n: Optional[int] = None) -> List[LogRecord]:
+        """Return the last `n` buffered records (all buffered records by default)."""
+        records = list(self.buffer)
+        return records[-n:] if n is not None else records
+
+    def add_listener(self, listener: Callable[[LogRecord], None]) -> None:
+        """Call `listener` synchronously for every new record."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[LogRecord], None]) -> None:
+        self._listeners.remove(listener)
+
+    async def subscribe(
+        self, level: Optional[str] = None, streams: Sequence[str] = ("stdout", "stderr")
+    ) -> AsyncIterator[LogRecord]:
+        """Yield new records until the server exits.
+
+        Args:
+            level: Minimum level (debug, info, warn, error). Lines without a
+                level are only yielded when no level is given.
+            streams: Which output streams to include.
+        """
+        if self._closed:
+            return
+        min_level = LEVELS[level.lower()] if level else -1
+        queue: "asyncio.Queue[Optional[LogRecord]]" = asyncio.Queue(
+            self.subscriber_queue_size
+        )
+        self._subscribers[queue] = (min_level, streams)
+        try:
+            while True:
+                record = await queue.get()
+                if record is None:
+                    return
+                yield record
+        finally:
+            self._subscribers.pop(queue, None)
+
+    async def _drain(self, name: str, stream: asyncio.StreamReader) -> None:
+        pending = b""
+        try:
+            while True:
+                chunk = await stream.read(_READ_SIZE)
+                if not chunk:
+                    break
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                for line in lines:
+                    self._emit(name, line)
+                if len(pending) > _MAX_LINE:
+                    self._emit(name, pending)
+                    pending = b""
+            if pending:
+                self._emit(name, pending)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning(f"Error reading server {name}: {e}")
+
+    def _close_writer(self) -> None:
+        writer, self._writer = self._writer, None
+        if writer:
+            try:
+                writer.close()
+            except OSError as e:
+                log.warning(f"Error closing server log file: {e}")
+
+    def _emit(self, stream: str, raw: bytes) -> None:
+        line = raw.decode(errors="replace").rstrip("\r")
+        if not line:
+            return
+        record = LogRecord(stream, line, time.time())
+        self.buffer.append(record)
+        # A failing sink must not stop draining, or the server blocks on a full pipe.
+        if self._writer:
+            try:
+                self._writer.write(line)
+            except Exception:
+                log.exception(
+                    "Error writing server output to its log file; disabling it"
+                )
+                self._close_writer()
+        for listener in self._listeners:
+            try:
+                listener(record)
+            except Exception:
+                log.exception(f"Error in server output listener {listener!r}")
+        for queue, (min_level, streams) in self._subscribers.items():
+            if record.level_no < min_level or stream not in streams:
+                continue
+            if not _put_dropping_oldest(queue, record):
+                self.dropped += 1
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"Server {stream}: {line}")
+
+
+def _put_dropping_oldest(
+    queue: "asyncio.Queue[Optional[LogRecord]]", item: Optional[LogRecord]
+) -> bool:
+    """Put without blocking; if the queue is full, drop its oldest item first.
+
+    Returns False if an item had to be dropped.
+    """
+    try:
+        queue.put_nowait(item)
+        return True
+    except asyncio.QueueFull:
+        queue.get_nowait()
+        queue.put_nowait(item)
+        return False
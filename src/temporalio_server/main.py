@@ -1,8 +1,9 @@
 import logging
-import subprocess
+import os
 import sys
 
-# Import the helper from the __init__ module
+# Import the helper from the __init__ module. This deliberately avoids the
+# DevServer machinery (asyncio etc.) so that the CLI starts quickly.
 from . import get_binary_path
 
 # Set up basic logging
@@ -11,31 +12,66 @@ logging.basicConfig(
 )
 log = logging.getLogger(__name__)
 
+# Set to keep a Python parent process around the server instead of exec'ing it.
+NO_EXEC_ENV = "TEMPORALIO_SERVER_NO_EXEC"
+
 
 def run():
     """Entry point for the temporal-server script."""
+    if sys.argv[1:2] == ["lifecycle-bench"]:
+        from .lifecycle_bench import main
+
+        sys.exit(main(sys.argv[2:]))
+    if sys.argv[1:2] == ["bench"]:
+        from .bench import main
+
+        sys.exit(main(sys.argv[2:]))
+    if sys.argv[1:2] == ["binaries"]:
+        from ._binary import main
+
+        sys.exit(main(sys.argv[2:]))
+    if sys.argv[1:2] == ["fleet"]:
+        from .group import main
+
+        sys.exit(main(sys.argv[2:]))
+    if sys.argv[1:2] == ["daemon"]:
+        from .daemon import main
+
+        sys.exit(main(sys.argv[2:]))
+    if sys.argv[1:2] == ["seed"]:
+        from .seed import main
+
+        sys.exit(main(sys.argv[2:]))
+
     binary_path_str = "<not found>"
     try:
         binary_path = get_binary_path()
         binary_path_str = str(binary_path)
 
         # Prepend 'server' and default log level
-        args = [binary_path_str] + ["server", "--log-level", "error"] + sys.argv[1:]
+        argv = sys.argv[1:]
+        seed_spec = _option_value(argv, "--seed")
+        if seed_spec is not None:
+            argv = _remove_option(argv, "--seed")
+        if any(arg.startswith("--dynamic-config") for arg in argv):
+            from .dynamic_config import expand_cli_args
 
-        log.info(f"Executing: {' '.join(args)}")
-        process = subprocess.Popen(args)
-
-        exit_code = None
-        while exit_code is None:
-            try:
-                exit_code = process.wait()
-            except KeyboardInterrupt:
-                log.info("KeyboardInterrupt caught; killing temporal process...")
-                process.kill()
-                exit_code = process.wait()
-                log.info(f"temporal process killed, exit code {exit_code}.")
-                break
+            argv = expand_cli_args(argv)
+        args = [binary_path_str] + ["server", "--log-level", "error"] + argv
 
+        log.info(f"Executing: {' '.join(args)}")
+        # Seeding needs this process to stay around while the server starts.
+        if (
+            seed_spec is None
+            and sys.platform != "win32"
+            and not os.environ.get(NO_EXEC_ENV)
+        ):
+            # Replace this process with the binary: no parent process to keep
+            # alive, and signals go straight to the server.
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.execv(binary_path_str, args)
+        exit_code = _run_child(args, seed_spec, argv)
         log.info(f"temporal process exited with code {exit_code}")
         sys.exit(exit_code)
 
@@ -47,5 +83,68 @@ def run():
         sys.exit(1)
 
 
+def _run_child(args, seed_spec=None, argv=()) -> int:
+    """Run the binary as a child process, relaying signals to it."""
+    import signal
+    import subprocess
+
+    process = subprocess.Popen(args)
+    if sys.platform != "win32":
+        # Forward termination signals so the server can shut down cleanly.
+        for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+            signal.signal(sig, lambda signum, frame: process.send_signal(signum))
+    if seed_spec is not None:
+        _seed(process, seed_spec, argv)
+    while True:
+        try:
+            return process.wait()
+        except KeyboardInterrupt:
+            # On Windows the console delivers Ctrl-C to the child as well, so
+            # just keep waiting for it to shut down.
+            log.info("KeyboardInterrupt caught; waiting for temporal process...")
+
+
+def _seed(process, seed_spec, argv) -> None:
+    """Seed the server started with `argv` once it is ready; stop it if seeding fails."""
+    import asyncio
+
+    from .seed import format_report, seed_when_ready
+
+    ip = _option_value(argv, "--ip") or "localhost"
+    port = _option_value(argv, "--port", "-p") or "7233"
+    namespace = _option_value(argv, "--namespace", "-n") or "default"
+    try:
+        report = asyncio.run(
+            seed_when_ready(f"{ip}:{port}", seed_spec, namespace=namespace)
+        )
+    except Exception as e:
+        log.error(f"Seeding failed: {e}")
+        process.terminate()
+        return
+    print(format_report(report), file=sys.stderr)
+
+
+def _option_value(argv, *names):
+    """Return the value of the first of `names` in argv ("--opt value" or "--opt=value")."""
+    for i, arg in enumerate(argv):
+        for name in names:
+            if arg == name and i + 1 < len(argv):
+                return argv[i + 1]
+            if arg.startswith(name + "="):
+                return arg.split("=", 1)[1]
+    return None
+
+
+def _remove_option(argv, name):
+    result = []
+    args = iter(argv)
+    for arg in args:
+        if arg == name:
+            next(args, None)
+        elif not arg.startswith(name + "="):
+            result.append(arg)
+    return result
+
+
 if __name__ == "__main__":
     run()
@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import math
+import re
+import time
+from array import array
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Collection,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from .server import DevServer
+
+log = logging.getLogger(__name__)
+
+Labels = Dict[str, str]
+# A series to sample: metric name plus a label filter; matching samples are summed.
+SeriesSpec = Tuple[str, Mapping[str, str]]
+
+PRESET_SERIES: Dict[str, SeriesSpec] = {
+    "persistence_latency_sum": ("persistence_latency_sum", {}),
+    "persistence_latency_count": ("persistence_latency_count", {}),
+    "persistence_requests": ("persistence_requests", {}),
+    "task_queue_backlog": ("approximate_backlog_count", {}),
+    "rpc_requests": ("service_requests", {}),
+    "rpc_errors": ("service_errors", {}),
+    "rpc_latency_sum": ("service_latency_sum", {}),
+    "rpc_latency_count": ("service_latency_count", {}),
+}
+
+_LABEL_PATTERN = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+_HISTOGRAM_SUFFIXES = ("_bucket", "_sum", "_count")
+
+
+class MetricsSnapshot:
+    """Parsed samples from one scrape of the Prometheus text format."""
+
+    def __init__(self, samples: Dict[str, List[Tuple[Labels, float]]], time: float):
+        self.samples = samples
+        self.time = time
+
+    def series(self, name: str) -> List[Tuple[Labels, float]]:
+        return self.samples.get(name, [])
+
+    def get(self, name: str, **labels: str) -> float:
+        """Sum of all samples of `name` whose labels include `labels`."""
+        return sum(
+            value
+            for sample_labels, value in self.series(name)
+            if all(sample_labels.get(k) == v for k, v in labels.items())
+        )
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.samples
+
+
+def parse_prometheus(
+    text: str, names: Optional[Collection[str]] = None
+) -> Dict[str, List[Tuple[Labels, float]]]:
+    """Parse Prometheus text exposition format.
+
+    Args:
+        text: Exposition text.
+        names: If given, only these metrics are parsed; histogram/summary base
+            names also select their _bucket, _sum and _count series. Other lines
+            are skipped before their labels are parsed.
+    """
+    samples: Dict[str, List[Tuple[Labels, float]]] = {}
+    for line in text.splitlines():
+        if not line or line[0] == "#":
+            continue
+        brace = line.find("{")
+        space = line.find(" ")
+        if brace != -1 and (space == -1 or brace < space):
+            name = line[:brace]
+        else:
+            name = line[:space]
+        if names is not None and name not in names:
+            base = next(
+                (name[: -len(s)] for s in _HISTOGRAM_SUFFIXES if name.endswith(s)),
+                None,
+            )
+            if base not in names:
+                continue
+        if brace != -1 and (space == -1 or brace < space):
+            close = line.rfind("}")
+            labels = dict(_LABEL_PATTERN.findall(line[brace + 1 : close]))
+            rest = line[close + 1 :].split()
+        else:
+            labels = {}
+            rest = line[space + 1 :].split()
+        try:
+            value = float(rest[0])
+        except (IndexError, ValueError):
+            continue
+        samples.setdefault(name, []).append((labels, value))
+    return samples
+
+
+class MetricsClient:
+    """Scrapes a DevServer's Prometheus metrics endpoint."""
+
+    def __init__(self, server: "DevServer") -> None:
+        self.server = server
+
+    async def url(self, timeout: float = 5.0) -> str:
+        """Return the metrics endpoint URL, waiting for the server to report it."""
+        if self.server.metrics_port is None:
+            raise RuntimeError("Metrics are disabled (metrics_port=None).")
+        if self.server.metrics_url is None and self.server.metrics_port:
+            return f"http://{self.server.ip}:{self.server.metrics_port}/metrics"
+        known = self.server._metrics_url_known
+        if known is None:
+            raise RuntimeError("Server is not running.")
+        try:
+            await asyncio.wait_for(known.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(
+                f"Server did not report its metrics endpoint within {timeout:.1f}s."
+            ) from None
+        assert self.server.metrics_url is not None
+        return self.server.metrics_url
+
+    async def scrape_text(self, timeout: float = 5.0) -> str:
+        """Fetch the raw exposition text."""
+        parts = urlsplit(await self.url())
+        host = parts.hostname or self.server.ip
+        port = parts.port or 80
+        path = parts.path or "/metrics"
+        return await asyncio.wait_for(_http_get(host, port, path), timeout)
+
+    async def snapshot(
+        self, names: Optional[Collection[str]] = None, timeout: float = 5.0
+    ) -> MetricsSnapshot:
+        """Scrape once and parse (only `names`, if given)."""
+        text = await self.scrape_text(timeout)
+        return MetricsSnapshot(parse_prometheus(text, names), time.monotonic())
+
+    def sampler(
+        self,
+        series: Union[Collection[str], Mapping[str, SeriesSpec]] = tuple(PRESET_SERIES),
+        interval: float = 1.0,
+    ) -> "MetricsSampler":
+        """Create a background sampler; see MetricsSampler."""
+        return MetricsSampler(self, series, interval)
+
+
+class MetricsSampler:
+    """Records selected series at a fixed interval into compact arrays.
+
+    Example:
+        async with server.metrics.sampler(["rpc_requests", "task_queue_backlog"], 0.5) as s:
+            await run_load()
+        print(s.times, s.values["rpc_requests"])
+    """
+
+    def __init__(
+        self,
+        client: MetricsClient,
+        series: Union[Collection[str], Mapping[str, SeriesSpec]],
+        interval: float,
+    ) -> None:
+        """Initialize the sampler.
+
+        Args:
+            client: Client for the server to sample.
+            series: Either names from PRESET_SERIES, or a mapping of series name
+                to (metric name, label filter).
+            interval: Seconds between scrapes.
+        """
+        if isinstance(series, Mapping):
+            self.specs: Dict[str, SeriesSpec] = dict(series)
+        else:
+            self.specs = {name: PRESET_SERIES[name] for name in series}
+        self.client = client
+        self.interval = interval
+        self.times = array("d")
+        self.values: Dict[str, array] = {name: array("d") for name in self.specs}
+        self.errors = 0
+        self._names = {metric for metric, _ in self.specs.values()}
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def __aenter__(self) -> "MetricsSampler":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def sample(self) -> None:
+        """Take one sample now. Series missing from the scrape are recorded as NaN."""
+        snapshot = await self.client.snapshot(self._names)
+        self.times.append(snapshot.time)
+        for name, (metric, labels) in self.specs.items():
+            value = snapshot.get(metric, **labels) if metric in snapshot else math.nan
+            self.values[name].append(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "times": self.times.tolist(),
+            "values": {name: v.tolist() for name, v in self.values.items()},
+        }
+
+    async def _run(self) -> None:
+        next_time = time.monotonic()
+        while True:
+            try:
+                await self.sample()
+            except (OSError, RuntimeError, asyncio.TimeoutError) as e:
+                self.errors += 1
+                log.debug(f"Metrics scrape failed: {e}")
+            next_time += self.interval
+            await asyncio.sleep(max(0.0, next_time - time.monotonic()))
+
+
+async def _http_get(host: str, port: int, path: str) -> str:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.0\r\nHost: {host}:{port}\r\nAccept-Encoding: identity\r\n\r\n".encode()
+        )
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status_line = head.split(b"\r\n", 1)[0].decode(errors="replace")
+    if " 200 " not in f"{status_line} ":
+        raise RuntimeError(f"Metrics endpoint returned: {status_line}")
+    return body.decode(errors="replace")
@@ -0,0 +1,200 @@
+import asyncio
+import csv
+import json
+import logging
+import math
+import os
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from ._util import percentile
+
+log = logging.getLogger(__name__)
+
+# Sampled series, in CSV column order.
+FIELDS = (
+    "rss_bytes",
+    "cpu_seconds",
+    "cpu_percent",
+    "threads",
+    "fds",
+    "read_bytes",
+    "write_bytes",
+)
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class ResourceMonitor:
+    """Samples the server process's resource usage from /proc.
+
+    The /proc files are opened once and re-read with pread, so each sample is
+    a few syscalls and no allocation beyond the parsed values; 10ms intervals
+    are fine. Samples go into array("d") series. Where /proc is unavailable
+    (macOS, Windows) the monitor records nothing.
+
+    Example:
+        monitor = ResourceMonitor(interval=0.1, dump="server-resources.csv")
+        async with DevServer(monitor=monitor) as server:
+            ...
+        print(monitor.summary()["rss_bytes"]["peak"])
+    """
+
+    def __init__(
+        self, interval: float = 1.0, dump: Optional[Union[str, Path]] = None
+    ) -> None:
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between samples.
+            dump: Write the samples here when the server exits; CSV unless the
+                file name ends in .json.
+        """
+        self.interval = interval
+        self.dump_path = Path(dump) if dump else None
+        self.pid: Optional[int] = None
+        self.times = array("d")
+        self.series: Dict[str, array] = {name: array("d") for name in FIELDS}
+        self.errors = 0
+        self._stat_fd: Optional[int] = None
+        self._io_fd: Optional[int] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._prev_cpu: Optional[float] = None
+        self._prev_time = 0.0
+
+    def start(self, pid: int) -> None:
+        """Begin sampling `pid`. Samples from successive processes are appended."""
+        self.pid = pid
+        try:
+            self._stat_fd = os.open(f"/proc/{pid}/stat", os.O_RDONLY)
+        except OSError as e:
+            log.debug(f"Resource monitoring unavailable for PID {pid}: {e}")
+            return
+        try:
+            self._io_fd = os.open(f"/proc/{pid}/io", os.O_RDONLY)
+        except OSError:
+            self._io_fd = None  # e.g. restricted by ptrace access mode
+        self._prev_cpu = None
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Take a final sample, stop sampling, and write the dump file if configured."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._sample_or_count_error()
+        for fd in (self._stat_fd, self._io_fd):
+            if fd is not None:
+                os.close(fd)
+        self._stat_fd = self._io_fd = None
+        if self.dump_path is not None and self.times:
+            self.dump(self.dump_path)
+
+    def sample(self) -> None:
+        """Record one sample now."""
+        assert self._stat_fd is not None and self.pid is not None
+        now = time.monotonic()
+        stat = os.pread(self._stat_fd, 4096, 0)
+        # The command name may contain spaces and parentheses; fields follow the last ')'.
+        fields = stat[stat.rfind(b")") + 2 :].split()
+        cpu = (int(fields[11]) + int(fields[12])) / _CLK_TCK
+        if self._prev_cpu is None or now <= self._prev_time:
+            cpu_percent = math.nan
+        else:
+            cpu_percent = 100 * (cpu - self._prev_cpu) / (now - self._prev_time)
+        self._prev_cpu, self._prev_time = cpu, now
+        read_bytes = write_bytes = math.nan
+        if self._io_fd is not None:
+            for line in os.pread(self._io_fd, 1024, 0).splitlines():
+                if line.startswith(b"read_bytes:"):
+                    read_bytes = float(line[11:])
+                elif line.startswith(b"write_bytes:"):
+                    write_bytes = float(line[12:])
+        try:
+            fds = float(len(os.listdir(f"/proc/{self.pid}/fd")))
+        except OSError:
+            fds = math.nan
+        self.times.append(now)
+        values = (
+            float(fields[21]) * _PAGE_SIZE,
+            cpu,
+            cpu_percent,
+            float(fields[17]),
+            fds,
+            read_bytes,
+            write_bytes,
+        )
+        for name, value in zip(FIELDS, values):
+            self.series[name].append(value)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Peak, mean and p50/p95/p99 of each series (NaN samples excluded)."""
+        result = {}
+        for name, values in self.series.items():
+            s = sorted(v for v in values if not math.isnan(v))
+            if not s:
+                continue
+            result[name] = {
+                "peak": s[-1],
+                "mean": sum(s) / len(s),
+                "p50": percentile(s, 50),
+                "p95": percentile(s, 95),
+                "p99": percentile(s, 99),
+            }
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pid": self.pid,
+            "interval": self.interval,
+            "times": self.times.tolist(),
+            "series": {name: v.tolist() for name, v in self.series.items()},
+            "summary": self.summary(),
+        }
+
+    def rows(self) -> List[List[float]]:
+        return [
+            [t, *(self.series[name][i] for name in FIELDS)]
+            for i, t in enumerate(self.times)
+        ]
+
+    def dump(self, path: Union[str, Path]) -> None:
+        """Write the samples to `path` as CSV, or JSON if it ends in .json."""
+        path = Path(path)
+        if path.suffix == ".json":
+            # NaN is not valid JSON; write null instead.
+            data = self.to_dict()
+            data["series"] = {
+                name: [None if math.isnan(v) else v for v in values]
+                for name, values in data["series"].items()
+            }
+            path.write_text(json.dumps(data, indent=2))
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["time", *FIELDS])
+                writer.writerows(self.rows())
+        log.debug(f"Wrote {len(self.times)} resource samples to {path}")
+
+    def _sample_or_count_error(self) -> bool:
+        try:
+            self.sample()
+        except (OSError, IndexError, ValueError) as e:
+            # The process has exited (ESRCH) or /proc returned something unexpected.
+            self.errors += 1
+            log.debug(f"Resource sample failed: {e}")
+            return False
+        return True
+
+    async def _run(self) -> None:
+        next_time = time.monotonic()
+        while self._sample_or_count_error():
+            next_time += self.interval
+            await asyncio.sleep(max(0.0, next_time - time.monotonic()))
@@ -0,0 +1,416 @@
+"""TCP proxy that adds network latency, jitter and a bandwidth limit.
+
+`DevServer(network=NetworkProfile(latency_ms=20))` starts a proxy in front of
+the server and points `server.target` at it, so clients and workers see a
+round trip of about 40ms on loopback.
+
+Data is forwarded as the chunks received from the socket, without copying
+or re-buffering, and delivered to the other side at its scheduled time.
+Each direction keeps its chunks, EOF and close in one FIFO queue drained by
+a single timer, so order is preserved (as TCP would) and jitter delays later
+chunks rather than reordering them. The bandwidth limit is per connection
+and per direction.
+
+Example:
+    profile = NetworkProfile(latency_ms=25, jitter_ms=5, bandwidth=10_000_000)
+    async with DevServer(network=profile) as server:
+        client = await Client.connect(server.target)
+        ...
+    for conn in server.proxy.connections:
+        print(conn.to_dict())
+"""
+
+import asyncio
+import collections
+import itertools
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple, Union
+
+log = logging.getLogger(__name__)
+
+# Stop reading from a side while this many bytes from it wait for delivery.
+_HIGH_WATER = 1024 * 1024
+_LOW_WATER = 256 * 1024
+
+# Queued after a direction's data: half-close or close the destination.
+_EOF = "eof"
+_CLOSE = "close"
+
+
+@dataclass(frozen=True)
+class NetworkProfile:
+    """Network conditions to simulate.
+
+    Attributes:
+        latency_ms: One-way delay added in each direction, so the round trip
+            grows by twice this.
+        jitter_ms: Each chunk's delay varies uniformly by up to this much either way.
+        bandwidth: Bytes per second, per connection and direction. None is unlimited.
+        seed: Seed for the jitter, for reproducible runs.
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    bandwidth: Optional[float] = None
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.latency_ms < 0 or self.jitter_ms < 0:
+            raise ValueError("latency_ms and jitter_ms must not be negative.")
+        if self.bandwidth is not None and self.bandwidth <= 0:
+            raise ValueError("bandwidth must be positive.")
+
+
+@dataclass
+class DirectionStats:
+    bytes: int = 0
+    chunks: int = 0
+    delay_total: float = 0.0
+    delay_max: float = 0.0
+
+    @property
+    def delay_mean(self) -> float:
+        return self.delay_total / self.chunks if self.chunks else 0.0
+
+
+@dataclass
+class ConnectionStats:
+    """Traffic through one proxied connection. Times are from time.monotonic()."""
+
+    id: int
+    peer: str
+    opened: float
+    closed: Optional[float] = None
+    # client -> server, server -> client
+    upstream: DirectionStats = field(default_factory=DirectionStats)
+    downstream: DirectionStats = field(default_factory=DirectionStats)
+
+    @property
+    def duration(self) -> float:
+        return (self.closed or time.monotonic()) - self.opened
+
+    def throughput(self) -> Tuple[float, float]:
+        """Bytes per second (upstream, downstream) over the life of the connection."""
+        duration = self.duration or 1e-9
+        return self.upstream.bytes / duration, self.downstream.bytes / duration
+
+    def to_dict(self) -> Dict[str, Any]:
+        up, down = self.throughput()
+        return {
+            "id": self.id,
+            "peer": self.peer,
+            "duration": self.duration,
+            "open": self.closed is None,
+            "upstream": {**asdict(self.upstream), "throughput": up},
+            "downstream": {**asdict(self.downstream), "throughput": down},
+        }
+
+
+class _Direction:
+    """Schedules the chunks flowing one way through a connection."""
+
+    def __init__(
+        self, profile: NetworkProfile, rng: random.Random, stats: DirectionStats
+    ) -> None:
+        self.profile = profile
+        self.rng = rng
+        self.stats = stats
+        self.link_free = 0.0
+        self.last_delivery = 0.0
+        self.queued = 0
+        # (delivery time, chunk or _EOF/_CLOSE), in delivery order.
+        self.pending: Deque[Tuple[float, Union[bytes, str]]] = collections.deque()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def schedule(self, now: float, size: int) -> float:
+        """Return the loop time at which `size` bytes received `now` are delivered."""
+        profile = self.profile
+        start = now
+        if profile.bandwidth is not None:
+            self.link_free = max(self.link_free, now) + size / profile.bandwidth
+            start = self.link_free
+        delay = profile.latency_ms
+        if profile.jitter_ms:
+            delay += self.rng.uniform(-profile.jitter_ms, profile.jitter_ms)
+        delivery = max(start + max(delay, 0.0) / 1000, self.last_delivery)
+        self.last_delivery = delivery
+        added = delivery - now
+        stats = self.stats
+        stats.bytes += size
+        stats.chunks += 1
+        stats.delay_total += added
+        stats.delay_max = max(stats.delay_max, added)
+        return delivery
+
+
+class _Side(asyncio.Protocol):
+    def __init__(self, conn: "_Connection", is_client: bool) -> None:
+        self.conn = conn
+        self.is_client = is_client
+        self.transport: Optional[asyncio.Transport] = None
+        self.pause_reasons: Set[str] = set()
+        self.got_eof = False
+        self.eof_written = False
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        assert isinstance(transport, asyncio.Transport)
+        self.transport = transport
+        if self.is_client:
+            self.conn.client_connected(self)
+
+    def data_received(self, data: bytes) -> None:
+        self.conn.forward(self, data)
+
+    def eof_received(self) -> bool:
+        self.conn.forward_eof(self)
+        return True  # Keep the other direction open until its EOF.
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self.conn.side_lost(self)
+
+    def pause_writing(self) -> None:
+        self.conn.peer_of(self).pause("write")
+
+    def resume_writing(self) -> None:
+        self.conn.peer_of(self).resume("write")
+
+    def pause(self, reason: str) -> None:
+        if not self.pause_reasons and self.transport is not None:
+            self.transport.pause_reading()
+        self.pause_reasons.add(reason)
+
+    def resume(self, reason: str) -> None:
+        self.pause_reasons.discard(reason)
+        if self.pause_reasons or self.transport is None:
+            return
+        if not self.transport.is_closing():
+            self.transport.resume_reading()
+
+
+class _Connection:
+    def __init__(self, proxy: "LatencyProxy", conn_id: int) -> None:
+        self.proxy = proxy
+        self.loop = asyncio.get_running_loop()
+        rng = random.Random(
+            None if proxy.profile.seed is None else proxy.profile.seed + conn_id
+        )
+        self.stats = ConnectionStats(id=conn_id, peer="", opened=time.monotonic())
+        # Keyed by whether the data comes from the client.
+        self.directions = {
+            True: _Direction(proxy.profile, rng, self.stats.upstream),
+            False: _Direction(proxy.profile, rng, self.stats.downstream),
+        }
+        self.client = _Side(self, is_client=True)
+        self.upstream = _Side(self, is_client=False)
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def peer_of(self, side: _Side) -> _Side:
+        return self.upstream if side is self.client else self.client
+
+    def client_connected(self, side: _Side) -> None:
+        assert side.transport is not None
+        peer = side.transport.get_extra_info("peername")
+        self.stats.peer = f"{peer[0]}:{peer[1]}" if peer else "?"
+        side.pause("connect")
+        self._task = asyncio.create_task(self._connect_upstream())
+
+    async def _connect_upstream(self) -> None:
+        host, port = self.proxy.upstream
+        try:
+            await self.loop.create_connection(lambda: self.upstream, host, port)
+        except OSError as e:
+            log.debug(f"Proxy connection {self.stats.id}: upstream connect failed: {e}")
+            if self.client.transport is not None:
+                self.client.transport.abort()
+            return
+        if self.client.transport is None or self.client.transport.is_closing():
+            self._close(self.upstream)  # The client went away while connecting.
+            return
+        self.client.resume("connect")
+
+    def forward(self, source: _Side, data: bytes) -> None:
+        direction = self.directions[source.is_client]
+        now = self.loop.time()
+        delivery = direction.schedule(now, len(data))
+        if delivery <= now and not direction.pending:
+            self._write(self.peer_of(source), data)
+            return
+        direction.queued += len(data)
+        if direction.queued >= _HIGH_WATER:
+            source.pause("queue")
+        self._enqueue(source, delivery, data)
+
+    def _enqueue(self, source: _Side, when: float, item: Union[bytes, str]) -> None:
+        direction = self.directions[source.is_client]
+        direction.pending.append((when, item))
+        if direction.timer is None:
+            direction.timer = self.loop.call_at(when, self._deliver, source)
+
+    def _deliver(self, source: _Side) -> None:
+        # Delivery times only grow along the queue, so the head is always due first.
+        direction = self.directions[source.is_client]
+        direction.timer = None
+        dest = self.peer_of(source)
+        pending = direction.pending
+        now = self.loop.time()
+        while pending and pending[0][0] <= now:
+            _, item = pending.popleft()
+            if item is _EOF:
+                self._write_eof(dest)
+            elif item is _CLOSE:
+                self._close(dest)
+            else:
+                assert isinstance(item, bytes)
+                direction.queued -= len(item)
+                self._write(dest, item)
+        if direction.queued < _LOW_WATER:
+            source.resume("queue")
+        if pending:
+            direction.timer = self.loop.call_at(pending[0][0], self._deliver, source)
+
+    def _write(self, dest: _Side, data: bytes) -> None:
+        if dest.transport is not None and not dest.transport.is_closing():
+            dest.transport.write(data)
+
+    def forward_eof(self, source: _Side) -> None:
+        source.got_eof = True
+        if source.eof_written:
+            self._close(source)  # Both directions are finished.
+        self._after_data(source, _EOF)
+
+    def _write_eof(self, dest: _Side) -> None:
+        if dest.transport is None or dest.transport.is_closing():
+            return
+        dest.eof_written = True
+        if dest.got_eof or not dest.transport.can_write_eof():
+            dest.transport.close()
+        else:
+            dest.transport.write_eof()
+
+    def side_lost(self, side: _Side) -> None:
+        # Close the other side once the data already in flight to it is delivered.
+        self._after_data(side, _CLOSE)
+        if self.stats.closed is None:
+            self.stats.closed = time.monotonic()
+            self.proxy._closed(self)
+
+    def _after_data(self, source: _Side, item: str) -> None:
+        direction = self.directions[source.is_client]
+        if not direction.pending:
+            if item is _EOF:
+                self._write_eof(self.peer_of(source))
+            else:
+                self._close(self.peer_of(source))
+            return
+        self._enqueue(source, direction.last_delivery, item)
+
+    def _close(self, side: _Side) -> None:
+        if side.transport is not None:
+            side.transport.close()
+
+    def abort(self) -> None:
+        for side in (self.client, self.upstream):
+            if side.transport is not None:
+                side.transport.abort()
+        for direction in self.directions.values():
+            if direction.timer is not None:
+                direction.timer.cancel()
+        if self._task is not None:
+            self._task.cancel()
+
+
+class LatencyProxy:
+    """Forwards TCP connections to `upstream`, shaped by a NetworkProfile."""
+
+    def __init__(
+        self,
+        upstream: Tuple[str, int],
+        profile: NetworkProfile,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        keep_closed: int = 1000,
+    ) -> None:
+        """Initialize the proxy.
+
+        Args:
+            upstream: (host, port) to forward to.
+            profile: Network conditions to add.
+            host: Address to listen on.
+            port: Port to listen on. 0 picks a free port.
+            keep_closed: Number of closed connections whose stats are kept.
+        """
+        self.upstream = upstream
+        self.profile = profile
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._open: Dict[int, _Connection] = {}
+        self._closed_stats: Deque[ConnectionStats] = collections.deque(
+            maxlen=keep_closed
+        )
+        self._ids = itertools.count(1)
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    @property
+    def connections(self) -> List[ConnectionStats]:
+        """Stats of open connections and recently closed ones, oldest first."""
+        stats = [*self._closed_stats, *(c.stats for c in self._open.values())]
+        return sorted(stats, key=lambda s: s.id)
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals across `connections`."""
+        connections = self.connections
+        totals: Dict[str, Any] = {"connections": len(connections)}
+        for name in ("upstream", "downstream"):
+            directions = [getattr(c, name) for c in connections]
+            chunks = sum(d.chunks for d in directions)
+            totals[name] = {
+                "bytes": sum(d.bytes for d in directions),
+                "chunks": chunks,
+                "delay_mean": (
+                    sum(d.delay_total for d in directions) / chunks if chunks else 0.0
+                ),
+                "delay_max": max((d.delay_max for d in directions), default=0.0),
+            }
+        return totals
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._server = await loop.create_server(self._accept, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        log.info(
+            f"Network proxy on {self.address} -> "
+            f"{self.upstream[0]}:{self.upstream[1]} ({self.profile})"
+        )
+
+    async def close(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        for conn in list(self._open.values()):
+            conn.abort()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def __aenter__(self) -> "LatencyProxy":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    def _accept(self) -> asyncio.Protocol:
+        conn = _Connection(self, next(self._ids))
+        self._open[conn.stats.id] = conn
+        return conn.client
+
+    def _closed(self, conn: _Connection) -> None:
+        if self._open.pop(conn.stats.id, None) is not None:
+            self._closed_stats.append(conn.stats)
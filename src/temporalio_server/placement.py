@@ -0,0 +1,175 @@
+"""Go runtime settings and CPU placement for server processes.
+
+Each temporal server is a Go program that, by default, sizes its scheduler
+(GOMAXPROCS) to every core on the machine and lets its heap grow without a
+limit. When many servers share one host, `DevServer(gomaxprocs=..., gogc=...,
+gomemlimit=..., cpu_affinity=..., nice=...)` keeps each one to its share.
+
+`DevServer(cpu_partition=N)` pins each server to N cores chosen to be disjoint
+from those of other servers started the same way, in any process on the
+machine. Partitions are leased in a lock-protected file in the user cache
+directory; leases held by processes that have exited are ignored.
+"""
+
+import logging
+import os
+import re
+import shutil
+import sys
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from ._util import locked_leases, user_cache_dir
+
+log = logging.getLogger(__name__)
+
+_MEMLIMIT_PATTERN = re.compile(r"^\d+(B|KiB|MiB|GiB|TiB)?$")
+_CAP_SYS_NICE = 23
+
+
+def go_runtime_env(
+    gomaxprocs: Optional[int] = None,
+    gogc: Optional[Union[int, str]] = None,
+    gomemlimit: Optional[Union[int, str]] = None,
+) -> Dict[str, str]:
+    """Return the GOMAXPROCS/GOGC/GOMEMLIMIT environment for the given settings.
+
+    Args:
+        gomaxprocs: Maximum number of OS threads running Go code at once.
+        gogc: GC target percentage, or "off".
+        gomemlimit: Soft memory limit, in bytes or as a Go size such as "512MiB".
+    """
+    env: Dict[str, str] = {}
+    if gomaxprocs is not None:
+        if gomaxprocs < 1:
+            raise ValueError(f"gomaxprocs must be at least 1, got {gomaxprocs}")
+        env["GOMAXPROCS"] = str(gomaxprocs)
+    if gogc is not None:
+        if gogc != "off" and not (isinstance(gogc, int) and gogc > 0):
+            raise ValueError(f"gogc must be a positive int or 'off', got {gogc!r}")
+        env["GOGC"] = str(gogc)
+    if gomemlimit is not None:
+        value = f"{gomemlimit}B" if isinstance(gomemlimit, int) else gomemlimit
+        if not _MEMLIMIT_PATTERN.match(value):
+            raise ValueError(
+                "gomemlimit must be a byte count or a size such as '512MiB', "
+                f"got {gomemlimit!r}"
+            )
+        env["GOMEMLIMIT"] = value
+    return env
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def check_placement(cpus: Optional[Sequence[int]], nice: Optional[int]) -> None:
+    """Raise ValueError if `cpus` or `nice` cannot be applied by this process.
+
+    Checked up front because the settings are applied by `taskset` and `nice`
+    in the child, where a failure would only show up as a failed start (or,
+    for `nice`, a warning on stderr).
+    """
+    if cpus is not None and hasattr(os, "sched_getaffinity"):
+        unavailable = sorted(set(cpus) - set(available_cpus()))
+        if not cpus or unavailable:
+            raise ValueError(
+                f"cpu_affinity must name CPUs this process may run on "
+                f"({_cpu_list(available_cpus())}); got {list(cpus)}"
+            )
+    if nice and nice < 0 and hasattr(os, "getpriority"):
+        niceness = os.getpriority(os.PRIO_PROCESS, 0) + nice
+        if not _may_lower_niceness_to(niceness):
+            raise ValueError(
+                f"nice={nice} would lower the server's niceness to {niceness}, "
+                f"which needs CAP_SYS_NICE or a higher RLIMIT_NICE."
+            )
+
+
+def placement_command(cpus: Optional[Sequence[int]], nice: Optional[int]) -> List[str]:
+    """Return a command prefix that runs a program with CPU affinity and niceness.
+
+    `taskset` and `nice` set them on themselves and then exec the program, so
+    they are in place before the Go runtime starts: every thread it creates
+    inherits them, and its default GOMAXPROCS matches the CPUs. (A
+    `preexec_fn` would do the same, but is unsafe while other threads are
+    running, as asyncio's executor threads are.)
+    """
+    prefix: List[str] = []
+    if cpus is not None:
+        taskset = shutil.which("taskset") if hasattr(os, "sched_setaffinity") else None
+        if taskset is None:
+            log.warning(
+                f"CPU affinity is not supported on {sys.platform}; ignoring it."
+            )
+        else:
+            prefix += [taskset, "--cpu-list", _cpu_list(cpus)]
+    if nice:
+        nice_path = shutil.which("nice")
+        if nice_path is None:
+            log.warning(
+                f"Process niceness is not supported on {sys.platform}; ignoring it."
+            )
+        else:
+            prefix += [nice_path, "-n", str(nice)]
+    return prefix
+
+
+def _cpu_list(cpus: Sequence[int]) -> str:
+    return ",".join(str(cpu) for cpu in cpus)
+
+
+def _may_lower_niceness_to(niceness: int) -> bool:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("CapEff:"):
+                    if int(line.split()[1], 16) & (1 << _CAP_SYS_NICE):
+                        return True
+                    break
+    except OSError:
+        pass
+    try:
+        import resource
+
+        soft, _ = resource.getrlimit(resource.RLIMIT_NICE)  # type: ignore[attr-defined]
+    except (ImportError, AttributeError):
+        return os.geteuid() == 0
+    return soft == resource.RLIM_INFINITY or niceness >= 20 - soft
+
+
+def _leases_path() -> Path:
+    return user_cache_dir() / "cpu-leases.json"
+
+
+def lease_cpus(n: int) -> Tuple[str, List[int]]:
+    """Lease `n` CPUs for a server, preferring CPUs no other live lease holds.
+
+    Available CPUs are split into aligned blocks of `n`, and the least used
+    block is taken, so servers leasing equal sizes get disjoint cores until
+    the machine is full, and then share as evenly as possible.
+
+    Returns a token for `release_cpus` and the leased CPUs.
+    """
+    cpus = available_cpus()
+    n = max(1, min(n, len(cpus)))
+    blocks = [cpus[i : i + n] for i in range(0, len(cpus) - n + 1, n)]
+    token = uuid.uuid4().hex
+    with locked_leases(_leases_path()) as leases:
+        usage: Dict[int, int] = {}
+        for lease in leases.values():
+            for cpu in lease["cpus"]:
+                usage[cpu] = usage.get(cpu, 0) + 1
+        block = min(blocks, key=lambda b: sum(usage.get(cpu, 0) for cpu in b))
+        leases[token] = {"pid": os.getpid(), "cpus": block}
+    log.debug(f"Leased CPUs {block}")
+    return token, block
+
+
+def release_cpus(token: str) -> None:
+    with locked_leases(_leases_path()) as leases:
+        leases.pop(token, None)
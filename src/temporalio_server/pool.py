@@ -0,0 +1,475 @@
+import asyncio
+import contextlib
+import logging
+import re
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    List,
+    Optional,
+    Set,
+)
+
+from .server import DevServer
+
+log = logging.getLogger(__name__)
+
+ResetFunc = Callable[[DevServer], Awaitable[None]]
+
+
+async def terminate_open_workflows(server: DevServer, timeout: float = 10.0) -> None:
+    """Terminate every running workflow in each of the server's namespaces.
+
+    Batch termination is asynchronous on the server, so this waits until the
+    running-workflow count drops to zero.
+    """
+    query = "ExecutionStatus='Running'"
+    for ns in server.namespace:
+        if not await _count_workflows(server, ns, query):
+            continue
+        await server.cli(
+            "workflow",
+            "terminate",
+            "--namespace",
+            ns,
+            "--query",
+            query,
+            "--reason",
+            "DevServerPool reset",
+            "--yes",
+        )
+        deadline = time.monotonic() + timeout
+        while await _count_workflows(server, ns, query):
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Workflows in namespace '{ns}' still running after {timeout:.1f}s."
+                )
+            await asyncio.sleep(0.1)
+
+
+async def _count_workflows(server: DevServer, namespace: str, query: str) -> int:
+    output = await server.cli(
+        "workflow", "count", "--namespace", namespace, "--query", query
+    )
+    match = re.search(r"\d+", output)
+    return int(match.group()) if match else 0
+
+
+@dataclass
+class PoolStats:
+    """Counters describing how well a DevServerPool is sized."""
+
+    leases: int = 0
+    hits: int = 0
+    misses: int = 0
+    servers_started: int = 0
+    start_failures: int = 0
+    resets: int = 0
+    reset_failures: int = 0
+    wait_times: List[float] = field(default_factory=list)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.leases if self.leases else 0.0
+
+    @property
+    def mean_wait(self) -> float:
+        if not self.wait_times:
+            return 0.0
+        return sum(self.wait_times) / len(self.wait_times)
+
+    @property
+    def max_wait(self) -> float:
+        return max(self.wait_times, default=0.0)
+
+
+class DevServerPool:
+    """Keeps pre-started DevServers ready to be leased by tests.
+
+    Example:
+        async with DevServerPool(size=4) as pool:
+            async with pool.lease() as server:
+                client = await Client.connect(server.target)
+    """
+
+    def __init__(
+        self,
+        *,
+        size: int = 4,
+        low_watermark: int = 1,
+        high_watermark: Optional[int] = None,
+        reset: Optional[ResetFunc] = terminate_open_workflows,
+        **server_kwargs: Any,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            size: Maximum number of live servers (idle, leased, starting or resetting).
+            low_watermark: Start more servers when fewer than this many are idle or starting.
+            high_watermark: Number of idle or starting servers to refill up to. Defaults to `size`.
+            reset: Coroutine run on each returned server before it is leased again.
+                Defaults to terminating open workflows. Pass None to skip resetting.
+            server_kwargs: Keyword arguments for each DevServer. Ports are assigned by the pool.
+        """
+        if high_watermark is None:
+            high_watermark = size
+        if not 0 <= low_watermark <= high_watermark <= size:
+            raise ValueError(
+                f"Expected 0 <= low_watermark <= high_watermark <= size, got {low_watermark}, {high_watermark}, {size}"
+            )
+        if "port" in server_kwargs or "ui_port" in server_kwargs:
+            raise ValueError("DevServerPool assigns ports itself.")
+        self.size = size
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.reset = reset
+        self.server_kwargs = server_kwargs
+        self.stats = PoolStats()
+        self._idle: Deque[DevServer] = deque()
+        self._leased: Set[DevServer] = set()
+        self._waiters: Deque["asyncio.Future[DevServer]"] = deque()
+        self._resetting: Set[DevServer] = set()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._discards: Set["asyncio.Task[None]"] = set()
+        self._live = 0
+        self._starting = 0
+        self._closed = False
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    @property
+    def leased_count(self) -> int:
+        return len(self._leased)
+
+    async def __aenter__(self) -> "DevServerPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def start(self, wait: bool = False) -> None:
+        """Begin starting servers in the background.
+
+        Args:
+            wait: If true, return only once `high_watermark` servers are idle.
+        """
+        self._replenish(target=self.high_watermark)
+        if wait:
+            while self._starting and len(self._idle) < self.high_watermark:
+                await asyncio.wait(
+                    set(self._tasks), return_when=asyncio.FIRST_COMPLETED
+                )
+
+    @contextlib.asynccontextmanager
+    async def lease(self) -> AsyncIterator[DevServer]:
+        """Lease a ready server for the duration of the context."""
+        server = await self.acquire()
+        try:
+            yield server
+        finally:
+            self.release(server)
+
+    async def acquire(self) -> DevServer:
+        """Take a ready server from the pool, waiting for one if none is idle."""
+        if self._closed:
+            raise RuntimeError("DevServerPool is closed.")
+        start_time = time.monotonic()
+        server = self._pop_idle()
+        if server is not None:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self._replenish()
+            try:
+                server = await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._put(waiter.result())
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+        self.stats.leases += 1
+        self.stats.wait_times.append(time.monotonic() - start_time)
+        self._leased.add(server)
+        self._replenish()
+        return server
+
+    def release(self, server: DevServer) -> None:
+        """Return a leased server; it is reset in the background before reuse."""
+        self._leased.discard(server)
+        if self._closed:
+            self._spawn_discard(server)
+        else:
+            self._spawn_task(self._reset_and_return(server))
+
+    async def close(self) -> None:
+        """Stop all servers and fail pending acquisitions."""
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(RuntimeError("DevServerPool is closed."))
+        servers = [*self._idle, *self._leased, *self._resetting]
+        self._idle.clear()
+        self._leased.clear()
+        self._resetting.clear()
+        for server in servers:
+            self._spawn_discard(server)
+        await asyncio.gather(*self._discards)
+        log.info(
+            f"DevServerPool closed: {self.stats.leases} leases, hit rate {self.stats.hit_rate:.0%}, "
+            f"mean wait {self.stats.mean_wait:.3f}s, max wait {self.stats.max_wait:.3f}s"
+        )
+
+    def _pop_idle(self) -> Optional[DevServer]:
+        while self._idle:
+            server = self._idle.popleft()
+            if _is_running(server):
+                return server
+            log.warning("Discarding idle pooled server whose process has exited.")
+            self._spawn_discard(server)
+        return None
+
+    def _put(self, server: DevServer) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(server)
+                return
+        self._idle.append(server)
+
+    def _replenish(self, target: Optional[int] = None) -> None:
+        if self._closed:
+            return
+        available = len(self._idle) + self._starting
+        if target is None:
+            if available >= self.low_watermark and available >= len(self._waiters):
+                return
+            target = max(self.high_watermark, len(self._waiters))
+        while available < target and self._live < self.size:
+            self._live += 1
+            self._starting += 1
+            available += 1
+            self._spawn_task(self._start_server())
+
+    async def _start_server(self) -> None:
+        server = DevServer(port=0, ui_port=0, **self.server_kwargs)
+        try:
+            await server.__aenter__()
+        except Exception as e:
+            self._starting -= 1
+            self._live -= 1
+            self.stats.start_failures += 1
+            log.error(f"Failed to start pooled server: {e}")
+            # Fail the waiters that no start in progress, or server to be
+            # returned, can serve; nothing else would wake them.
+            servable = self._starting + len(self._resetting) + len(self._leased)
+            while len(self._waiters) > servable:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        except asyncio.CancelledError:
+            self._starting -= 1
+            self._live -= 1
+            await server._stop(checkpoint=False)
+            raise
+        self._starting -= 1
+        self.stats.servers_started += 1
+        self._put(server)
+
+    async def _reset_and_return(self, server: DevServer) -> None:
+        self._resetting.add(server)
+        try:
+            if self.reset is not None and _is_running(server):
+                await self.reset(server)
+                self.stats.resets += 1
+        except Exception as e:
+            self.stats.reset_failures += 1
+            log.warning(
+                f"Failed to reset pooled server {server.target}; replacing it: {e}"
+            )
+            self._resetting.discard(server)
+            self._spawn_discard(server)
+            self._replenish()
+            return
+        self._resetting.discard(server)
+        if not _is_running(server):
+            log.warning(
+                f"Pooled server {server.target} exited while leased; replacing it."
+            )
+            self._spawn_discard(server)
+            self._replenish()
+            return
+        self._put(server)
+
+    def _spawn_task(self, coro: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _spawn_discard(self, server: DevServer) -> None:
+        # Discards are not cancelled by close(), so no server process is leaked.
+        self._live -= 1
+        task = asyncio.ensure_future(server.__aexit__(None, None, None))
+        self._discards.add(task)
+        task.add_done_callback(self._discards.discard)
+
+
+def _is_running(server: DevServer) -> bool:
+    return server.process is not None and server.process.returncode is None
+
+
+class NamespacePool:
+    """Hands out freshly registered namespaces on one server.
+
+    Namespaces are created in concurrent batches ahead of demand, and returned
+    namespaces are deleted in the background, so neither is on the caller's
+    critical path. Each name is used once.
+
+    Example:
+        pool = NamespacePool(server)
+        await pool.start()
+        namespace = await pool.acquire()
+        ...
+        pool.release(namespace)
+        await pool.close()
+    """
+
+    def __init__(
+        self,
+        server: DevServer,
+        *,
+        batch_size: int = 8,
+        prefix: str = "test",
+        retention: str = "24h",
+        max_concurrent_deletes: int = 4,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            server: Running server to register namespaces on.
+            batch_size: Namespaces created per batch; a new batch starts when
+                fewer than half this many are ready.
+            prefix: Namespace name prefix; a unique suffix is appended.
+            retention: Workflow retention for created namespaces.
+            max_concurrent_deletes: Limit on background deletions in flight.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        self.server = server
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.retention = retention
+        self.created = 0
+        self.deleted = 0
+        self.delete_failures = 0
+        self._ready: "asyncio.Queue[str]" = asyncio.Queue()
+        self._refill: Optional["asyncio.Task[None]"] = None
+        self._refill_error: Optional[BaseException] = None
+        self._delete_limit = asyncio.Semaphore(max_concurrent_deletes)
+        self._deletes: Set["asyncio.Task[None]"] = set()
+        self._counter = 0
+        self._session = uuid.uuid4().hex[:8]
+
+    async def start(self) -> None:
+        """Create the first batch and wait for it."""
+        self._replenish()
+        assert self._refill is not None
+        await self._refill
+
+    async def acquire(self) -> str:
+        """Return an unused, registered namespace."""
+        self._replenish()
+        while True:
+            try:
+                name = self._ready.get_nowait()
+                break
+            except asyncio.QueueEmpty:
+                pass
+            if self._refill_error is not None:
+                error, self._refill_error = self._refill_error, None
+                raise RuntimeError("Failed to create namespaces.") from error
+            assert self._refill is not None
+            await asyncio.wait({self._refill})
+            self._replenish()
+        self._replenish()
+        return name
+
+    def release(self, namespace: str) -> None:
+        """Delete a namespace in the background."""
+        task = asyncio.ensure_future(self._delete(namespace))
+        self._deletes.add(task)
+        task.add_done_callback(self._deletes.discard)
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Stop creating namespaces and wait (up to `timeout`) for pending deletions."""
+        if self._refill is not None:
+            self._refill.cancel()
+            await asyncio.gather(self._refill, return_exceptions=True)
+        if self._deletes:
+            _, pending = await asyncio.wait(set(self._deletes), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _replenish(self) -> None:
+        if self._refill is not None and not self._refill.done():
+            return
+        if self._ready.qsize() >= max(1, self.batch_size // 2):
+            return
+        self._refill = asyncio.ensure_future(self._create_batch())
+
+    async def _create_batch(self) -> None:
+        names = []
+        for _ in range(self.batch_size):
+            self._counter += 1
+            names.append(f"{self.prefix}-{self._session}-{self._counter}")
+        results = await asyncio.gather(
+            *(self._create(name) for name in names), return_exceptions=True
+        )
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                self._refill_error = result
+                log.error(f"Failed to create namespace '{name}': {result}")
+            else:
+                self.created += 1
+                self._ready.put_nowait(name)
+
+    async def _create(self, name: str) -> None:
+        await self.server.cli(
+            "operator",
+            "namespace",
+            "create",
+            "--namespace",
+            name,
+            "--retention",
+            self.retention,
+        )
+
+    async def _delete(self, name: str) -> None:
+        async with self._delete_limit:
+            try:
+                await self.server.cli(
+                    "operator", "namespace", "delete", "--namespace", name, "--yes"
+                )
+            except RuntimeError as e:
+                self.delete_failures += 1
+                log.warning(f"Failed to delete namespace '{name}': {e}")
+            else:
+                self.deleted += 1
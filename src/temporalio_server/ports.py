@@ -0,0 +1,56 @@
+"""Port allocation for servers started with `port=0` / `ui_port=0`.
+
+Asking the OS for a free port and then passing it to the server is racy:
+another process can take the port before the server binds it. Ports handed
+out here are also recorded in a lock-protected lease file in the user cache
+directory, so concurrent allocations in any process on the machine never
+return the same port. A server's lease is held until the server is
+stopped, so that restarts rebind the same ports; leases of exited processes
+are ignored.
+
+A port taken by a process that does not use this allocator can still
+collide; DevServer then retries with newly allocated ports.
+"""
+
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import List, Tuple
+
+from ._util import find_free_port, locked_leases, user_cache_dir
+
+log = logging.getLogger(__name__)
+
+_MAX_ATTEMPTS = 100
+
+
+def _leases_path() -> Path:
+    return user_cache_dir() / "port-leases.json"
+
+
+def allocate_ports(ip: str, n: int) -> Tuple[str, List[int]]:
+    """Allocate `n` distinct free TCP ports on `ip`.
+
+    Returns a token for `release_ports` and the ports.
+    """
+    token = uuid.uuid4().hex
+    with locked_leases(_leases_path()) as leases:
+        leased = {port for lease in leases.values() for port in lease["ports"]}
+        ports: List[int] = []
+        for _ in range(_MAX_ATTEMPTS):
+            port = find_free_port(ip)
+            if port not in leased and port not in ports:
+                ports.append(port)
+                if len(ports) == n:
+                    break
+        else:
+            raise RuntimeError(f"Could not allocate {n} free ports on {ip}.")
+        leases[token] = {"pid": os.getpid(), "ports": ports}
+    log.debug(f"Allocated ports {ports} on {ip}")
+    return token, ports
+
+
+def release_ports(token: str) -> None:
+    with locked_leases(_leases_path()) as leases:
+        leases.pop(token, None)
@@ -0,0 +1,159 @@
+"""pytest plugin: one dev server per session, a fresh namespace per test.
+
+Registered through the `pytest11` entry point, so installing the package is
+enough. The server runs on its own event loop in a background thread, so the
+fixtures are plain synchronous fixtures that work with any async test
+runner. Under pytest-xdist each worker process gets its own server.
+
+Fixtures:
+    temporal_server: The session's DevServer.
+    temporal_target: Its "host:port" address.
+    temporal_namespace: A newly registered namespace, unique to the test and
+        deleted in the background afterwards.
+    temporal_server_kwargs: Override in conftest.py to configure the server.
+
+Example:
+    async def test_workflow(temporal_target, temporal_namespace):
+        client = await Client.connect(temporal_target, namespace=temporal_namespace)
+"""
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Any, Coroutine, Dict, Iterator, Optional, TypeVar
+
+import pytest
+
+if TYPE_CHECKING:
+    from .pool import NamespacePool
+    from .server import DevServer
+
+T = TypeVar("T")
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("temporalio-server")
+    group.addoption(
+        "--temporal-namespace-batch",
+        type=int,
+        default=None,
+        help="Namespaces to register ahead of time per batch (default 8).",
+    )
+    parser.addini(
+        "temporal_namespace_batch",
+        "Namespaces to register ahead of time per batch (default 8).",
+        default="8",
+    )
+
+
+class BackgroundServer:
+    """A DevServer and NamespacePool running on an event loop in a background thread."""
+
+    def __init__(
+        self,
+        server_kwargs: Dict[str, Any],
+        namespace_batch: int,
+        namespace_prefix: str = "test",
+    ) -> None:
+        self.server_kwargs = server_kwargs
+        self.namespace_batch = namespace_batch
+        self.namespace_prefix = namespace_prefix
+        self.server: Optional["DevServer"] = None
+        self.namespaces: Optional["NamespacePool"] = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="temporalio-server", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+        try:
+            self.run(self._start())
+        except BaseException:
+            self.stop()
+            raise
+
+    def stop(self) -> None:
+        if self._thread.is_alive():
+            try:
+                self.run(self._stop())
+            finally:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._thread.join()
+        self._loop.close()
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the server's loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def acquire_namespace(self) -> str:
+        assert self.namespaces is not None
+        return self.run(self.namespaces.acquire())
+
+    def release_namespace(self, namespace: str) -> None:
+        assert self.namespaces is not None
+        self._loop.call_soon_threadsafe(self.namespaces.release, namespace)
+
+    async def _start(self) -> None:
+        from .pool import NamespacePool
+        from .server import DevServer
+
+        kwargs = dict(self.server_kwargs)
+        kwargs.setdefault("port", 0)
+        kwargs.setdefault("ui_port", 0)
+        server = DevServer(**kwargs)
+        await server.__aenter__()
+        self.server = server
+        self.namespaces = NamespacePool(
+            server, batch_size=self.namespace_batch, prefix=self.namespace_prefix
+        )
+        await self.namespaces.start()
+
+    async def _stop(self) -> None:
+        if self.namespaces is not None:
+            await self.namespaces.close()
+        if self.server is not None:
+            await self.server.__aexit__(None, None, None)
+
+
+@pytest.fixture(scope="session")
+def temporal_server_kwargs() -> Dict[str, Any]:
+    """DevServer keyword arguments for the session server. Override to customize."""
+    return {"dynamic_config": "low-latency-tests"}
+
+
+@pytest.fixture(scope="session")
+def _temporal_background(
+    request: pytest.FixtureRequest, temporal_server_kwargs: Dict[str, Any]
+) -> Iterator[BackgroundServer]:
+    batch = request.config.getoption("--temporal-namespace-batch") or int(
+        request.config.getini("temporal_namespace_batch")
+    )
+    # Under pytest-xdist, name namespaces after the worker (gw0, gw1, ...).
+    worker = getattr(request.config, "workerinput", {}).get("workerid")
+    prefix = f"test-{worker}" if worker else "test"
+    background = BackgroundServer(temporal_server_kwargs, batch, prefix)
+    background.start()
+    try:
+        yield background
+    finally:
+        background.stop()
+
+
+@pytest.fixture(scope="session")
+def temporal_server(_temporal_background: BackgroundServer) -> "DevServer":
+    """The session's DevServer. It runs on a background event loop."""
+    assert _temporal_background.server is not None
+    return _temporal_background.server
+
+
+@pytest.fixture(scope="session")
+def temporal_target(temporal_server: "DevServer") -> str:
+    return temporal_server.target
+
+
+@pytest.fixture
+def temporal_namespace(_temporal_background: BackgroundServer) -> Iterator[str]:
+    """A namespace registered for this test only; deleted in the background afterwards."""
+    namespace = _temporal_background.acquire_namespace()
+    yield namespace
+    _temporal_background.release_namespace(namespace)
@@ -0,0 +1,399 @@
+"""Bulk seeding of workflows into a server.
+
+A seed spec (TOML or JSON file, or a dict) describes batches of workflows
+and the state to leave them in:
+
+    concurrency = 64    # optional: starts in flight
+    connections = 4     # optional: client connections per namespace
+    histories = "histories/"    # optional: directory of exported histories
+
+    [[workflows]]
+    type = "OrderWorkflow"
+    task_queue = "orders"
+    count = 5000
+    id = "order-{i}"            # optional; default "{type}-{i}"
+    args = [{ amount = 10 }]    # optional arguments (JSON-serializable)
+    state = "running"           # running (default), completed, failed or terminated
+
+Exported histories (`temporal workflow show --output json`, or
+`WorkflowHistory.to_json()`), one per file named after the workflow ID, are
+seeded as a workflow of the same type, task queue and input, left in the
+history's final state (a timed out, canceled or continued-as-new workflow is
+terminated). A directory can also be passed instead of a spec.
+
+Running and terminated workflows are only started (and terminated); no
+workflow task of theirs is processed, so real workers can run them later.
+Completed and failed workflows are run to completion by a built-in worker
+that polls their task queues during seeding only.
+
+Workflow IDs are deterministic and already existing workflows are skipped,
+so seeding a persistent database (`db_filename`) again is cheap.
+
+Command line:
+    dandavison-temporalio-server seed seed.toml --address 127.0.0.1:7233
+    dandavison-temporalio-server start-dev --db-filename data.db --seed seed.toml
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+
+log = logging.getLogger(__name__)
+
+STATES = ("running", "completed", "failed", "terminated")
+
+# Final history event -> seeded state.
+_CLOSE_EVENTS = {
+    "workflow_execution_completed_event_attributes": "completed",
+    "workflow_execution_failed_event_attributes": "failed",
+    "workflow_execution_terminated_event_attributes": "terminated",
+    "workflow_execution_canceled_event_attributes": "terminated",
+    "workflow_execution_timed_out_event_attributes": "terminated",
+    "workflow_execution_continued_as_new_event_attributes": "terminated",
+}
+
+
+@dataclass
+class SeedWorkflows:
+    """A batch of `count` workflows of one type, left in `state`."""
+
+    type: str
+    count: int = 1
+    task_queue: str = "seed"
+    id: str = "{type}-{i}"
+    args: List[Any] = field(default_factory=list)
+    state: str = "running"
+    namespace: Optional[str] = None
+    memo: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.state not in STATES:
+            raise ValueError(
+                f"Unknown seed state '{self.state}'. "
+                f"Expected one of: {', '.join(STATES)}"
+            )
+        if self.count < 0:
+            raise ValueError(f"Seed count must not be negative, got {self.count}")
+
+
+@dataclass
+class SeedSpec:
+    """Workflows and exported histories to seed, and how many to start at once."""
+
+    workflows: List[SeedWorkflows] = field(default_factory=list)
+    histories: List[Path] = field(default_factory=list)
+    concurrency: int = 50
+    connections: int = 4
+
+    @classmethod
+    def from_dict(
+        cls, config: Mapping[str, Any], base_dir: Path = Path(".")
+    ) -> "SeedSpec":
+        config = dict(config)
+        workflows = [SeedWorkflows(**w) for w in config.pop("workflows", [])]
+        histories = config.pop("histories", [])
+        if isinstance(histories, (str, Path)):
+            histories = [histories]
+        unknown = set(config) - {"concurrency", "connections"}
+        if unknown:
+            raise ValueError(f"Unknown seed spec keys: {', '.join(sorted(unknown))}")
+        return cls(
+            workflows=workflows,
+            histories=[base_dir / h for h in histories],
+            **config,
+        )
+
+    @classmethod
+    def load(cls, source: "SeedLike") -> "SeedSpec":
+        """Accept a SeedSpec, a dict, a TOML/JSON spec file or a history directory."""
+        if isinstance(source, SeedSpec):
+            return source
+        if isinstance(source, Mapping):
+            return cls.from_dict(source)
+        path = Path(source)
+        if path.is_dir():
+            return cls(histories=[path])
+        if path.suffix == ".json":
+            config = json.loads(path.read_text())
+        else:
+            config = _load_toml(path)
+        return cls.from_dict(config, path.parent)
+
+
+SeedLike = Union[SeedSpec, Mapping[str, Any], str, Path]
+
+
+@dataclass
+class _Item:
+    namespace: str
+    workflow_id: str
+    workflow_type: str
+    task_queue: str
+    args: Sequence[Any]
+    state: str
+    memo: Dict[str, Any]
+
+
+def _load_toml(path: Path) -> Dict[str, Any]:
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib  # type: ignore[no-redef]
+        except ImportError:
+            raise RuntimeError(
+                "Reading TOML seed specs on Python < 3.11 requires tomli: "
+                "pip install dandavison-temporalio-server[fleet]"
+            ) from None
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def _items(spec: SeedSpec, namespace: str) -> Iterator[_Item]:
+    for batch in spec.workflows:
+        for i in range(batch.count):
+            yield _Item(
+                namespace=batch.namespace or namespace,
+                workflow_id=batch.id.format(type=batch.type, i=i),
+                workflow_type=batch.type,
+                task_queue=batch.task_queue,
+                args=batch.args,
+                state=batch.state,
+                memo=batch.memo,
+            )
+    for path in spec.histories:
+        files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        for history_file in files:
+            yield _history_item(history_file, namespace)
+
+
+def _history_item(path: Path, namespace: str) -> _Item:
+    from temporalio.client import WorkflowHistory
+    from temporalio.common import RawValue
+
+    history = WorkflowHistory.from_json(path.stem, path.read_text())
+    if not history.events:
+        raise ValueError(f"{path}: empty history")
+    started = history.events[0].workflow_execution_started_event_attributes
+    if not started.workflow_type.name:
+        raise ValueError(
+            f"{path}: history does not begin with WorkflowExecutionStarted"
+        )
+    last = history.events[-1].WhichOneof("attributes")
+    return _Item(
+        namespace=namespace,
+        workflow_id=history.workflow_id,
+        workflow_type=started.workflow_type.name,
+        task_queue=started.task_queue.name,
+        args=[RawValue(payload) for payload in started.input.payloads],
+        state=_CLOSE_EVENTS.get(last or "", "running"),
+        memo={},
+    )
+
+
+class _Seeder:
+    def __init__(self, target: str, spec: SeedSpec) -> None:
+        self.target = target
+        self.spec = spec
+        self.clients: Dict[str, List[Any]] = {}
+        self.next_client = 0
+        self.states: Counter = Counter()
+        self.existing = 0
+        self.errors: Counter = Counter()
+        self.first_error: Optional[BaseException] = None
+
+    async def client(self, namespace: str) -> Any:
+        from temporalio.client import Client
+
+        if namespace not in self.clients:
+            self.clients[namespace] = list(
+                await asyncio.gather(
+                    *(
+                        Client.connect(self.target, namespace=namespace)
+                        for _ in range(max(1, self.spec.connections))
+                    )
+                )
+            )
+        clients = self.clients[namespace]
+        self.next_client += 1
+        return clients[self.next_client % len(clients)]
+
+    async def run(self, items: List[_Item]) -> None:
+        async def loop(work: Iterator[_Item]) -> None:
+            for item in work:
+                try:
+                    await self.seed(item)
+                except Exception as e:
+                    self.errors[type(e).__name__] += 1
+                    if self.first_error is None:
+                        self.first_error = e
+                    log.debug(f"Seeding {item.workflow_id} failed: {e}")
+
+        work = iter(items)
+        await asyncio.gather(
+            *(loop(work) for _ in range(min(max(1, self.spec.concurrency), len(items))))
+        )
+
+    async def seed(self, item: _Item) -> None:
+        from temporalio.client import WorkflowFailureError
+        from temporalio.common import WorkflowIDReusePolicy
+        from temporalio.exceptions import WorkflowAlreadyStartedError
+
+        from ._seed_workflows import STATE_MEMO_KEY
+
+        client = await self.client(item.namespace)
+        memo = dict(item.memo)
+        if item.state in ("completed", "failed"):
+            memo[STATE_MEMO_KEY] = item.state
+        try:
+            handle = await client.start_workflow(
+                item.workflow_type,
+                args=item.args,
+                id=item.workflow_id,
+                task_queue=item.task_queue,
+                memo=memo or None,
+                # Closed workflows count as existing too, so seeding again is a no-op.
+                id_reuse_policy=WorkflowIDReusePolicy.REJECT_DUPLICATE,
+            )
+        except WorkflowAlreadyStartedError:
+            self.existing += 1
+            return
+        if item.state == "terminated":
+            await handle.terminate("Seeded")
+        elif item.state in ("completed", "failed"):
+            try:
+                await handle.result()
+            except WorkflowFailureError:
+                if item.state != "failed":
+                    raise
+        self.states[item.state] += 1
+
+
+async def seed(
+    target: str, spec: SeedLike, *, namespace: str = "default"
+) -> Dict[str, Any]:
+    """Seed the server at `target` and return a report of what was done and how fast.
+
+    Args:
+        target: Server address ("host:port").
+        spec: A SeedSpec, or anything `SeedSpec.load` accepts.
+        namespace: Namespace for workflows whose spec does not name one.
+
+    Raises RuntimeError if any workflow could not be seeded.
+    """
+    try:
+        from temporalio.worker import Worker
+
+        from ._seed_workflows import SeedWorkflow
+    except ImportError as e:
+        raise RuntimeError(
+            "Seeding requires the temporalio package: "
+            "pip install dandavison-temporalio-server[seed]"
+        ) from e
+
+    spec = SeedSpec.load(spec)
+    items = list(_items(spec, namespace))
+    seeder = _Seeder(target, spec)
+    log.info(f"Seeding {len(items)} workflows on {target}...")
+    t0 = time.monotonic()
+
+    # Closed workflows first, with a worker polling their task queues; then the
+    # rest, once no worker is left that could process their workflow tasks.
+    closing = [item for item in items if item.state in ("completed", "failed")]
+    if closing:
+        queues = sorted({(item.namespace, item.task_queue) for item in closing})
+        workers = [
+            Worker(await seeder.client(ns), task_queue=tq, workflows=[SeedWorkflow])
+            for ns, tq in queues
+        ]
+        runs = [asyncio.create_task(worker.run()) for worker in workers]
+        try:
+            await seeder.run(closing)
+        finally:
+            await asyncio.gather(*(worker.shutdown() for worker in workers))
+            await asyncio.gather(*runs, return_exceptions=True)
+    await seeder.run(
+        [item for item in items if item.state not in ("completed", "failed")]
+    )
+
+    elapsed = time.monotonic() - t0
+    seeded = sum(seeder.states.values())
+    report = {
+        "workflows": len(items),
+        "seeded": seeded,
+        "existing": seeder.existing,
+        "states": dict(seeder.states),
+        "errors": dict(seeder.errors),
+        "elapsed": elapsed,
+        "rate": seeded / elapsed if elapsed else 0.0,
+    }
+    log.info(
+        f"Seeded {seeded} workflows ({seeder.existing} already present) "
+        f"in {elapsed:.2f}s ({report['rate']:.0f}/s)"
+    )
+    if seeder.errors:
+        raise RuntimeError(
+            f"Failed to seed {sum(seeder.errors.values())} workflows: "
+            f"{seeder.first_error}"
+        ) from seeder.first_error
+    return report
+
+
+async def seed_when_ready(
+    target: str, spec: SeedLike, *, namespace: str = "default", timeout: float = 60.0
+) -> Dict[str, Any]:
+    """Wait for the server at `target` to pass a health check, then seed it."""
+    from ._health import check_health
+
+    host, port = target.rsplit(":", 1)
+    deadline = time.monotonic() + timeout
+    while not await check_health(host, int(port)):
+        if time.monotonic() > deadline:
+            raise TimeoutError(
+                f"Server on {target} did not become ready within {timeout:.0f}s."
+            )
+        await asyncio.sleep(0.1)
+    return await seed(target, spec, namespace=namespace)
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    states = ", ".join(f"{state} {n}" for state, n in sorted(report["states"].items()))
+    return (
+        f"seeded {report['seeded']} of {report['workflows']} workflows "
+        f"({report['existing']} already present) in {report['elapsed']:.2f}s, "
+        f"{report['rate']:.0f}/s" + (f": {states}" if states else "")
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="seed", description="Seed a running server with workflows."
+    )
+    parser.add_argument("spec", help="Seed spec (TOML/JSON) or directory of histories.")
+    parser.add_argument("--address", default="127.0.0.1:7233")
+    parser.add_argument("--namespace", default="default")
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="Seconds to wait for the server."
+    )
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    report = asyncio.run(
+        seed_when_ready(
+            args.address, args.spec, namespace=args.namespace, timeout=args.timeout
+        )
+    )
+    print(format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
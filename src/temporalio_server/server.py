@@ -0,0 +1,901 @@
+import asyncio
+import logging
+import os
+import re
+import subprocess
+import tempfile
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from ._binary import get_binary_path
+from ._health import check_health
+from ._util import checkpoint_db, clone_file, remove_db_files
+from .dynamic_config import DynamicConfig, DynamicConfigLike
+from .hooks import LifecycleEvent, LifecycleHooks, default_hooks
+from .logs import LogPipeline, LogRecord
+from .metrics import MetricsClient
+from .placement import (
+    check_placement,
+    go_runtime_env,
+    lease_cpus,
+    placement_command,
+    release_cpus,
+)
+
+if TYPE_CHECKING:
+    from .monitor import ResourceMonitor
+    from .network import LatencyProxy, NetworkProfile
+    from .seed import SeedLike
+    from .supervisor import Supervisor
+    from .template import DatabaseTemplate
+    from .workers import WorkerGroup
+
+log = logging.getLogger(__name__)
+
+# Output lines that suggest the frontend is up; each triggers an immediate health probe.
+_STARTED_PATTERN = re.compile(r"^Server:\s|now healthy|started", re.IGNORECASE)
+_METRICS_PATTERN = re.compile(r"^Metrics:\s+(\S+)")
+# Banner lines giving the bound frontend and UI addresses.
+_SERVER_PATTERN = re.compile(r"^Server:\s+\S*:(\d+)\s*$")
+_UI_PATTERN = re.compile(r"^UI:\s+\S*:(\d+)/?\s*$")
+_ADDRESS_IN_USE_PATTERN = re.compile(
+    r"address already in use|only one usage of each socket address", re.IGNORECASE
+)
+# Attempts to start a server on auto-allocated ports that turn out to be taken.
+_PORT_ATTEMPTS = 3
+
+
+class DevServer:
+    """Manages a Temporal development server subprocess via async context manager."""
+
+    def __init__(
+        self,
+        *,  # Force keyword args
+        port: int = 7233,
+        ui_port: int = 8233,
+        metrics_port: Optional[int] = 0,
+        db_filename: Optional[str] = None,
+        namespace: Sequence[str] = ("default",),
+        ip: str = "127.0.0.1",
+        log_level: str = "warn",
+        extra_args: Sequence[str] = (),
+        ready_timeout: float = 30.0,
+        template: Optional["DatabaseTemplate"] = None,
+        log_buffer_size: int = 1000,
+        log_file: Optional[str] = None,
+        log_file_max_bytes: int = 10 * 1024 * 1024,
+        log_file_backups: int = 3,
+        shared: Union[bool, str] = False,
+        monitor: Optional["ResourceMonitor"] = None,
+        dynamic_config: Optional[DynamicConfigLike] = None,
+        db_tmpfs: Union[bool, str] = False,
+        db_checkpoint_interval: Optional[float] = 60.0,
+        cli_version: Optional[str] = None,
+        hooks: Optional[LifecycleHooks] = None,
+        gomaxprocs: Optional[int] = None,
+        gogc: Optional[Union[int, str]] = None,
+        gomemlimit: Optional[Union[int, str]] = None,
+        cpu_affinity: Optional[Sequence[int]] = None,
+        cpu_partition: Optional[int] = None,
+        nice: Optional[int] = None,
+        network: Optional["NetworkProfile"] = None,
+        seed: Optional["SeedLike"] = None,
+        supervise: Union[bool, "Supervisor"] = False,
+    ) -> None:
+        """Initialize the DevServer manager.
+
+        Args:
+            port: Port for the frontend gRPC service. 0 allocates a free port
+                (see `temporalio_server.ports`); `port` and `target` are set
+                to the bound port once the server is ready.
+            ui_port: Port for the Web UI. 0 allocates a free port.
+            metrics_port: Port for metrics endpoint. Defaults to dynamic.
+            db_filename: File path for the SQLite DB. Defaults to in-memory.
+            namespace: List of namespaces to create. Defaults to ['default'].
+            ip: IP address to bind services to.
+            log_level: Log level for the server process (debug, info, warn, error).
+            extra_args: Additional arguments for `temporal server start-dev`.
+            ready_timeout: Seconds to wait for the server to pass a health check.
+            template: Start from a copy of this template database. The copy is
+                written to `db_filename` (replacing it) if given, else to a
+                temporary file that is removed on exit.
+            log_buffer_size: Number of recent output lines kept in memory.
+            log_file: Also write all server output to this file, rotating it
+                at `log_file_max_bytes` and keeping `log_file_backups` old files.
+            shared: Attach to a shared background daemon (see
+                `temporalio_server.daemon`) instead of spawning a server,
+                starting the daemon if needed. Pass a string to use a named
+                daemon. The daemon picks free ports, so `port` and `ui_port`
+                are ignored and set from the daemon on entry.
+            monitor: Sample the server process's resource usage (RSS, CPU,
+                threads, FDs, I/O) with this ResourceMonitor while it runs.
+            dynamic_config: Server dynamic config: a DynamicConfig, a preset
+                name such as "high-throughput", or a mapping of keys to values.
+            db_tmpfs: Run the live database on a tmpfs (True for /dev/shm, or a
+                directory path) and treat `db_filename` as its durable copy:
+                it is restored from on start and written to every
+                `db_checkpoint_interval` seconds and on clean shutdown.
+            db_checkpoint_interval: Seconds between checkpoints of a tmpfs
+                database. None checkpoints only on shutdown.
+            cli_version: Temporal CLI version to run, e.g. "1.2.0". Defaults to
+                the bundled binary; see `get_binary_path` for other versions.
+            hooks: Lifecycle callbacks (spawn, ready, exit, kill) with
+                monotonic timings, in addition to `hooks.default_hooks`.
+            gomaxprocs: GOMAXPROCS for the server process. Defaults to the
+                number of CPUs it may run on.
+            gogc: GOGC (GC target percentage, or "off") for the server process.
+            gomemlimit: GOMEMLIMIT for the server process, in bytes or as a Go
+                size such as "512MiB".
+            cpu_affinity: Pin the server process to these CPUs (Linux).
+            cpu_partition: Pin the server process to this many CPUs, chosen to
+                be disjoint from other servers started with `cpu_partition`
+                on this machine while there are enough (Linux; see
+                `temporalio_server.placement`).
+            nice: Niceness increment for the server process (POSIX).
+            network: Add latency, jitter and a bandwidth limit between clients
+                and the server with a proxy (see `temporalio_server.network`).
+                `target` is then the proxy's address; `port` remains the
+                server's own port.
+            seed: Seed the server with workflows once it is ready: a seed
+                spec file, dict or SeedSpec, or a directory of exported
+                histories (see `temporalio_server.seed`). Requires temporalio.
+                The report is kept in `seed_report`.
+            supervise: Watch the server once it is ready and restart it on the
+                same ports and database if it crashes or stops answering
+                health checks. True uses a default Supervisor; pass one to
+                configure it (see `temporalio_server.supervisor`). Restarts
+                and downtime are recorded in `supervisor`.
+        """
+        if db_tmpfs and not db_filename:
+            raise ValueError("db_tmpfs requires db_filename for the durable copy.")
+        if cpu_affinity is not None and cpu_partition is not None:
+            raise ValueError("Pass at most one of cpu_affinity and cpu_partition.")
+        if supervise and shared:
+            raise ValueError("A shared server cannot be supervised.")
+        check_placement(cpu_affinity, nice)
+        self.port = port
+        self.ui_port = ui_port
+        # Ports that are allocated on each start, rather than fixed.
+        self._auto_ports = [
+            key for key, value in (("port", port), ("ui_port", ui_port)) if value == 0
+        ]
+        self._port_lease: Optional[str] = None
+        self.metrics_port = metrics_port
+        self.db_filename = db_filename
+        self.namespace = namespace
+        self.ip = ip
+        self.log_level = log_level
+        self.extra_args = extra_args
+        self.ready_timeout = ready_timeout
+        self.template = template
+        self.log_buffer_size = log_buffer_size
+        self.log_file = log_file
+        self.log_file_max_bytes = log_file_max_bytes
+        self.log_file_backups = log_file_backups
+        self.log_pipeline: Optional[LogPipeline] = None
+        self.metrics_url: Optional[str] = None
+        self._metrics_url_known: Optional[asyncio.Event] = None
+        self._metrics: Optional[MetricsClient] = None
+        self.shared = shared
+        self._shared_token: Optional[str] = None
+        self.monitor = monitor
+        self.dynamic_config = (
+            DynamicConfig.coerce(dynamic_config) if dynamic_config is not None else None
+        )
+        self._temp_db: Optional[str] = None
+        self.db_tmpfs = db_tmpfs
+        self.db_checkpoint_interval = db_checkpoint_interval
+        self.cli_version = cli_version
+        self.hooks = hooks if hooks is not None else LifecycleHooks()
+        self.gomaxprocs = gomaxprocs
+        self.gogc = gogc
+        self.gomemlimit = gomemlimit
+        self._go_env = go_runtime_env(gomaxprocs, gogc, gomemlimit)
+        self.cpu_affinity = cpu_affinity
+        self.cpu_partition = cpu_partition
+        self.nice = nice
+        self.cpus: Optional[List[int]] = list(cpu_affinity) if cpu_affinity else None
+        self._cpu_lease: Optional[str] = None
+        self.network = network
+        self.proxy: Optional["LatencyProxy"] = None
+        self.seed = seed
+        self.seed_report: Optional[Dict[str, Any]] = None
+        self.supervisor: Optional["Supervisor"] = None
+        if supervise is True:
+            from .supervisor import Supervisor
+
+            self.supervisor = Supervisor()
+        elif supervise:
+            self.supervisor = supervise
+        self.last_checkpoint: Optional[float] = None
+        self._live_db: Optional[str] = None
+        self._checkpoint_task: Optional["asyncio.Task[None]"] = None
+        self._worker_groups: List["WorkerGroup"] = []
+        self.process: Optional[asyncio.subprocess.Process] = None
+
+    @property
+    def target(self) -> str:
+        """Address for clients: the network proxy's if there is one, else the server."""
+        if self.proxy is not None:
+            return self.proxy.address
+        return f"{self.ip}:{self.port}"
+
+    @property
+    def metrics(self) -> MetricsClient:
+        """Client for the server's Prometheus metrics endpoint.
+
+        Example:
+            snapshot = await server.metrics.snapshot()
+            print(snapshot.get("service_requests", operation="StartWorkflowExecution"))
+        """
+        if self._metrics is None:
+            self._metrics = MetricsClient(self)
+        return self._metrics
+
+    def logs(
+        self, level: Optional[str] = None, streams: Sequence[str] = ("stdout", "stderr")
+    ) -> AsyncIterator[LogRecord]:
+        """Iterate over server output lines as they arrive, until the server exits.
+
+        Example:
+            async for rec in server.logs(level="warn"):
+                print(rec.level, rec.message)
+
+        Args:
+            level: Minimum level (debug, info, warn, error).
+            streams: Which output streams to include.
+        """
+        if self.log_pipeline is None:
+            raise RuntimeError("Server is not running.")
+        return self.log_pipeline.subscribe(level, streams)
+
+    def recent_logs(self, n: Optional[int] = None) -> List[LogRecord]:
+        """Return the last `n` buffered output lines."""
+        return self.log_pipeline.recent(n) if self.log_pipeline else []
+
+    async def __aenter__(self) -> "DevServer":
+        if self.shared:
+            await self._attach_shared()
+            try:
+                await self._finish_start()
+            except BaseException:
+                await self._detach_shared()
+                raise
+            return self
+        try:
+            await self._start()
+            await self._finish_start()
+        except BaseException:
+            log.error("Server failed to start. Terminating process.")
+            await self._stop(checkpoint=False)
+            raise
+
+        log.info(f"Temporal server ready on {self.target}")
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._shared_token is not None:
+            await self._stop_workers()
+            await self._stop_proxy()
+            await self._detach_shared()
+            return
+        log.info("Shutting down Temporal server...")
+        await self._stop()
+        log.info("Temporal server shut down.")
+
+    async def _stop(self, grace: float = 10.0, checkpoint: bool = True) -> None:
+        if self.supervisor is not None:
+            await self.supervisor.stop()
+        await self._stop_workers(grace)
+        await self._stop_proxy()
+        await self._terminate_process(grace)
+        await self._release_db(checkpoint)
+        self._release_ports()
+
+    async def restart(self, grace: float = 10.0) -> None:
+        """Replace the server process with a new one on the same ports and database.
+
+        The network proxy and worker processes are kept; their connections
+        to the server are re-established. Output subscriptions from `logs()`
+        end with the old process.
+
+        Args:
+            grace: Seconds between SIGTERM and SIGKILL for the old process.
+        """
+        if self._shared_token is not None:
+            raise RuntimeError("A shared server cannot be restarted.")
+        await self._terminate_process(grace)
+        await self._spawn(restart=True)
+        await self._wait_for_server_ready()
+
+    async def checkpoint(self) -> None:
+        """Copy the live tmpfs database to `db_filename` now (see `db_tmpfs`)."""
+        if self._live_db is None:
+            raise RuntimeError("No tmpfs database to checkpoint.")
+        assert self.db_filename is not None
+        t0 = time.monotonic()
+        await asyncio.to_thread(checkpoint_db, self._live_db, self.db_filename)
+        self.last_checkpoint = time.time()
+        log.debug(
+            f"Checkpointed {self._live_db} to {self.db_filename} "
+            f"in {time.monotonic() - t0:.3f}s"
+        )
+
+    async def spawn_workers(
+        self,
+        n: Optional[int] = None,
+        *,
+        task_queue: str,
+        workflows: Sequence[type] = (),
+        activities: Sequence[Any] = (),
+        namespace: Optional[str] = None,
+        **kwargs: Any,
+    ) -> "WorkerGroup":
+        """Start `n` worker processes (default: one per CPU) polling `task_queue`.
+
+        Returns once every process is polling. The workers are stopped before
+        the server shuts down. See `temporalio_server.workers.WorkerGroup` for
+        the other keyword arguments.
+
+        Example:
+            workers = await server.spawn_workers(
+                task_queue="load", workflows=[MyWorkflow], activities=[my_activity]
+            )
+            await workers.wait()  # Raises WorkerCrashed if a worker dies.
+        """
+        from .workers import WorkerGroup
+
+        group = WorkerGroup(
+            self.target,
+            n,
+            task_queue=task_queue,
+            workflows=workflows,
+            activities=activities,
+            namespace=namespace or next(iter(self.namespace), "default"),
+            **kwargs,
+        )
+        await group.start()
+        self._worker_groups.append(group)
+        return group
+
+    async def _stop_workers(self, grace: Optional[float] = None) -> None:
+        groups, self._worker_groups = self._worker_groups, []
+        await asyncio.gather(*(group.stop(grace) for group in groups))
+
+    async def _start(self, timeout: Optional[float] = None) -> None:
+        """Spawn the server and wait until it is ready.
+
+        If auto-allocated ports turn out to be taken (by a process not using
+        the allocator), the server is restarted on newly allocated ports.
+        """
+        for attempt in range(1, _PORT_ATTEMPTS + 1):
+            await self._spawn()
+            try:
+                await self._wait_for_server_ready(timeout)
+                return
+            except RuntimeError as e:
+                if (
+                    attempt == _PORT_ATTEMPTS
+                    or not self._auto_ports
+                    or not _ADDRESS_IN_USE_PATTERN.search(str(e))
+                ):
+                    raise
+            log.warning(
+                f"Port conflict starting server on {self.target}; "
+                "retrying on new ports."
+            )
+            await self._terminate_process()
+            await self._release_db(checkpoint=False)
+            self._release_ports()
+
+    async def _finish_start(self) -> None:
+        """Seed the ready server and start the network proxy, if asked to."""
+        if self.seed is not None:
+            from .seed import seed
+
+            self.seed_report = await seed(
+                f"{self.ip}:{self.port}",
+                self.seed,
+                namespace=next(iter(self.namespace), "default"),
+            )
+        await self._start_proxy()
+        if self.supervisor is not None:
+            self.supervisor.start(self)
+
+    async def _start_proxy(self) -> None:
+        if self.network is None:
+            return
+        from .network import LatencyProxy
+
+        proxy = LatencyProxy((self.ip, self.port), self.network, host=self.ip)
+        await proxy.start()
+        self.proxy = proxy
+
+    async def _stop_proxy(self) -> None:
+        # The proxy is kept so that its connection stats can be read after shutdown.
+        if self.proxy is not None:
+            await self.proxy.close()
+
+    def _shared_name(self) -> str:
+        from . import daemon
+
+        return self.shared if isinstance(self.shared, str) else daemon.DEFAULT_NAME
+
+    async def _attach_shared(self) -> None:
+        from . import daemon
+
+        server_kwargs = {
+            "ip": self.ip,
+            "namespace": list(self.namespace),
+            "log_level": self.log_level,
+            "metrics_port": self.metrics_port,
+            "extra_args": [*self._dynamic_config_args(), *self.extra_args],
+        }
+        if self.db_filename:
+            server_kwargs["db_filename"] = self.db_filename
+        if self.cli_version:
+            server_kwargs["cli_version"] = self.cli_version
+        for key in (
+            "gomaxprocs",
+            "gogc",
+            "gomemlimit",
+            "cpu_affinity",
+            "cpu_partition",
+            "nice",
+        ):
+            if getattr(self, key) is not None:
+                server_kwargs[key] = getattr(self, key)
+        entry = await asyncio.to_thread(
+            daemon.attach,
+            self._shared_name(),
+            timeout=self.ready_timeout,
+            **server_kwargs,
+        )
+        self._shared_token = entry["token"]
+        self.ip = entry["ip"]
+        self.port = entry["port"]
+        self.ui_port = entry["ui_port"]
+        self.metrics_url = entry.get("metrics_url")
+        self._metrics_url_known = asyncio.Event()
+        if self.metrics_url:
+            self._metrics_url_known.set()
+        log.info(f"Attached to shared Temporal server on {self.target}")
+
+    async def _detach_shared(self) -> None:
+        from . import daemon
+
+        assert self._shared_token is not None
+        await asyncio.to_thread(daemon.detach, self._shared_token, self._shared_name())
+        self._shared_token = None
+        log.info(f"Detached from shared Temporal server on {self.target}")
+
+    def _build_args(self) -> List[str]:
+        binary_path = get_binary_path(self.cli_version)
+        args: List[str] = [
+            str(binary_path),
+            "server",
+            "start-dev",
+            "--ip",
+            self.ip,
+            "--port",
+            str(self.port),
+            "--ui-port",
+            str(self.ui_port),
+            "--log-level",
+            self.log_level,
+        ]
+        db_filename = self._live_db or self._temp_db or self.db_filename
+        if db_filename:
+            args.extend(("--db-filename", db_filename))
+        if self.metrics_port is not None:
+            args.extend(("--metrics-port", str(self.metrics_port)))
+        for ns in self.namespace:
+            args.extend(("--namespace", ns))
+        args.extend(self._dynamic_config_args())
+        args.extend(self.extra_args)
+        return args
+
+    def _dynamic_config_args(self) -> List[str]:
+        return self.dynamic_config.to_args() if self.dynamic_config else []
+
+    async def _prepare_db(self) -> None:
+        if self.db_tmpfs:
+            self._live_db = self._make_live_db_path()
+            if self.template is None and os.path.exists(self.db_filename):
+                log.debug(f"Restoring {self.db_filename} to {self._live_db}")
+                await asyncio.to_thread(clone_file, self.db_filename, self._live_db)
+        if self.template is None:
+            return
+        template_path = await self.template.ensure()
+        if self._live_db:
+            db_path = self._live_db
+        elif self.db_filename:
+            db_path = self.db_filename
+        else:
+            fd, db_path = tempfile.mkstemp(prefix="temporalio-server-", suffix=".db")
+            os.close(fd)
+            self._temp_db = db_path
+        log.debug(f"Cloning template database {template_path} to {db_path}")
+        # Stale -wal/-shm files would otherwise be replayed onto the fresh copy.
+        remove_db_files(db_path)
+        await asyncio.to_thread(clone_file, template_path, db_path)
+
+    def _make_live_db_path(self) -> str:
+        if isinstance(self.db_tmpfs, str):
+            tmpfs_dir = self.db_tmpfs
+        elif os.path.isdir("/dev/shm"):
+            tmpfs_dir = "/dev/shm"
+        else:
+            tmpfs_dir = tempfile.gettempdir()
+            log.warning(
+                f"/dev/shm not available; using {tmpfs_dir} for the live database."
+            )
+        fd, path = tempfile.mkstemp(
+            prefix="temporalio-server-", suffix=".db", dir=tmpfs_dir
+        )
+        os.close(fd)
+        os.unlink(path)  # The server creates it, or it is restored from db_filename.
+        return path
+
+    async def _checkpoint_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            if self._live_db is None or not os.path.exists(self._live_db):
+                continue  # The server has not created the database yet.
+            try:
+                await self.checkpoint()
+            except Exception as e:
+                log.warning(f"Database checkpoint failed: {e}")
+
+    async def _release_db(self, checkpoint: bool) -> None:
+        """Stop checkpointing, checkpoint once more if asked, remove temporary DBs."""
+        if self._checkpoint_task is not None:
+            self._checkpoint_task.cancel()
+            await asyncio.gather(self._checkpoint_task, return_exceptions=True)
+            self._checkpoint_task = None
+        if self._live_db is not None:
+            try:
+                if checkpoint and os.path.exists(self._live_db):
+                    await self.checkpoint()
+            finally:
+                remove_db_files(self._live_db)
+                self._live_db = None
+        if self._temp_db is not None:
+            remove_db_files(self._temp_db)
+            self._temp_db = None
+
+    async def _allocate_ports(self) -> None:
+        # The lease is held until the server is stopped, so that a restart
+        # can rebind the same ports without another allocator taking them.
+        if not self._auto_ports:
+            return
+        from .ports import allocate_ports
+
+        self._port_lease, ports = await asyncio.to_thread(
+            allocate_ports, self.ip, len(self._auto_ports)
+        )
+        for key, port in zip(self._auto_ports, ports):
+            setattr(self, key, port)
+
+    def _release_ports(self) -> None:
+        if self._port_lease is not None:
+            from .ports import release_ports
+
+            release_ports(self._port_lease)
+            self._port_lease = None
+
+    async def _spawn(self, restart: bool = False) -> None:
+        """Start the server process.
+
+        On a restart, the ports and database of the previous process are
+        reused, and checkpointing carries on.
+        """
+        t0 = time.monotonic()
+        if not restart:
+            await self._allocate_ports()
+            await self._prepare_db()
+        t1 = time.monotonic()
+        get_binary_path(self.cli_version)  # Timed here; _build_args hits the cache.
+        t2 = time.monotonic()
+        args = self._build_args()
+        if self.cpu_partition is not None:
+            self._cpu_lease, self.cpus = await asyncio.to_thread(
+                lease_cpus, self.cpu_partition
+            )
+        args = placement_command(self.cpus, self.nice) + args
+        go_env = self._go_env
+        env = {**os.environ, **go_env} if go_env else None
+        log.info(f"Starting Temporal server: {' '.join(args)}")
+        if go_env or self.cpus or self.nice:
+            log.info(
+                f"Server process settings: {go_env} CPUs: {self.cpus} nice: {self.nice}"
+            )
+        try:
+            t3 = time.monotonic()
+            self.process = await asyncio.create_subprocess_exec(
+                args[0],
+                *args[1:],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=env,
+            )
+            log.debug(f"Server process started [PID: {self.process.pid}]")
+        except Exception as e:
+            self._release_cpus()
+            raise RuntimeError("Failed to start Temporal server process") from e
+        t4 = time.monotonic()
+        self._emit(
+            "spawn",
+            t0,
+            t4,
+            {"prepare_db": t1 - t0, "binary_lookup": t2 - t1, "exec": t4 - t3},
+        )
+        self.log_pipeline = LogPipeline(
+            buffer_size=self.log_buffer_size,
+            log_file=self.log_file,
+            log_file_max_bytes=self.log_file_max_bytes,
+            log_file_backups=self.log_file_backups,
+        )
+        self.metrics_url = None
+        self._metrics_url_known = asyncio.Event()
+        self.log_pipeline.add_listener(self._on_output)
+        self.log_pipeline.start(self.process)
+        if self.monitor is not None:
+            self.monitor.start(self.process.pid)
+        if not restart and self._live_db is not None and self.db_checkpoint_interval:
+            self._checkpoint_task = asyncio.create_task(
+                self._checkpoint_periodically(self.db_checkpoint_interval)
+            )
+
+    def _on_output(self, record: LogRecord) -> None:
+        if record.stream != "stdout":
+            return
+        # Take the ports the server reports having bound from its banner.
+        match = _SERVER_PATTERN.match(record.line)
+        if match:
+            self.port = int(match.group(1))
+            return
+        match = _UI_PATTERN.match(record.line)
+        if match:
+            self.ui_port = int(match.group(1))
+            return
+        if self.metrics_url is not None:
+            return
+        match = _METRICS_PATTERN.match(record.line)
+        if match and self._metrics_url_known is not None:
+            self.metrics_url = match.group(1)
+            self._metrics_url_known.set()
+
+    async def cli(self, *args: str) -> str:
+        """Run a `temporal` CLI command against this server and return its stdout.
+
+        Args:
+            args: CLI arguments, e.g. ("operator", "namespace", "list").
+        """
+        cli_args = [
+            str(get_binary_path(self.cli_version)),
+            *args,
+            "--address",
+            f"{self.ip}:{self.port}",  # Not through the network proxy.
+        ]
+        log.debug(f"Running: {' '.join(cli_args)}")
+        proc = await asyncio.create_subprocess_exec(
+            cli_args[0],
+            *cli_args[1:],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(
+                f"`temporal {' '.join(args)}` failed [Code: {proc.returncode}]: "
+                f"{stderr.decode(errors='replace').strip()}"
+            )
+        return stdout.decode(errors="replace")
+
+    async def _terminate_process(self, grace: float = 10.0) -> None:
+        """Send SIGTERM, then SIGKILL if still running after `grace` seconds."""
+        if self.monitor is not None:
+            await self.monitor.stop()
+        if not self.process or self.process.returncode is not None:
+            if self.process is not None:
+                # Exited on its own; report it with no shutdown phases.
+                now = time.monotonic()
+                self._emit(
+                    "exit",
+                    now,
+                    now,
+                    {},
+                    returncode=self.process.returncode,
+                    killed=False,
+                )
+                self.process = None
+            self._release_cpus()
+            await self._close_logs()
+            return
+
+        pid = self.process.pid  # Store pid in case self.process becomes None
+        log.debug(f"Sending SIGTERM to temporal process [PID: {pid}]...")
+        start = time.monotonic()
+        killed_at: Optional[float] = None
+        try:
+            self.process.terminate()
+            await asyncio.wait_for(self.process.wait(), timeout=grace)
+            log.debug(
+                f"Server process [PID: {pid}] terminated gracefully "
+                f"[Code: {self.process.returncode}]."
+            )
+        except asyncio.TimeoutError:
+            log.warning(
+                f"Server process [PID: {pid}] did not exit gracefully after "
+                f"{grace:g}s. Sending SIGKILL."
+            )
+            killed_at = time.monotonic()
+            try:
+                self.process.kill()
+                await asyncio.wait_for(self.process.wait(), timeout=5)
+                log.debug(
+                    f"Server process [PID: {pid}] killed "
+                    f"[Code: {self.process.returncode}]."
+                )
+            except asyncio.TimeoutError:
+                log.error(
+                    f"Server process [PID: {pid}] did not terminate after SIGKILL."
+                )
+            except Exception as inner_e:
+                log.error(f"Error waiting for killed process [PID: {pid}]: {inner_e}")
+        except Exception as e:
+            log.error(f"Error terminating server process [PID: {pid}]: {e}")
+        finally:
+            self._emit_exit(start, killed_at, grace)
+            self.process = None
+            self._release_cpus()
+            await self._close_logs()
+
+    def _release_cpus(self) -> None:
+        if self._cpu_lease is not None:
+            release_cpus(self._cpu_lease)
+            self._cpu_lease = None
+            self.cpus = None
+
+    def _emit_exit(
+        self, start: float, killed_at: Optional[float], grace: float
+    ) -> None:
+        end = time.monotonic()
+        returncode = self.process.returncode if self.process else None
+        if killed_at is None:
+            phases = {"grace_wait": end - start}
+            self._emit("exit", start, end, phases, returncode=returncode, killed=False)
+            return
+        kill_wait = end - killed_at
+        self._emit(
+            "kill",
+            killed_at,
+            end,
+            {"kill_wait": kill_wait},
+            returncode=returncode,
+            grace=grace,
+        )
+        self._emit(
+            "exit",
+            start,
+            end,
+            {"grace_wait": killed_at - start, "kill_wait": kill_wait},
+            returncode=returncode,
+            killed=True,
+        )
+
+    def _emit(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        phases: Dict[str, float],
+        **attributes: Any,
+    ) -> None:
+        if not self.hooks and not default_hooks:
+            return
+        event = LifecycleEvent(
+            name=name,
+            target=self.target,
+            start=start,
+            end=end,
+            pid=self.process.pid if self.process else None,
+            phases=phases,
+            attributes=attributes,
+        )
+        self.hooks.emit(event)
+        default_hooks.emit(event)
+
+    async def _close_logs(self) -> None:
+        if self.log_pipeline is not None:
+            await self.log_pipeline.close()
+
+    async def _wait_for_server_ready(self, timeout: Optional[float] = None) -> None:
+        """Wait until the frontend answers a gRPC health check.
+
+        A health probe runs with adaptive backoff, and is woken early when the
+        server logs a startup line. Process exit fails the wait immediately.
+        """
+        if not self.process or not self.log_pipeline:
+            raise RuntimeError("Server process not available.")
+        if timeout is None:
+            timeout = self.ready_timeout
+
+        t0 = time.monotonic()
+        started = asyncio.Event()
+        first_startup_line: Optional[float] = None
+
+        def on_record(record: LogRecord) -> None:
+            nonlocal first_startup_line
+            if _STARTED_PATTERN.search(record.line):
+                if first_startup_line is None:
+                    first_startup_line = time.monotonic()
+                started.set()
+
+        self.log_pipeline.add_listener(on_record)
+        exit_task = asyncio.create_task(self.process.wait())
+        probe_task = asyncio.create_task(self._probe_until_healthy(started))
+        try:
+            done, _ = await asyncio.wait(
+                {exit_task, probe_task},
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if probe_task in done:
+                probes, first_connect = probe_task.result()
+                end = time.monotonic()
+                phases = {"wait": end - t0, "first_connect": first_connect}
+                if first_startup_line is not None:
+                    phases["startup_line"] = first_startup_line - t0
+                self._emit("ready", t0, end, phases, probes=probes)
+                log.debug(f"Health check passed on {self.target}. Server is ready.")
+                return
+            if exit_task in done:
+                # Let the pipeline collect whatever the process wrote before exiting.
+                await self.log_pipeline.wait_drained(timeout=1.0)
+                raise RuntimeError(
+                    "Server process exited prematurely "
+                    f"[Code: {self.process.returncode}]. "
+                    f"Output: {self._recent_output()}"
+                )
+            raise TimeoutError(
+                f"Server did not become ready on {self.target} within "
+                f"{timeout:.1f}s. Output: {self._recent_output()}"
+            )
+        finally:
+            self.log_pipeline.remove_listener(on_record)
+            for task in (probe_task, exit_task):
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(probe_task, exit_task, return_exceptions=True)
+
+    async def _probe_until_healthy(self, started: asyncio.Event) -> Tuple[int, float]:
+        """Probe until healthy; return the probe count and the last probe's duration."""
+        delay = 0.005
+        probes = 0
+        while True:
+            probes += 1
+            t0 = time.monotonic()
+            if await check_health(self.ip, self.port, timeout=1.0):
+                return probes, time.monotonic() - t0
+            try:
+                await asyncio.wait_for(started.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                delay = min(delay * 2, 0.25)
+            else:
+                # A startup line was logged: probe again right away.
+                started.clear()
+
+    def _recent_output(self, n: int = 200) -> str:
+        return "\n".join(record.line for record in self.recent_logs(n))
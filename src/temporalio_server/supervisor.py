@@ -0,0 +1,269 @@
+"""Supervision for long-running servers: a health watchdog with automatic restart.
+
+`DevServer(supervise=True)` (or `supervise=Supervisor(...)`) watches the
+server process once it is ready. A crash is noticed as soon as the process
+exits; a hang is noticed when the gRPC health check has not succeeded for
+`deadline` seconds. Either way the process is replaced on the same ports
+and database (`DevServer.restart`), so clients and workers reconnect
+without changes; a hung process is killed without a grace period, which is
+reserved for restarts an operator asks for. Repeated failures back off
+exponentially.
+
+The probe is the same hand-rolled health check used for readiness: one
+short TCP connection per `interval`, with no client library. Its latency is
+recorded, along with each restart and the total downtime.
+
+With the default in-memory database, a restart loses all server state; use
+`db_filename` (optionally with `db_tmpfs`) to keep it.
+
+Example:
+    supervisor = Supervisor(interval=0.5, deadline=3.0)
+    async with DevServer(db_filename="soak.db", supervise=supervisor) as server:
+        ...
+    print(supervisor.summary())
+"""
+
+import asyncio
+import logging
+import time
+from array import array
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from ._health import check_health
+from ._util import percentile
+
+if TYPE_CHECKING:
+    from .server import DevServer
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class Restart:
+    """One recovery from a crash or hang. Times are from time.monotonic().
+
+    Attributes:
+        reason: "exit" if the process exited, "hang" if it stopped answering.
+        down_since: When the server was first seen to be down.
+        detected: When the supervisor decided to restart it.
+        returncode: Exit code of a process that exited.
+        attempts: Restarts tried, including failed ones.
+        ready: When the replacement process was ready; None while recovering.
+        restart_time: Seconds from the start of the successful attempt to ready.
+    """
+
+    reason: str
+    down_since: float
+    detected: float
+    returncode: Optional[int] = None
+    attempts: int = 0
+    ready: Optional[float] = None
+    restart_time: Optional[float] = None
+
+    @property
+    def downtime(self) -> float:
+        return (self.ready or time.monotonic()) - self.down_since
+
+
+class Supervisor:
+    """Probes a running DevServer and restarts it when it crashes or hangs."""
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        probe_timeout: float = 1.0,
+        deadline: float = 5.0,
+        backoff_initial: float = 0.1,
+        backoff_max: float = 30.0,
+        stable_after: float = 60.0,
+        max_restarts: Optional[int] = None,
+    ) -> None:
+        """Initialize the supervisor.
+
+        Args:
+            interval: Seconds between health probes.
+            probe_timeout: Seconds before a probe counts as failed.
+            deadline: Restart the server when no probe has succeeded for this
+                many seconds.
+            backoff_initial: Delay before the second of a run of restarts;
+                it doubles for each further one, up to `backoff_max`. The
+                first restart is immediate.
+            backoff_max: Longest delay between restarts.
+            stable_after: A server that stays healthy this many seconds after
+                a restart ends the run, resetting the backoff.
+            max_restarts: Give up after this many restarts in a run, leaving
+                the server down and the reason in `error`. None never gives up.
+        """
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.deadline = deadline
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.max_restarts = max_restarts
+        self.restarts: List[Restart] = []
+        self.probes = 0
+        self.failed_probes = 0
+        self.probe_latencies = array("d")
+        self.error: Optional[str] = None
+        self._consecutive = 0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def downtime(self) -> float:
+        """Total seconds the server has been down, including any current outage."""
+        return sum(r.downtime for r in self.restarts)
+
+    def start(self, server: "DevServer") -> None:
+        """Begin supervising `server`, which must be running and ready."""
+        if self.running:
+            raise RuntimeError("Supervisor is already running.")
+        self.error = None
+        self._consecutive = 0
+        self._task = asyncio.create_task(self._run(server))
+
+    async def stop(self) -> None:
+        """Stop supervising. A restart in progress is abandoned."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def summary(self) -> Dict[str, Any]:
+        """Restart counts, downtime, and probe latency and restart time percentiles."""
+        latencies = sorted(self.probe_latencies)
+        restart_times = sorted(
+            r.restart_time for r in self.restarts if r.restart_time is not None
+        )
+        return {
+            "restarts": len(self.restarts),
+            "crashes": sum(r.reason == "exit" for r in self.restarts),
+            "hangs": sum(r.reason == "hang" for r in self.restarts),
+            "downtime": self.downtime,
+            "probes": self.probes,
+            "failed_probes": self.failed_probes,
+            "probe_latency": {
+                "p50": percentile(latencies, 50),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else float("nan"),
+            },
+            "restart_time": {
+                "p50": percentile(restart_times, 50),
+                "max": restart_times[-1] if restart_times else float("nan"),
+            },
+            "error": self.error,
+        }
+
+    async def _run(self, server: "DevServer") -> None:
+        exit_task: Optional["asyncio.Future[int]"] = None
+        try:
+            last_ok = time.monotonic()
+            first_failure: Optional[float] = None
+            next_time = last_ok
+            while True:
+                process = server.process
+                if process is None:
+                    raise RuntimeError("Supervised server has no process.")
+                if exit_task is None:
+                    exit_task = asyncio.ensure_future(process.wait())
+                next_time += self.interval
+                delay = max(0.0, next_time - time.monotonic())
+                await asyncio.wait({exit_task}, timeout=delay)
+                if exit_task.done():
+                    down_since = first_failure or time.monotonic()
+                    await self._recover(server, "exit", down_since, exit_task.result())
+                elif await self._probe(server):
+                    last_ok, first_failure = time.monotonic(), None
+                    if self._consecutive and self._stable(last_ok):
+                        self._consecutive = 0
+                    continue
+                else:
+                    now = time.monotonic()
+                    first_failure = first_failure or now
+                    if now - last_ok < self.deadline:
+                        continue
+                    log.warning(
+                        f"Server on {server.ip}:{server.port} has not answered a "
+                        f"health check for {now - last_ok:.1f}s; restarting it."
+                    )
+                    await self._recover(server, "hang", first_failure, None)
+                exit_task = None
+                last_ok = next_time = time.monotonic()
+                first_failure = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error = str(e)
+            log.error(f"Server supervision stopped: {e}")
+        finally:
+            if exit_task is not None and not exit_task.done():
+                exit_task.cancel()
+
+    def _stable(self, now: float) -> bool:
+        ready = self.restarts[-1].ready
+        return ready is not None and now - ready >= self.stable_after
+
+    async def _probe(self, server: "DevServer") -> bool:
+        self.probes += 1
+        t0 = time.monotonic()
+        ok = await check_health(server.ip, server.port, timeout=self.probe_timeout)
+        if ok:
+            self.probe_latencies.append(time.monotonic() - t0)
+        else:
+            self.failed_probes += 1
+        return ok
+
+    async def _recover(
+        self,
+        server: "DevServer",
+        reason: str,
+        down_since: float,
+        returncode: Optional[int],
+    ) -> None:
+        restart = Restart(
+            reason=reason,
+            down_since=down_since,
+            detected=time.monotonic(),
+            returncode=returncode,
+        )
+        self.restarts.append(restart)
+        if reason == "exit":
+            log.warning(
+                f"Server on {server.ip}:{server.port} exited [Code: {returncode}]; "
+                "restarting it."
+            )
+        while True:
+            if self.max_restarts is not None and self._consecutive >= self.max_restarts:
+                raise RuntimeError(
+                    f"Gave up after {self._consecutive} restarts "
+                    "without a stable server."
+                )
+            if self._consecutive:
+                delay = min(
+                    self.backoff_initial * 2 ** (self._consecutive - 1),
+                    self.backoff_max,
+                )
+                log.info(f"Restarting server in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            self._consecutive += 1
+            restart.attempts += 1
+            t0 = time.monotonic()
+            try:
+                # A server that failed its health checks for `deadline` is
+                # killed at once; SQLite recovers its WAL on the next open.
+                await server.restart(grace=0.0)
+            except (RuntimeError, TimeoutError) as e:
+                log.warning(f"Server restart failed: {e}")
+                continue
+            restart.ready = time.monotonic()
+            restart.restart_time = restart.ready - t0
+            log.info(
+                f"Server restarted on {server.ip}:{server.port} "
+                f"in {restart.restart_time:.3f}s (down {restart.downtime:.3f}s)"
+            )
+            return
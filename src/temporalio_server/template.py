@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import inspect
+import logging
+import os
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional, Sequence, Union
+
+from ._binary import get_cli_version
+from ._util import FileLock, checkpoint_db, remove_db_files, user_cache_dir
+from .server import DevServer
+
+log = logging.getLogger(__name__)
+
+SetupFunc = Callable[[DevServer], Awaitable[None]]
+
+
+class DatabaseTemplate:
+    """A SQLite database snapshot that DevServers can start from.
+
+    The template is built once by starting a server on a fresh database file,
+    running `setup` against it, and shutting it down cleanly. It is cached on
+    disk under a key derived from the setup function, `key`, the server
+    options and the CLI version, so it is only rebuilt when one of these
+    changes.
+
+    Example:
+        async def setup(server: DevServer) -> None:
+            await server.cli("operator", "search-attribute", "create", ...)
+
+        template = DatabaseTemplate(setup, namespace=["default", "test"])
+        async with DevServer(template=template) as server:
+            ...
+    """
+
+    def __init__(
+        self,
+        setup: SetupFunc,
+        *,
+        key: str = "",
+        namespace: Sequence[str] = ("default",),
+        cache_dir: Optional[Union[str, Path]] = None,
+        **server_kwargs: Any,
+    ) -> None:
+        """Initialize the template.
+
+        Args:
+            setup: Coroutine run against the template server to populate it.
+            key: Extra cache key input, e.g. a version string for fixture data
+                that the setup function reads from elsewhere.
+            namespace: Namespaces to create in the template database.
+            cache_dir: Where to store built templates. Defaults to the user cache directory.
+            server_kwargs: Other DevServer keyword arguments used while building.
+        """
+        self.setup = setup
+        self.key = key
+        self.namespace = namespace
+        self.cache_dir = (
+            Path(cache_dir) if cache_dir else user_cache_dir() / "templates"
+        )
+        self.server_kwargs = server_kwargs
+
+    @property
+    def cache_key(self) -> str:
+        try:
+            setup_source = inspect.getsource(self.setup)
+        except (OSError, TypeError):
+            setup_source = f"{self.setup.__module__}.{self.setup.__qualname__}"
+        h = hashlib.sha256()
+        for part in (
+            get_cli_version(),
+            setup_source,
+            self.key,
+            repr(list(self.namespace)),
+            repr(sorted(self.server_kwargs.items())),
+        ):
+            h.update(part.encode())
+            h.update(b"\0")
+        return h.hexdigest()[:32]
+
+    @property
+    def path(self) -> Path:
+        return self.cache_dir / f"{self.cache_key}.db"
+
+    async def ensure(self) -> Path:
+        """Return the template database path, building it if it is not cached."""
+        path = self.path
+        if path.is_file():
+            return path
+        lock = FileLock(path.with_suffix(".lock"))
+        await asyncio.to_thread(lock.acquire)
+        try:
+            # Another process may have built it while we waited for the lock.
+            if not path.is_file():
+                await self.build(path)
+        finally:
+            lock.release()
+        return path
+
+    async def build(self, path: Path) -> None:
+        """Build the template database at `path`, replacing any existing file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Not ".tmp-<pid>": checkpoint_db uses that name for its own copy.
+        tmp_path = path.with_name(f"{path.name}.build-{os.getpid()}")
+        remove_db_files(tmp_path)
+        log.info(f"Building DevServer template database {path}...")
+        try:
+            async with DevServer(
+                port=0,
+                ui_port=0,
+                db_filename=str(tmp_path),
+                namespace=self.namespace,
+                **self.server_kwargs,
+            ) as server:
+                await self.setup(server)
+                process = server.process
+            assert process is not None
+            if process.returncode != 0:
+                # Killed, or failed on the way out: the database may be incomplete.
+                raise RuntimeError(
+                    f"Template server did not shut down cleanly [Code: {process.returncode}]; "
+                    f"not saving template {path}."
+                )
+            # A consistent copy, with any WAL contents folded in, renamed into place.
+            await asyncio.to_thread(checkpoint_db, tmp_path, path)
+        finally:
+            remove_db_files(tmp_path)
+        log.info(f"Built template database {path}")
@@ -0,0 +1,346 @@
+"""Temporal workers in separate processes, to load a server from every core.
+
+A single Python worker process is limited by the GIL to roughly one core.
+`WorkerGroup` starts N worker processes (with the "spawn" start method, so it
+is safe to use from a process running an event loop and threads) connected
+to a server, reports when all of them are polling, and surfaces a crash of
+any of them in the parent.
+
+Workflows and activities are sent to the children by reference, so they must
+be importable module-level objects. Scripts that start workers must guard
+their entry point with `if __name__ == "__main__":`.
+
+Example:
+    async with DevServer() as server:
+        workers = await server.spawn_workers(
+            8, task_queue="load", workflows=[MyWorkflow], activities=[my_activity]
+        )
+        ...  # Stopped along with the server.
+"""
+
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+import traceback
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+log = logging.getLogger(__name__)
+
+
+class WorkerCrashed(RuntimeError):
+    """A worker process failed to start or exited while it should have been running."""
+
+    def __init__(
+        self, index: int, exitcode: Optional[int], error: Optional[str]
+    ) -> None:
+        detail = f":\n{error}" if error else ""
+        super().__init__(f"Worker process {index} exited [Code: {exitcode}]{detail}")
+        self.index = index
+        self.exitcode = exitcode
+        self.error = error
+
+
+@dataclass
+class _WorkerSpec:
+    target: str
+    namespace: str
+    task_queue: str
+    workflows: Sequence[type]
+    activities: Sequence[Callable[..., Any]]
+    activity_threads: Optional[int]
+    worker_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+class WorkerGroup:
+    """N Temporal worker processes polling one task queue on a server."""
+
+    def __init__(
+        self,
+        target: str,
+        n: Optional[int] = None,
+        *,
+        task_queue: str,
+        workflows: Sequence[type] = (),
+        activities: Sequence[Callable[..., Any]] = (),
+        namespace: str = "default",
+        activity_threads: Optional[int] = None,
+        ready_timeout: float = 30.0,
+        shutdown_grace: float = 10.0,
+        worker_kwargs: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Initialize the group.
+
+        Args:
+            target: Server address, e.g. `server.target`.
+            n: Number of processes. Defaults to the number of CPUs.
+            task_queue: Task queue the workers poll.
+            workflows: Workflow classes to register.
+            activities: Activity functions to register. Synchronous
+                activities run on a thread pool in each process.
+            namespace: Namespace the workers connect to.
+            activity_threads: Thread pool size for synchronous activities.
+                Defaults to the ThreadPoolExecutor default.
+            ready_timeout: Seconds for all processes to connect and start polling.
+            shutdown_grace: Seconds for processes to shut down before they are killed.
+            worker_kwargs: Other `temporalio.worker.Worker` arguments. They are
+                pickled to the children, so must be picklable.
+        """
+        self.n = n or os.cpu_count() or 1
+        self.ready_timeout = ready_timeout
+        self.shutdown_grace = shutdown_grace
+        self._spec = _WorkerSpec(
+            target=target,
+            namespace=namespace,
+            task_queue=task_queue,
+            workflows=list(workflows),
+            activities=list(activities),
+            activity_threads=activity_threads,
+            worker_kwargs=dict(worker_kwargs or {}),
+        )
+        self.processes: List[multiprocessing.process.BaseProcess] = []
+        self._conns: List[Connection] = []
+        self._stop_event: Any = None
+        self._closing = False
+        self._ready: Optional["asyncio.Future[None]"] = None
+        # Resolved with the first crash, or with None once the group is stopped.
+        self._crashed: Optional["asyncio.Future[Optional[WorkerCrashed]]"] = None
+        self._watcher: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def pids(self) -> List[Optional[int]]:
+        return [p.pid for p in self.processes]
+
+    async def __aenter__(self) -> "WorkerGroup":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        """Start the processes and wait until every one is polling.
+
+        Raises WorkerCrashed if a process fails to start; the others are then stopped.
+        """
+        if self.processes:
+            raise RuntimeError("Worker group already started.")
+        ctx = multiprocessing.get_context("spawn")
+        loop = asyncio.get_running_loop()
+        self._stop_event = ctx.Event()
+        self._ready = loop.create_future()
+        self._crashed = loop.create_future()
+        log.info(f"Starting {self.n} worker processes on {self._spec.task_queue}...")
+        t0 = time.monotonic()
+        for i in range(self.n):
+            reader, writer = ctx.Pipe(duplex=False)
+            process = ctx.Process(
+                target=_worker_main,
+                args=(writer, self._stop_event, self._spec),
+                name=f"temporal-worker-{i}",
+                daemon=True,
+            )
+            process.start()
+            writer.close()
+            self.processes.append(process)
+            self._conns.append(reader)
+        self._watcher = asyncio.create_task(asyncio.to_thread(self._watch, loop))
+        try:
+            done, _ = await asyncio.wait(
+                {self._ready, self._crashed},
+                timeout=self.ready_timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            crash = self._crashed.result() if self._crashed in done else None
+            if crash is not None:
+                raise crash
+            if not done:
+                raise TimeoutError(
+                    f"Worker processes did not start within {self.ready_timeout:.1f}s."
+                )
+        except BaseException:
+            await self.stop()
+            raise
+        log.info(f"{self.n} worker processes ready in {time.monotonic() - t0:.2f}s")
+
+    async def wait(self) -> None:
+        """Wait until the group is stopped.
+
+        Raises WorkerCrashed if a worker process exits unexpectedly first.
+        """
+        if self._crashed is None:
+            raise RuntimeError("Worker group not started.")
+        crash = await asyncio.shield(self._crashed)
+        if crash is not None:
+            raise crash
+
+    def check(self) -> None:
+        """Raise WorkerCrashed if a worker process has exited unexpectedly."""
+        if self._crashed is not None and self._crashed.done():
+            crash = self._crashed.result()
+            if crash is not None:
+                raise crash
+
+    async def stop(self, grace: Optional[float] = None) -> None:
+        """Ask every process to exit; kill those still running after `grace` seconds."""
+        if self._closing or not self.processes:
+            return
+        if grace is None:
+            grace = self.shutdown_grace
+        self._closing = True
+        self._stop_event.set()
+        await asyncio.to_thread(self._join, grace)
+        if self._watcher is not None:
+            await self._watcher
+        for conn in self._conns:
+            conn.close()
+        _set_result(self._crashed, None)
+        log.info(f"Stopped {self.n} worker processes.")
+
+    def _join(self, grace: float) -> None:
+        deadline = time.monotonic() + grace
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+        for process in self.processes:
+            if process.is_alive():
+                log.warning(
+                    f"Worker process [PID: {process.pid}] did not exit after "
+                    f"{grace:g}s. Killing."
+                )
+                process.kill()
+                process.join(5)
+
+    def _watch(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Runs in a thread: collect ready/error messages and notice process exits."""
+        objects: Dict[Any, int] = {}
+        for i, (process, conn) in enumerate(zip(self.processes, self._conns)):
+            objects[conn] = i
+            objects[process.sentinel] = i
+        not_ready = set(range(self.n))
+        errors: Dict[int, str] = {}
+
+        def receive(conn: Connection, i: int) -> None:
+            try:
+                kind, payload = conn.recv()
+            except EOFError:
+                objects.pop(conn, None)
+                return
+            if kind == "ready":
+                not_ready.discard(i)
+                if not not_ready:
+                    loop.call_soon_threadsafe(_set_result, self._ready, None)
+            else:
+                errors[i] = payload
+
+        # Poll with a timeout so that stop() is noticed even if nothing happens.
+        while not self._closing:
+            for obj in wait(list(objects), timeout=0.1):
+                i = objects[obj]
+                if isinstance(obj, Connection):
+                    receive(obj, i)
+                    continue
+                conn = self._conns[i]
+                while conn in objects and conn.poll():
+                    receive(conn, i)
+                if self._closing:
+                    return
+                self.processes[i].join()  # Exited: reap it so exitcode is set.
+                crash = WorkerCrashed(i, self.processes[i].exitcode, errors.get(i))
+                log.error(str(crash))
+                loop.call_soon_threadsafe(_set_result, self._crashed, crash)
+                return
+
+
+def _set_result(future: "Optional[asyncio.Future[Any]]", value: Any) -> None:
+    if future is not None and not future.done():
+        future.set_result(value)
+
+
+def _worker_main(conn: Connection, stop_event: Any, spec: _WorkerSpec) -> None:
+    """Entry point of a worker process."""
+    # The parent decides when workers stop; don't die on a terminal's Ctrl-C.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        asyncio.run(_run_worker(conn, stop_event, spec))
+    except BaseException:
+        try:
+            conn.send(("error", traceback.format_exc()))
+        except OSError:
+            pass
+        sys.exit(1)
+    finally:
+        conn.close()
+
+
+async def _run_worker(conn: Connection, stop_event: Any, spec: _WorkerSpec) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from temporalio.client import Client
+    from temporalio.worker import Worker
+
+    client = await Client.connect(spec.target, namespace=spec.namespace)
+    executor = None
+    if any(not inspect.iscoroutinefunction(a) for a in spec.activities):
+        executor = ThreadPoolExecutor(spec.activity_threads)
+    worker = Worker(
+        client,
+        task_queue=spec.task_queue,
+        workflows=spec.workflows,
+        activities=spec.activities,
+        activity_executor=executor,
+        **spec.worker_kwargs,
+    )
+    run_task = asyncio.create_task(worker.run())
+    await _wait_polling(client, spec, run_task)
+    conn.send(("ready", os.getpid()))
+    while not stop_event.is_set():
+        if run_task.done():
+            run_task.result()
+            raise RuntimeError("Worker stopped unexpectedly.")
+        await asyncio.sleep(0.1)
+    await worker.shutdown()
+    await run_task
+    if executor is not None:
+        executor.shutdown()
+
+
+async def _wait_polling(
+    client: Any, spec: _WorkerSpec, run_task: "asyncio.Task[None]"
+) -> None:
+    """Wait until the server lists this process among the task queue's pollers.
+
+    The worker validates its workflows before it starts polling, so a
+    worker that fails validation raises here instead.
+    """
+    from temporalio.api.enums.v1 import TaskQueueType
+    from temporalio.api.taskqueue.v1 import TaskQueue
+    from temporalio.api.workflowservice.v1 import DescribeTaskQueueRequest
+
+    identity = spec.worker_kwargs.get("identity") or client.identity
+    queue_types = []
+    if spec.workflows:
+        queue_types.append(TaskQueueType.TASK_QUEUE_TYPE_WORKFLOW)
+    if spec.activities:
+        queue_types.append(TaskQueueType.TASK_QUEUE_TYPE_ACTIVITY)
+    delay = 0.01
+    for queue_type in queue_types:
+        request = DescribeTaskQueueRequest(
+            namespace=spec.namespace,
+            task_queue=TaskQueue(name=spec.task_queue),
+            task_queue_type=queue_type,
+        )
+        while True:
+            if run_task.done():
+                run_task.result()
+                raise RuntimeError("Worker stopped before it started polling.")
+            response = await client.workflow_service.describe_task_queue(request)
+            if any(poller.identity == identity for poller in response.pollers):
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.2)
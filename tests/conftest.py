@@ -0,0 +1,64 @@
+import stat
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from temporalio_server import get_binary_path
+
+
+def _have_binary() -> bool:
+    try:
+        get_binary_path()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+requires_binary = pytest.mark.skipif(
+    not _have_binary(), reason="Temporal CLI binary not available"
+)
+
+
+# A stand-in for `temporal server start-dev`: it prints a startup line and
+# answers every gRPC health check with SERVING.
+FAKE_SERVER = """
+import socket, struct, sys, threading
+
+args = sys.argv[1:]
+ip, port = args[args.index("--ip") + 1], int(args[args.index("--port") + 1])
+sock = socket.create_server((ip, port))
+print(f"Server:  {ip}:{port}", flush=True)
+
+
+def handle(conn):
+    with conn:
+        conn.recv(65536)
+        message = b"\\x00" + struct.pack(">I", 2) + b"\\x08\\x01"
+        header = struct.pack(">I", len(message))[1:] + b"\\x00\\x00"
+        conn.sendall(header + struct.pack(">I", 1) + message)
+        conn.recv(65536)
+
+
+while True:
+    threading.Thread(target=handle, args=(sock.accept()[0],), daemon=True).start()
+"""
+
+
+@pytest.fixture
+def fake_binary(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Callable[[str], Path]:
+    """Return a function that installs a Python script as DevServer's binary."""
+
+    def install(source: str) -> Path:
+        path = tmp_path / "temporal"
+        path.write_text(f"#!{sys.executable}\n{source}")
+        path.chmod(path.stat().st_mode | stat.S_IXUSR)
+        monkeypatch.setattr(
+            "temporalio_server.server.get_binary_path", lambda version=None: path
+        )
+        return path
+
+    return install
@@ -0,0 +1,61 @@
+import base64
+import hashlib
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from temporalio_server import _binary
+
+CONTENT = b"#!/bin/sh\necho temporal version 0.0.0\n"
+
+
+def _install_zip(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, record: bool) -> None:
+    """Make the package look like it was imported from a zipped wheel."""
+    archive = tmp_path / "site.zip"
+    digest = base64.urlsafe_b64encode(hashlib.sha256(CONTENT).digest()).rstrip(b"=")
+    dist_info = "dandavison_temporalio_server-0.0.0.dist-info"
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr(f"temporalio_server/bin/{_binary.BINARY_NAME}", CONTENT)
+        z.writestr(
+            f"{dist_info}/METADATA",
+            "Metadata-Version: 2.1\nName: dandavison-temporalio-server\n"
+            "Version: 0.0.0\n",
+        )
+        if record:
+            z.writestr(
+                f"{dist_info}/RECORD",
+                f"temporalio_server/bin/{_binary.BINARY_NAME},"
+                f"sha256={digest.decode()},{len(CONTENT)}\n",
+            )
+    monkeypatch.syspath_prepend(str(archive))
+    monkeypatch.setattr(
+        _binary.resources,
+        "files",
+        lambda package: zipfile.Path(archive, "temporalio_server/"),
+    )
+    monkeypatch.setenv("TEMPORALIO_SERVER_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def test_zip_install_is_extracted_into_the_store_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _install_zip(tmp_path, monkeypatch, record=True)
+    path = _binary._bundled_binary_path()
+    assert path.read_bytes() == CONTENT
+    assert path.parent.name == hashlib.sha256(CONTENT).hexdigest()
+
+    def copy(f):
+        raise AssertionError("the stored binary should be found from RECORD")
+
+    monkeypatch.setattr(_binary, "_store", copy)
+    assert _binary._bundled_binary_path() == path
+
+
+def test_zip_install_without_record_is_hashed(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _install_zip(tmp_path, monkeypatch, record=False)
+    path = _binary._bundled_binary_path()
+    assert path.parent.name == hashlib.sha256(CONTENT).hexdigest()
+    assert _binary._bundled_binary_path() == path
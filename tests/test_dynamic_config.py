@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+import pytest
+
+from temporalio_server.dynamic_config import PRESETS, DynamicConfig, expand_cli_args
+
+
+def test_builds_server_args() -> None:
+    config = (
+        DynamicConfig({"frontend.rps": 500})
+        .set("system.enableEagerWorkflowStart", True)
+        .set("matching.longPollExpirationInterval", timedelta(seconds=2))
+    )
+    assert config.to_args() == [
+        "--dynamic-config-value",
+        "frontend.rps=500",
+        "--dynamic-config-value",
+        "system.enableEagerWorkflowStart=true",
+        "--dynamic-config-value",
+        'matching.longPollExpirationInterval="2000ms"',
+    ]
+    assert config["frontend.rps"] == 500
+    assert "frontend.rps" in config
+    assert len(config) == 3
+
+
+@pytest.mark.parametrize(
+    "key, value",
+    [
+        ("frontend.rps", "500"),
+        ("frontend.rps", True),
+        ("system.enableEagerWorkflowStart", 1),
+        ("matching.longPollExpirationInterval", "2 seconds"),
+    ],
+)
+def test_rejects_values_of_the_wrong_type(key: str, value: object) -> None:
+    with pytest.raises(TypeError, match=key):
+        DynamicConfig().set(key, value)
+
+
+def test_unknown_keys_need_strict_false() -> None:
+    with pytest.raises(ValueError, match="strict=False"):
+        DynamicConfig({"history.someNewKnob": 1})
+    config = DynamicConfig({"history.someNewKnob": 1}, strict=False)
+    assert config.to_args() == ["--dynamic-config-value", "history.someNewKnob=1"]
+
+
+def test_presets_combine_with_later_ones_winning() -> None:
+    config = DynamicConfig.coerce("high-throughput, low-latency-tests")
+    assert config.to_dict() == {
+        **PRESETS["high-throughput"],
+        **PRESETS["low-latency-tests"],
+    }
+
+
+def test_unknown_preset_lists_the_known_ones() -> None:
+    with pytest.raises(ValueError, match="high-throughput, low-latency-tests"):
+        DynamicConfig.preset("fast")
+
+
+def test_expands_presets_in_cli_args() -> None:
+    expected = DynamicConfig.preset("low-latency-tests").to_args()
+    assert expand_cli_args(
+        ["--port", "0", "--dynamic-config", "low-latency-tests"]
+    ) == [
+        "--port",
+        "0",
+        *expected,
+    ]
+    assert expand_cli_args(["--dynamic-config=low-latency-tests"]) == expected
+    with pytest.raises(ValueError, match="requires a preset"):
+        expand_cli_args(["--dynamic-config"])
@@ -0,0 +1,97 @@
+import asyncio
+import signal
+from pathlib import Path
+from typing import Callable, List
+
+import pytest
+
+from temporalio_server import DevServer
+from temporalio_server.hooks import LifecycleEvent, LifecycleHooks, default_hooks
+
+from conftest import FAKE_SERVER
+
+
+def _event(name: str) -> LifecycleEvent:
+    return LifecycleEvent(name=name, target="127.0.0.1:7233", start=1.0, end=2.0)
+
+
+def test_callbacks_run_in_registration_order_despite_errors() -> None:
+    calls: List[str] = []
+    hooks = LifecycleHooks(on_ready=lambda event: calls.append("first"))
+
+    @hooks.on_ready
+    def failing(event: LifecycleEvent) -> None:
+        calls.append("failing")
+        raise RuntimeError("hook failed")
+
+    hooks.add("ready", lambda event: calls.append("last"))
+    hooks.emit(_event("ready"))
+    hooks.emit(_event("exit"))
+    assert calls == ["first", "failing", "last"]
+
+    hooks.remove("ready", failing)
+    calls.clear()
+    hooks.emit(_event("ready"))
+    assert calls == ["first", "last"]
+
+
+def test_rejects_unknown_events() -> None:
+    with pytest.raises(ValueError, match="spawn, ready, exit, kill"):
+        LifecycleHooks().add("first_connect", print)
+
+
+def test_server_reports_events_and_phases(
+    fake_binary: Callable[[str], object], tmp_path: Path
+) -> None:
+    # The first server ignores SIGTERM, so restarting it has to kill it.
+    marker = tmp_path / "started"
+    fake_binary(
+        "import os, signal\n"
+        f"if not os.path.exists({str(marker)!r}):\n"
+        f"    open({str(marker)!r}, 'w').close()\n"
+        "    signal.signal(signal.SIGTERM, signal.SIG_IGN)\n" + FAKE_SERVER
+    )
+    events: List[LifecycleEvent] = []
+    default_events: List[LifecycleEvent] = []
+    hooks = LifecycleHooks()
+    for name in ("spawn", "ready", "exit", "kill"):
+        hooks.add(name, events.append)
+        default_hooks.add(name, default_events.append)
+
+    async def main() -> None:
+        async with DevServer(port=0, ui_port=0, hooks=hooks) as server:
+            await server.restart(grace=0.1)
+
+    try:
+        asyncio.run(main())
+    finally:
+        for name in ("spawn", "ready", "exit", "kill"):
+            default_hooks.remove(name, default_events.append)
+
+    assert [e.name for e in events] == [
+        "spawn",
+        "ready",
+        "kill",
+        "exit",
+        "spawn",
+        "ready",
+        "exit",
+    ]
+    assert default_events == events
+    for event in events:
+        assert event.end >= event.start
+        assert all(seconds >= 0 for seconds in event.phases.values())
+        assert sum(event.phases.values()) <= event.duration * 2 + 1e-6
+    spawn, ready, kill, killed_exit, _, _, clean_exit = events
+    assert set(spawn.phases) == {"prepare_db", "binary_lookup", "exec"}
+    assert set(ready.phases) == {"wait", "first_connect", "startup_line"}
+    assert ready.phases["wait"] == pytest.approx(ready.duration)
+    assert ready.attributes["probes"] >= 1
+    assert spawn.end <= ready.start
+    assert kill.phases.keys() == {"kill_wait"}
+    assert kill.attributes == {"returncode": -signal.SIGKILL, "grace": 0.1}
+    assert killed_exit.attributes["killed"] is True
+    assert killed_exit.phases["grace_wait"] == pytest.approx(0.1, abs=0.05)
+    assert set(killed_exit.phases) == {"grace_wait", "kill_wait"}
+    assert clean_exit.attributes["killed"] is False
+    assert clean_exit.phases.keys() == {"grace_wait"}
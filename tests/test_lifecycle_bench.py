@@ -0,0 +1,71 @@
+import asyncio
+import os
+import sys
+from typing import Callable
+
+import pytest
+
+from temporalio_server.lifecycle_bench import (
+    _track_peak_rss,
+    compare,
+    format_report,
+    run_config,
+    summarize,
+)
+
+from conftest import FAKE_SERVER
+
+
+def test_summarize() -> None:
+    assert summarize([]) == {}
+    stats = summarize([0.3, 0.1, 0.2])
+    assert stats["min"] == 0.1 and stats["max"] == 0.3
+    assert stats["mean"] == pytest.approx(0.2)
+
+
+def test_report_and_compare_skip_missing_phases() -> None:
+    stats = summarize([0.1])
+    report = {
+        "cli_version": "1.3.0",
+        "iterations": 1,
+        "results": {"memory": {"spawn": stats, "peak_rss_bytes": None}},
+    }
+    assert "memory" in format_report(report)
+    assert compare(report, report, threshold=0.2) == []
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="needs /proc")
+def test_peak_rss_includes_growth_after_startup() -> None:
+    async def main() -> float:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            "import sys, time\n"
+            "sys.stdin.readline()\n"
+            "data = bytearray(100 * 1024 * 1024)\n"
+            "time.sleep(0.1)\n",
+            stdin=asyncio.subprocess.PIPE,
+        )
+        assert process.stdin is not None
+        task = asyncio.create_task(_track_peak_rss(process, None))
+        await asyncio.sleep(0.05)
+        process.stdin.write(b"grow\n")
+        await process.wait()
+        peak = await task
+        assert peak is not None
+        return peak
+
+    assert asyncio.run(main()) >= 100 * 1024 * 1024
+
+
+def test_run_config(fake_binary: Callable[[str], object]) -> None:
+    fake_binary(FAKE_SERVER)
+    result = asyncio.run(run_config("memory", iterations=2, warmup=0))
+    assert set(result) == {"spawn", "ready", "exit", "peak_rss_bytes"}
+    assert result["ready"]["max"] < 5.0
+    if os.path.exists("/proc/self/status"):
+        assert result["peak_rss_bytes"] > 0
+    # No iterations: no phases to report, rather than a crash.
+    assert asyncio.run(run_config("memory", iterations=0, warmup=0)) == {
+        "peak_rss_bytes": None
+    }
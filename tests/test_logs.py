@@ -0,0 +1,67 @@
+import asyncio
+import errno
+import sys
+from pathlib import Path
+from typing import List
+
+from temporalio_server.logs import LogPipeline, LogRecord
+
+LINES = 2000
+
+
+def test_raising_listener_does_not_stop_draining() -> None:
+    async def main() -> None:
+        # More output than a pipe buffer holds, so the child blocks if draining stops.
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            f"for i in range({LINES}): print('line', i, 'x' * 100)",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        pipeline = LogPipeline(buffer_size=LINES)
+        received: List[LogRecord] = []
+
+        def failing(record: LogRecord) -> None:
+            raise ValueError("listener failed")
+
+        pipeline.add_listener(failing)
+        pipeline.add_listener(received.append)
+        pipeline.start(process)
+        assert await asyncio.wait_for(process.wait(), timeout=10.0) == 0
+        await pipeline.wait_drained(timeout=5.0)
+        await pipeline.close()
+        assert len(received) == LINES
+        assert received[-1].line.startswith(f"line {LINES - 1} ")
+
+    asyncio.run(main())
+
+
+def test_failing_log_file_is_disabled_and_draining_continues(tmp_path: Path) -> None:
+    async def main() -> None:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-c",
+            f"for i in range({LINES}): print('line', i, 'x' * 100)",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        pipeline = LogPipeline(buffer_size=LINES, log_file=tmp_path / "server.log")
+        writes = 0
+
+        def failing(line: str) -> None:
+            nonlocal writes
+            writes += 1
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+        pipeline._writer.write = failing  # type: ignore[union-attr]
+        received: List[LogRecord] = []
+        pipeline.add_listener(received.append)
+        pipeline.start(process)
+        assert await asyncio.wait_for(process.wait(), timeout=10.0) == 0
+        await pipeline.wait_drained(timeout=5.0)
+        await pipeline.close()
+        assert writes == 1
+        assert len(received) == LINES
+
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+import math
+
+from temporalio_server.metrics import MetricsSnapshot, parse_prometheus
+
+TEXT = """\
+# HELP service_requests Requests.
+# TYPE service_requests counter
+service_requests{operation="StartWorkflowExecution",service_name="frontend"} 3
+service_requests{operation="PollWorkflowTaskQueue",service_name="frontend"} 5
+service_requests{operation="RecordActivityTaskHeartbeat",service_name="history"} 2
+persistence_latency_bucket{operation="CreateWorkflowExecution",le="0.1"} 4
+persistence_latency_bucket{operation="CreateWorkflowExecution",le="+Inf"} 6
+persistence_latency_sum{operation="CreateWorkflowExecution"} 0.75
+persistence_latency_count{operation="CreateWorkflowExecution"} 6
+approximate_backlog_count 12
+label_with_space{reason="a b"} 1e3
+not_a_sample
+bad_value{x="y"} nope
+"""
+
+
+def test_parses_samples_and_labels() -> None:
+    samples = parse_prometheus(TEXT)
+    assert samples["service_requests"][0] == (
+        {"operation": "StartWorkflowExecution", "service_name": "frontend"},
+        3.0,
+    )
+    assert samples["approximate_backlog_count"] == [({}, 12.0)]
+    assert samples["label_with_space"] == [({"reason": "a b"}, 1000.0)]
+    assert samples["persistence_latency_bucket"][1][0]["le"] == "+Inf"
+    assert "not_a_sample" not in samples
+    assert "bad_value" not in samples
+
+
+def test_parses_only_selected_names() -> None:
+    samples = parse_prometheus(TEXT, names={"persistence_latency", "service_requests"})
+    assert sorted(samples) == [
+        "persistence_latency_bucket",
+        "persistence_latency_count",
+        "persistence_latency_sum",
+        "service_requests",
+    ]
+
+
+def test_snapshot_sums_matching_samples() -> None:
+    snapshot = MetricsSnapshot(parse_prometheus(TEXT), time=0.0)
+    assert snapshot.get("service_requests") == 10
+    assert snapshot.get("service_requests", service_name="frontend") == 8
+    assert snapshot.get("service_requests", operation="Missing") == 0
+    assert "approximate_backlog_count" in snapshot
+    assert "missing" not in snapshot
+    assert snapshot.series("missing") == []
+    assert not math.isnan(snapshot.get("persistence_latency_sum"))
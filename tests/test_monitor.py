@@ -0,0 +1,71 @@
+import asyncio
+import json
+import math
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from temporalio_server.monitor import FIELDS, ResourceMonitor
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists("/proc/self/stat"), reason="needs /proc"
+)
+
+# Allocate about 50MB, burn some CPU, then wait to be killed.
+CHILD = """
+import sys, time
+data = bytearray(50 * 1024 * 1024)
+end = time.monotonic() + 0.2
+while time.monotonic() < end:
+    pass
+print("ready", flush=True)
+time.sleep(60)
+"""
+
+
+def test_samples_a_process_from_proc(tmp_path: Path) -> None:
+    monitor = ResourceMonitor(interval=0.01, dump=tmp_path / "resources.json")
+
+    async def main() -> None:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", CHILD, stdout=asyncio.subprocess.PIPE
+        )
+        assert process.stdout is not None
+        monitor.start(process.pid)
+        await process.stdout.readline()
+        await asyncio.sleep(0.05)
+        process.kill()
+        await process.wait()
+        await monitor.stop()
+
+    asyncio.run(main())
+    assert len(monitor.times) >= 5
+    assert all(len(monitor.series[name]) == len(monitor.times) for name in FIELDS)
+    summary = monitor.summary()
+    assert summary["rss_bytes"]["peak"] >= 50 * 1024 * 1024
+    assert summary["cpu_seconds"]["peak"] >= 0.1
+    assert summary["threads"]["peak"] >= 1
+    assert summary["fds"]["peak"] >= 3
+    # The first sample has no previous one to compute a CPU rate from.
+    assert math.isnan(monitor.series["cpu_percent"][0])
+    # Samples after the exit fail and are counted, not raised.
+    assert monitor.errors >= 1
+    dumped = json.loads((tmp_path / "resources.json").read_text())
+    assert dumped["pid"] == monitor.pid
+    assert dumped["series"]["cpu_percent"][0] is None
+
+
+def test_missing_process_records_nothing() -> None:
+    monitor = ResourceMonitor(interval=0.01)
+
+    async def main() -> None:
+        process = await asyncio.create_subprocess_exec(sys.executable, "-c", "")
+        await process.wait()
+        monitor.start(process.pid)
+        await monitor.stop()
+
+    asyncio.run(main())
+    assert len(monitor.times) == 0
+    assert monitor.summary() == {}
@@ -0,0 +1,82 @@
+import asyncio
+import random
+import time
+from typing import Tuple
+
+import pytest
+
+from temporalio_server.network import LatencyProxy, NetworkProfile
+
+PAYLOAD = random.Random(0).randbytes(96_000)
+
+
+async def _echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    while data := await reader.read(65536):
+        writer.write(data)
+        await writer.drain()
+    writer.write_eof()
+    await writer.drain()
+    writer.close()
+
+
+async def _through_proxy(
+    profile: NetworkProfile, payload: bytes, chunk: int = 1000
+) -> Tuple[bytes, LatencyProxy]:
+    """Send `payload` in chunks to an echo server through a proxy and read to EOF."""
+    server = await asyncio.start_server(_echo, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    proxy = LatencyProxy(("127.0.0.1", port), profile)
+    async with server, proxy:
+        reader, writer = await asyncio.open_connection(proxy.host, proxy.port)
+        for i in range(0, len(payload), chunk):
+            writer.write(payload[i : i + chunk])
+            await writer.drain()
+        writer.write_eof()
+        echoed = await asyncio.wait_for(reader.read(), timeout=10.0)
+        writer.close()
+    return echoed, proxy
+
+
+@pytest.mark.parametrize("jitter_ms", [0.0, 5.0])
+def test_preserves_order_and_delivers_eof_after_data(jitter_ms: float) -> None:
+    # Many small chunks share a delivery time, which is where ordering broke.
+    profile = NetworkProfile(latency_ms=5, jitter_ms=jitter_ms, seed=1)
+    for _ in range(3):
+        echoed, _proxy = asyncio.run(_through_proxy(profile, PAYLOAD, chunk=100))
+        assert echoed == PAYLOAD
+
+
+async def _round_trip(profile: NetworkProfile) -> float:
+    server = await asyncio.start_server(_echo, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server, LatencyProxy(("127.0.0.1", port), profile) as proxy:
+        reader, writer = await asyncio.open_connection(proxy.host, proxy.port)
+        writer.write(b"x")
+        await reader.readexactly(1)  # Warm up the upstream connection.
+        t0 = time.monotonic()
+        writer.write(b"y")
+        await reader.readexactly(1)
+        elapsed = time.monotonic() - t0
+        writer.close()
+    return elapsed
+
+
+def test_adds_latency_in_each_direction() -> None:
+    rtt = asyncio.run(_round_trip(NetworkProfile(latency_ms=50)))
+    assert 0.1 <= rtt < 0.1 + 0.1
+
+
+def test_limits_bandwidth() -> None:
+    payload = bytes(200_000)
+    t0 = time.monotonic()
+    # Both directions are limited, but they overlap, so the echo takes about
+    # one transfer time.
+    echoed, proxy = asyncio.run(
+        _through_proxy(NetworkProfile(bandwidth=1_000_000), payload, chunk=10_000)
+    )
+    elapsed = time.monotonic() - t0
+    assert echoed == payload
+    assert 0.2 <= elapsed < 0.2 + 0.3
+    (conn,) = proxy.connections
+    assert conn.upstream.bytes == conn.downstream.bytes == len(payload)
+    assert conn.closed is not None
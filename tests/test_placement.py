@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from temporalio_server import placement
+from temporalio_server.placement import (
+    check_placement,
+    go_runtime_env,
+    lease_cpus,
+    placement_command,
+    release_cpus,
+)
+
+linux_only = pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="CPU affinity needs Linux"
+)
+
+
+def test_go_runtime_env() -> None:
+    assert go_runtime_env() == {}
+    assert go_runtime_env(2, "off", 512 * 1024**2) == {
+        "GOMAXPROCS": "2",
+        "GOGC": "off",
+        "GOMEMLIMIT": "536870912B",
+    }
+    assert go_runtime_env(gomemlimit="512MiB") == {"GOMEMLIMIT": "512MiB"}
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"gomaxprocs": 0}, {"gogc": 0}, {"gogc": "on"}, {"gomemlimit": "512MB"}],
+)
+def test_go_runtime_env_rejects_invalid_settings(kwargs) -> None:
+    with pytest.raises(ValueError):
+        go_runtime_env(**kwargs)
+
+
+@linux_only
+@pytest.mark.parametrize("cpus", [[], [max(placement.available_cpus()) + 1]])
+def test_rejects_unavailable_cpus(cpus: List[int]) -> None:
+    with pytest.raises(ValueError, match="cpu_affinity"):
+        check_placement(cpus, None)
+
+
+def test_rejects_negative_nice_without_permission(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(placement, "_may_lower_niceness_to", lambda niceness: False)
+    check_placement(None, 5)
+    with pytest.raises(ValueError, match="CAP_SYS_NICE"):
+        check_placement(None, -5)
+
+
+@linux_only
+def test_threads_started_after_exec_inherit_placement() -> None:
+    cpu = placement.available_cpus()[-1]
+    parent_nice = os.getpriority(os.PRIO_PROCESS, 0)
+    # Report the placement of a thread started by the child, as the Go
+    # runtime's threads would be.
+    script = (
+        "import json, os, threading\n"
+        "def report():\n"
+        "    print(json.dumps([sorted(os.sched_getaffinity(0)),"
+        " os.getpriority(os.PRIO_PROCESS, 0)]))\n"
+        "thread = threading.Thread(target=report)\n"
+        "thread.start()\n"
+        "thread.join()\n"
+    )
+
+    async def main() -> bytes:
+        process = await asyncio.create_subprocess_exec(
+            *placement_command([cpu], 3),
+            sys.executable,
+            "-c",
+            script,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        stdout, _ = await process.communicate()
+        assert process.returncode == 0
+        return stdout
+
+    cpus, nice = json.loads(asyncio.run(main()))
+    assert cpus == [cpu]
+    assert nice == parent_nice + 3
+
+
+def test_leases_disjoint_cpus_until_full(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("TEMPORALIO_SERVER_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(placement, "available_cpus", lambda: [0, 1, 2, 3])
+    first, first_cpus = lease_cpus(2)
+    second, second_cpus = lease_cpus(2)
+    assert sorted(first_cpus + second_cpus) == [0, 1, 2, 3]
+    release_cpus(first)
+    third, third_cpus = lease_cpus(2)
+    assert third_cpus == first_cpus
+    release_cpus(second)
+    release_cpus(third)
@@ -0,0 +1,29 @@
+import asyncio
+from typing import Callable
+
+import pytest
+
+from temporalio_server import DevServerPool
+
+
+def test_failed_start_fails_every_waiter(fake_binary: Callable[[str], object]) -> None:
+    fake_binary("import sys\nsys.exit(1)\n")
+
+    async def main() -> None:
+        pool = DevServerPool(size=1, reset=None, ready_timeout=5.0)
+        try:
+            results = await asyncio.wait_for(
+                asyncio.gather(pool.acquire(), pool.acquire(), return_exceptions=True),
+                timeout=10.0,
+            )
+        finally:
+            await pool.close()
+        assert all(isinstance(r, RuntimeError) for r in results), results
+        assert pool.stats.start_failures == 1
+
+    asyncio.run(main())
+
+
+def test_rejects_explicit_ports() -> None:
+    with pytest.raises(ValueError):
+        DevServerPool(port=7233)
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+
+import pytest
+
+import temporalio_server
+from temporalio_server import DevServer, ports
+from temporalio_server.ports import allocate_ports, release_ports
+
+from conftest import FAKE_SERVER
+
+# Allocates two ports, reports them, and holds the lease until stdin closes
+# (or, with "exit", exits at once without releasing it).
+ALLOCATE = """
+import json, sys
+from temporalio_server.ports import allocate_ports
+token, ports = allocate_ports("127.0.0.1", 2)
+print(json.dumps(ports), flush=True)
+if sys.argv[1] != "exit":
+    sys.stdin.read()
+"""
+
+
+@pytest.fixture
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("TEMPORALIO_SERVER_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _leases(cache_dir: Path) -> Dict[str, dict]:
+    path = cache_dir / "port-leases.json"
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _allocate_in_child(mode: str) -> subprocess.Popen:
+    src = Path(temporalio_server.__file__).parent.parent
+    return subprocess.Popen(
+        [sys.executable, "-c", ALLOCATE, mode],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(src)},
+    )
+
+
+def test_concurrent_processes_get_distinct_ports(cache_dir: Path) -> None:
+    children = [_allocate_in_child("hold") for _ in range(8)]
+    try:
+        allocated: List[int] = []
+        for child in children:
+            assert child.stdout is not None
+            allocated += json.loads(child.stdout.readline())
+        assert len(set(allocated)) == len(allocated) == 16
+        assert len(_leases(cache_dir)) == 8
+    finally:
+        for child in children:
+            child.communicate()
+    # The children exited without releasing; their leases are dropped.
+    token, _ = allocate_ports("127.0.0.1", 1)
+    assert list(_leases(cache_dir)) == [token]
+    release_ports(token)
+    assert _leases(cache_dir) == {}
+
+
+def test_skips_ports_leased_by_another_process(
+    cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    child = _allocate_in_child("hold")
+    try:
+        assert child.stdout is not None
+        taken = json.loads(child.stdout.readline())
+        # The OS offers the other process's ports first.
+        offered: Iterator[int] = iter([*taken, 50001, 50002])
+        monkeypatch.setattr(ports, "find_free_port", lambda ip: next(offered))
+        token, allocated = allocate_ports("127.0.0.1", 2)
+        assert allocated == [50001, 50002]
+        release_ports(token)
+    finally:
+        child.communicate()
+
+
+def test_ignores_leases_of_exited_processes(
+    cache_dir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    child = _allocate_in_child("exit")
+    stdout, _ = child.communicate()
+    freed = json.loads(stdout)
+    offered = iter(freed)
+    monkeypatch.setattr(ports, "find_free_port", lambda ip: next(offered))
+    token, allocated = allocate_ports("127.0.0.1", 2)
+    assert allocated == freed
+    release_ports(token)
+
+
+def test_server_holds_its_lease_until_stopped(
+    cache_dir: Path, fake_binary: Callable[[str], object]
+) -> None:
+    fake_binary(FAKE_SERVER)
+
+    async def main() -> None:
+        async with DevServer(port=0, ui_port=0) as server:
+            (lease,) = _leases(cache_dir).values()
+            assert lease["ports"] == [server.port, server.ui_port]
+            port = server.port
+            await server.restart(grace=1.0)
+            assert server.port == port
+            assert list(_leases(cache_dir).values()) == [lease]
+        assert _leases(cache_dir) == {}
+
+    asyncio.run(main())
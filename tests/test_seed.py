@@ -0,0 +1,38 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from conftest import requires_binary
+
+pytest.importorskip("temporalio")
+
+from temporalio_server import DevServer  # noqa: E402
+from temporalio_server.seed import seed  # noqa: E402
+
+SPEC = {
+    "workflows": [
+        {"type": "Seeded", "task_queue": "seed", "count": 3, "state": state}
+        for state in ("running", "completed", "failed", "terminated")
+    ]
+}
+
+
+@requires_binary
+def test_reseeding_skips_closed_workflows(tmp_path: Path) -> None:
+    async def main() -> None:
+        db = str(tmp_path / "seed.db")
+        async with DevServer(port=0, ui_port=0, db_filename=db, seed=SPEC) as server:
+            assert server.seed_report is not None
+            assert server.seed_report["seeded"] == 12
+            report = await seed(server.target, SPEC)
+        assert report["seeded"] == 0
+        assert report["existing"] == 12
+
+        # And again on a new server over the same database.
+        async with DevServer(port=0, ui_port=0, db_filename=db, seed=SPEC) as server:
+            assert server.seed_report is not None
+            assert server.seed_report["seeded"] == 0
+            assert server.seed_report["existing"] == 12
+
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+import asyncio
+import math
+import os
+import signal
+from typing import Callable, List, Optional
+
+import pytest
+
+from temporalio_server import DevServer
+from temporalio_server._health import check_health
+from temporalio_server.supervisor import Supervisor
+
+from conftest import FAKE_SERVER
+
+
+class _Process:
+    def __init__(self, returncode: Optional[int] = None) -> None:
+        self.returncode = returncode
+
+    async def wait(self) -> int:
+        while self.returncode is None:
+            await asyncio.sleep(0.01)
+        return self.returncode
+
+
+class _Server:
+    """Stands in for an exited DevServer; restarts fail `failures` times."""
+
+    ip = "127.0.0.1"
+    port = 1
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.process = _Process(returncode=1)
+        self.restart_graces: List[float] = []
+
+    async def restart(self, grace: float = 10.0) -> None:
+        self.restart_graces.append(grace)
+        if len(self.restart_graces) <= self.failures:
+            raise RuntimeError("Server process exited prematurely [Code: 1].")
+        self.process = _Process()
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    """Record the backoff delays instead of sleeping through them."""
+    delays: List[float] = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay: float, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr("temporalio_server.supervisor.asyncio.sleep", sleep)
+    return delays
+
+
+def test_recover_backs_off_exponentially(sleeps: List[float]) -> None:
+    supervisor = Supervisor(backoff_initial=0.1, backoff_max=0.3)
+    server = _Server(failures=4)
+
+    asyncio.run(supervisor._recover(server, "exit", 0.0, 1))  # type: ignore[arg-type]
+
+    # The first attempt is immediate, then 0.1, 0.2, 0.4 capped at 0.3.
+    assert sleeps == [0.1, 0.2, 0.3, 0.3]
+    assert server.restart_graces == [0.0] * 5  # Killed at once.
+    (restart,) = supervisor.restarts
+    assert restart.reason == "exit"
+    assert restart.returncode == 1
+    assert restart.attempts == 5
+    assert restart.ready is not None and restart.restart_time is not None
+
+
+def test_recover_gives_up_after_max_restarts(sleeps: List[float]) -> None:
+    supervisor = Supervisor(max_restarts=3)
+    server = _Server(failures=10)
+
+    recover = supervisor._recover(server, "hang", 0.0, None)  # type: ignore[arg-type]
+    with pytest.raises(RuntimeError, match="Gave up after 3 restarts"):
+        asyncio.run(recover)
+    assert len(server.restart_graces) == 3
+    assert supervisor.restarts[0].ready is None
+
+
+def test_giving_up_is_reported(sleeps: List[float]) -> None:
+    supervisor = Supervisor(max_restarts=2)
+    server = _Server(failures=10)
+
+    async def main() -> None:
+        supervisor.start(server)  # type: ignore[arg-type]
+        assert supervisor._task is not None
+        await asyncio.wait_for(asyncio.shield(supervisor._task), timeout=5.0)
+        assert not supervisor.running
+        await supervisor.stop()
+
+    asyncio.run(main())
+    summary = supervisor.summary()
+    assert summary["error"] is not None and "Gave up" in summary["error"]
+    assert summary["restarts"] == 1
+    assert summary["crashes"] == 1
+    assert math.isnan(summary["restart_time"]["max"])
+
+
+def test_hung_server_is_restarted_quickly(fake_binary: Callable[[str], object]) -> None:
+    fake_binary(FAKE_SERVER)
+    supervisor = Supervisor(interval=0.05, probe_timeout=0.1, deadline=0.2)
+
+    async def main() -> None:
+        async with DevServer(port=0, ui_port=0, supervise=supervisor) as server:
+            assert server.process is not None
+            hung = server.process.pid
+            os.kill(hung, signal.SIGSTOP)
+            for _ in range(100):
+                if supervisor.restarts and supervisor.restarts[0].ready:
+                    break
+                await asyncio.sleep(0.05)
+            assert server.process.pid != hung
+            assert await check_health(server.ip, server.port)
+
+    asyncio.run(main())
+    (restart,) = supervisor.restarts
+    assert restart.reason == "hang"
+    assert restart.restart_time is not None and restart.restart_time < 1.0
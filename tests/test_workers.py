@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from conftest import requires_binary
+
+pytest.importorskip("temporalio")
+
+from temporalio import workflow  # noqa: E402
+from temporalio.client import Client  # noqa: E402
+
+from temporalio_server import DevServer  # noqa: E402
+
+
+@workflow.defn
+class Echo:
+    @workflow.run
+    async def run(self, value: str) -> str:
+        return value
+
+
+@requires_binary
+def test_workers_poll_when_ready_and_wait_returns_on_stop() -> None:
+    async def main() -> None:
+        async with DevServer(port=0, ui_port=0) as server:
+            workers = await server.spawn_workers(2, task_queue="echo", workflows=[Echo])
+            waiter = asyncio.create_task(workers.wait())
+            client = await Client.connect(server.target)
+            result = await asyncio.wait_for(
+                client.execute_workflow(Echo.run, "hi", id="echo", task_queue="echo"),
+                timeout=10.0,
+            )
+            assert result == "hi"
+            await workers.stop()
+            await asyncio.wait_for(waiter, timeout=5.0)
+
+    asyncio.run(main())